@@ -0,0 +1,76 @@
+"""Add pgvector artifact_index table
+
+Revision ID: c41d7e2b9f05
+Revises: a3a0884c6027
+Create Date: 2026-10-17 10:12:40.318265
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import VECTOR
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7e2b9f05'
+down_revision: Union[str, Sequence[str], None] = 'a3a0884c6027'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# "hnsw" (default) or "ivfflat". IVFFlat builds faster and uses less memory,
+# but its lists are computed from the rows present at build time, so create
+# it after the table has been populated (re-run the migration or REINDEX).
+PGVECTOR_INDEX_TYPE = os.getenv("PGVECTOR_INDEX_TYPE", "hnsw")
+PGVECTOR_IVFFLAT_LISTS = int(os.getenv("PGVECTOR_IVFFLAT_LISTS", "100"))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+    op.add_column('artifacts', sa.Column('org_id', sa.String(), nullable=True))
+    op.create_index(op.f('ix_artifacts_org_id'), 'artifacts', ['org_id'], unique=False)
+
+    op.create_table('artifact_index',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('artifact_id', sa.UUID(), nullable=False),
+    sa.Column('artifact_version_id', sa.Integer(), nullable=False),
+    sa.Column('chunk_no', sa.Integer(), nullable=False),
+    sa.Column('offset', sa.Integer(), nullable=False),
+    sa.Column('doc_type', sa.String(), nullable=False),
+    sa.Column('org_id', sa.String(), nullable=True),
+    sa.Column('embedding', VECTOR(768), nullable=False),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['artifact_id'], ['artifacts.id'], ),
+    sa.ForeignKeyConstraint(['artifact_version_id'], ['artifact_versions.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_artifact_index_id'), 'artifact_index', ['id'], unique=False)
+    op.create_index(op.f('ix_artifact_index_artifact_version_id'), 'artifact_index', ['artifact_version_id'], unique=False)
+    # Lets the planner pre-filter selective org/doc_type combinations exactly
+    op.create_index('ix_artifact_index_org_id_doc_type', 'artifact_index', ['org_id', 'doc_type'], unique=False)
+
+    # L2 operator class: the search orders by `embedding <-> query`
+    if PGVECTOR_INDEX_TYPE == "ivfflat":
+        op.execute(
+            "CREATE INDEX ix_artifact_index_embedding ON artifact_index "
+            f"USING ivfflat (embedding vector_l2_ops) WITH (lists = {PGVECTOR_IVFFLAT_LISTS})"
+        )
+    else:
+        op.execute(
+            "CREATE INDEX ix_artifact_index_embedding ON artifact_index "
+            "USING hnsw (embedding vector_l2_ops) WITH (m = 16, ef_construction = 64)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_artifact_index_embedding', table_name='artifact_index')
+    op.drop_index('ix_artifact_index_org_id_doc_type', table_name='artifact_index')
+    op.drop_index(op.f('ix_artifact_index_artifact_version_id'), table_name='artifact_index')
+    op.drop_index(op.f('ix_artifact_index_id'), table_name='artifact_index')
+    op.drop_table('artifact_index')
+    op.drop_index(op.f('ix_artifacts_org_id'), table_name='artifacts')
+    op.drop_column('artifacts', 'org_id')
@@ -0,0 +1,52 @@
+"""Add content-addressed blobs
+
+Revision ID: e8b52f1a7c3d
+Revises: c41d7e2b9f05
+Create Date: 2026-10-17 11:02:18.540931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b52f1a7c3d'
+down_revision: Union[str, Sequence[str], None] = 'c41d7e2b9f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('storage_key', sa.String(), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=True),
+    sa.Column('ref_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('extracted_text', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('sha256'),
+    sa.UniqueConstraint('storage_key')
+    )
+    # Existing files keep their per-artifact keys
+    op.execute(
+        "INSERT INTO blobs (sha256, storage_key, ref_count) "
+        "SELECT file_hash, MIN(file_path), COUNT(*) FROM artifact_versions GROUP BY file_hash"
+    )
+
+    # Versions with identical content now share a hash
+    op.drop_constraint('artifact_versions_file_hash_key', 'artifact_versions', type_='unique')
+    op.create_index(op.f('ix_artifact_versions_file_hash'), 'artifact_versions', ['file_hash'], unique=False)
+    op.create_foreign_key(
+        'fk_artifact_versions_file_hash_blobs', 'artifact_versions', 'blobs', ['file_hash'], ['sha256']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('fk_artifact_versions_file_hash_blobs', 'artifact_versions', type_='foreignkey')
+    op.drop_index(op.f('ix_artifact_versions_file_hash'), table_name='artifact_versions')
+    op.create_unique_constraint('artifact_versions_file_hash_key', 'artifact_versions', ['file_hash'])
+    op.drop_table('blobs')
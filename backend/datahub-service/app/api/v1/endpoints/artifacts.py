@@ -1,15 +1,30 @@
 import hashlib
+import os
+import re
 import uuid
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from botocore.exceptions import ClientError
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Response, UploadFile
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app import crud, schemas
+from app.db import models
 from app.api import deps
-from app.core.storage import storage_client
-from app.tasks.processing_tasks import process_artifact
+from app.core.storage import get_storage_client
+from app.services.semantic_search import get_search_service
+from app.tasks.processing_tasks import copy_artifact_index, process_artifact
 
 router = APIRouter()
 
+# Versions are immutable; "private" keeps shared caches from storing them
+DOWNLOAD_CACHE_CONTROL = os.environ.get("DOWNLOAD_CACHE_CONTROL", "private, max-age=31536000, immutable")
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+BLOB_LOCK_ATTEMPTS = 3
+_BYTE_RANGE_RE = re.compile(r"^bytes=(\d+-\d*|-\d+)$")
+
 @router.post("/", response_model=schemas.ArtifactSchema)
 def create_artifact(
     *,
@@ -18,14 +33,14 @@ def create_artifact(
     file: UploadFile = File(...),
 ):
     artifact = crud.create_artifact(db=db, artifact=artifact_in)
-    file_path, file_hash = _save_upload_file(file, artifact.id)
+    file_path, file_hash, is_new_blob = _save_upload_file(db, file)
 
     version_in = schemas.ArtifactVersionCreate(
         file_path=file_path, file_hash=file_hash, version=1
     )
-    version = crud.create_artifact_version(db=db, version=version_in, artifact_id=artifact.id)
+    version = _create_version(db, version_in, artifact.id)
 
-    process_artifact.delay(version.id)
+    _enqueue_indexing(version.id, is_new_blob)
     db.refresh(artifact)
     return artifact
 
@@ -40,13 +55,13 @@ def create_artifact_version(
     if not artifact:
         raise HTTPException(status_code=404, detail="Artifact not found")
 
-    file_path, file_hash = _save_upload_file(file, artifact.id)
+    file_path, file_hash, is_new_blob = _save_upload_file(db, file)
     version_in = schemas.ArtifactVersionCreate(
         file_path=file_path, file_hash=file_hash, version=0
     )
-    version = crud.create_artifact_version(db=db, version=version_in, artifact_id=str(artifact_id))
+    version = _create_version(db, version_in, str(artifact_id))
 
-    process_artifact.delay(version.id)
+    _enqueue_indexing(version.id, is_new_blob)
     return version
 
 @router.get("/{artifact_id}", response_model=schemas.ArtifactSchema)
@@ -78,24 +93,174 @@ def download_artifact_version(
     db: Session = Depends(deps.get_db),
     artifact_id: uuid.UUID,
     version_num: int,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
 ):
+    """
+    Downloads the file of a version.
+
+    Versions never change, so responses carry a strong ETag (the file's
+    SHA-256) and long-lived cache headers. Revalidations with a matching
+    If-None-Match (or If-Modified-Since) get a 304 without touching S3, and
+    a single `Range` is served as a 206 with an S3 ranged GET.
+    """
     version = crud.get_artifact_version(db=db, artifact_id=str(artifact_id), version_num=version_num)
     if not version:
         raise HTTPException(status_code=404, detail="Artifact version not found")
 
-    file_obj = storage_client.download_file(version.file_path)
-    return StreamingResponse(file_obj["Body"], media_type=file_obj["ContentType"])
+    headers = {
+        "ETag": f'"{version.file_hash}"',
+        "Cache-Control": DOWNLOAD_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+    last_modified = _as_utc(version.created_at)
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if _not_modified(headers["ETag"], last_modified, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+
+    # If-Range: the client's partial copy must be of this exact content
+    byte_range = _single_byte_range(range_header)
+    if byte_range and if_range and if_range.strip() != headers["ETag"]:
+        byte_range = None
+
+    try:
+        file_obj = get_storage_client().download_file(version.file_path, byte_range=byte_range)
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "InvalidRange":
+            raise
+        size = e.response["Error"].get("ActualObjectSize")
+        if size is not None:
+            headers["Content-Range"] = f"bytes */{size}"
+        return Response(status_code=416, headers=headers)
+
+    headers["Content-Length"] = str(file_obj["ContentLength"])
+    status_code = 200
+    if byte_range and file_obj.get("ContentRange"):
+        headers["Content-Range"] = file_obj["ContentRange"]
+        status_code = 206
+    return StreamingResponse(
+        file_obj["Body"].iter_chunks(DOWNLOAD_CHUNK_SIZE),
+        status_code=status_code,
+        media_type=file_obj["ContentType"],
+        headers=headers,
+    )
+
+@router.delete("/{artifact_id}/versions/{version_num}", status_code=204)
+def delete_artifact_version(
+    *,
+    db: Session = Depends(deps.get_db),
+    artifact_id: uuid.UUID,
+    version_num: int,
+):
+    """
+    Deletes an artifact version and its search index entries. The stored
+    file is deleted once no other version references the same content.
+    """
+    version = crud.get_artifact_version(db=db, artifact_id=str(artifact_id), version_num=version_num)
+    if not version:
+        raise HTTPException(status_code=404, detail="Artifact version not found")
+
+    file_hash = version.file_hash
+    get_search_service().delete_documents([version.id])
+    crud.delete_artifact_version(db=db, db_version=version)
+
+    crud.delete_unreferenced_blob(db, file_hash, delete_object=get_storage_client().delete_file)
+    return Response(status_code=204)
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:  # SQLite drops the time zone
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def _not_modified(
+    etag: str, last_modified: datetime | None, if_none_match: str | None, if_modified_since: str | None
+) -> bool:
+    """Evaluates the conditional GET headers (If-None-Match takes precedence)."""
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison, as required for If-None-Match
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in candidates
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+def _single_byte_range(range_header: str | None) -> str | None:
+    """
+    Returns the Range header when it is a single byte range that S3 can
+    serve ("bytes=0-99", "bytes=100-", "bytes=-500"). Other values are
+    ignored, and the whole file is sent, as HTTP allows.
+    """
+    if range_header and _BYTE_RANGE_RE.match(range_header.strip()):
+        return range_header.strip()
+    return None
+
+def _hash_file(file_obj) -> str:
+    digest = hashlib.sha256()
+    for block in iter(lambda: file_obj.read(HASH_CHUNK_SIZE), b""):
+        digest.update(block)
+    file_obj.seek(0)
+    return digest.hexdigest()
+
+def _save_upload_file(db: Session, upload_file: UploadFile) -> tuple[str, str, bool]:
+    """
+    Stores the upload as a content-addressed blob.
 
-def _save_upload_file(upload_file: UploadFile, artifact_id: uuid.UUID) -> tuple[str, str]:
-    file_content = upload_file.file.read()
+    The upload is already spooled to a local temporary file by Starlette,
+    so it is hashed there first: content that is already stored skips S3
+    entirely (the existing blob, its extracted text and embeddings are
+    reused), and new content is streamed once, straight to `blobs/{sha256}`.
 
-    file_hash = hashlib.sha256(file_content).hexdigest()
+    The blob row is returned locked (see crud.lock_blob), so it can not be
+    deleted before the version created in the same transaction references it.
 
-    upload_file.file.seek(0)
+    Returns:
+        The storage key, the SHA-256 of the blob and whether it is new.
+    """
+    file_hash = _hash_file(upload_file.file)
+    is_new = False
+    for _ in range(BLOB_LOCK_ATTEMPTS):
+        blob = crud.lock_blob(db, file_hash)
+        if blob is not None:
+            return blob.storage_key, file_hash, is_new
 
-    file_extension = upload_file.filename.split(".")[-1] if "." in upload_file.filename else "bin"
-    object_name = f"{artifact_id}/{file_hash}.{file_extension}"
+        object_name = f"blobs/{file_hash}"
+        # Concurrent uploads of the same new content write identical bytes to the same key
+        size = get_storage_client().upload_stream(upload_file.file, object_name, content_type=upload_file.content_type)
+        upload_file.file.seek(0)
+        crud.create_blob(db, sha256=file_hash, storage_key=object_name, size=size)
+        is_new = True
+    # Only reached when the blob keeps being deleted between its creation and its lock
+    raise RuntimeError(f"Could not store blob {file_hash}")
 
-    storage_client.upload_file(upload_file.file, object_name)
+def _create_version(db: Session, version_in: schemas.ArtifactVersionCreate, artifact_id) -> models.ArtifactVersion:
+    """Creates the version, releasing the blob (and its object) if that fails."""
+    try:
+        return crud.create_artifact_version(db=db, version=version_in, artifact_id=artifact_id)
+    except Exception:
+        db.rollback()
+        crud.delete_unreferenced_blob(db, version_in.file_hash, delete_object=get_storage_client().delete_file)
+        raise
 
-    return object_name, file_hash
+def _enqueue_indexing(version_id: int, is_new_blob: bool) -> None:
+    """
+    New content is extracted and embedded by process_artifact; a version of
+    content already stored only copies the index rows of another version.
+    """
+    if is_new_blob:
+        process_artifact.delay(version_id)
+    else:
+        copy_artifact_index.delay(version_id)
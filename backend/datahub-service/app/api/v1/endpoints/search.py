@@ -1,15 +1,23 @@
-from fastapi import APIRouter, Query
-from app.services.semantic_search import search_service
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.services.semantic_search import get_search_service
 
 router = APIRouter()
 
 @router.get("/")
 def search_artifacts(
     q: str = Query(..., min_length=3, description="Text query for semantic search"),
+    org_id: Optional[str] = Query(None, description="Only artifacts of this organization (pgvector backend)"),
+    doc_type: Optional[str] = Query(None, description="Only artifacts of this document type (pgvector backend)"),
+    search_service=Depends(get_search_service),
 ):
     """
     Performs a semantic search for artifacts based on a text query.
     Returns a list of matching artifact versions and their similarity scores.
     """
-    results = search_service.search(query_text=q)
+    filters = {name: value for name, value in (("org_id", org_id), ("doc_type", doc_type)) if value is not None}
+    try:
+        results = search_service.search(query_text=q, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {"query": q, "results": results}
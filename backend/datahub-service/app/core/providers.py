@@ -0,0 +1,79 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+HEALTH_CHECK_INTERVAL_SECONDS = float(os.environ.get("PROVIDER_HEALTH_CHECK_SECONDS", "30"))
+
+
+class LazyProvider(Generic[T]):
+    """
+    Creates a client on first use instead of at import time.
+
+    The instance belongs to the process that created it: a forked child
+    (Celery prefork worker, Gunicorn worker) builds its own on first use
+    instead of reusing the parent's sockets. At most every
+    `check_interval` seconds, `health_check` is run before handing out the
+    instance, and a failing instance is discarded and re-created.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], T],
+        health_check: Optional[Callable[[T], bool]] = None,
+        on_discard: Optional[Callable[[T], None]] = None,
+        check_interval: float = HEALTH_CHECK_INTERVAL_SECONDS,
+    ):
+        self.name = name
+        self.factory = factory
+        self.health_check = health_check
+        self.on_discard = on_discard
+        self.check_interval = check_interval
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        # Runs in forked children too: the parent's lock may have been held
+        # at fork time, and its instance must not be used by the child.
+        self._instance: Optional[T] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        with self._lock:
+            if self._instance is not None and self._is_stale():
+                logger.warning("%s health check failed, reconnecting", self.name)
+                self._discard()
+            if self._instance is None:
+                self._instance = self.factory()
+                self._checked_at = time.monotonic()
+            return self._instance
+
+    def _is_stale(self) -> bool:
+        if self.health_check is None or time.monotonic() - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = time.monotonic()
+        try:
+            return not self.health_check(self._instance)
+        except Exception as e:
+            logger.warning("%s health check raised: %s", self.name, e)
+            return True
+
+    def _discard(self) -> None:
+        instance, self._instance = self._instance, None
+        if self.on_discard is not None and instance is not None:
+            try:
+                self.on_discard(instance)
+            except Exception as e:
+                logger.warning("Failed to close %s: %s", self.name, e)
+
+    def reset(self) -> None:
+        """Closes the current instance; the next get() creates a new one."""
+        with self._lock:
+            self._discard()
@@ -1,7 +1,14 @@
+import itertools
 import os
+from typing import Callable, Optional
 import boto3
 from botocore.client import Config
 from botocore.exceptions import ClientError
+from app.core.providers import LazyProvider
+
+# Size of the parts of multipart uploads (S3 requires at least 5 MiB, except
+# for the last part). Streams smaller than one part use a single PutObject.
+S3_MULTIPART_PART_SIZE = max(int(os.environ.get("S3_MULTIPART_PART_SIZE", str(8 * 1024 * 1024))), 5 * 1024 * 1024)
 
 class StorageClient:
     def __init__(self):
@@ -28,8 +35,81 @@ class StorageClient:
         self.s3.upload_fileobj(file_obj, self.bucket_name, object_name)
         return object_name
 
-    def download_file(self, object_name: str):
+    def upload_stream(
+        self,
+        file_obj,
+        object_name: str,
+        on_chunk: Optional[Callable[[bytes], None]] = None,
+        part_size: int = S3_MULTIPART_PART_SIZE,
+        content_type: Optional[str] = None,
+    ) -> int:
+        """
+        Uploads a stream in a single pass, holding at most two parts in memory.
+
+        Every part is passed to `on_chunk` (e.g. a hash's update) before it is
+        uploaded, so callers can compute checksums without reading the data
+        twice. A failed multipart upload is aborted.
+
+        Returns:
+            The number of bytes uploaded.
+        """
+        extra_args = {"ContentType": content_type} if content_type else {}
+        chunk = file_obj.read(part_size)
+        next_chunk = file_obj.read(part_size) if chunk else b""
+        if not next_chunk:
+            if on_chunk:
+                on_chunk(chunk)
+            self.s3.put_object(Bucket=self.bucket_name, Key=object_name, Body=chunk, **extra_args)
+            return len(chunk)
+
+        upload_id = self.s3.create_multipart_upload(Bucket=self.bucket_name, Key=object_name, **extra_args)["UploadId"]
+        parts, size = [], 0
+        try:
+            for part_number, chunk in enumerate(
+                itertools.chain((chunk, next_chunk), iter(lambda: file_obj.read(part_size), b"")), start=1
+            ):
+                if on_chunk:
+                    on_chunk(chunk)
+                part = self.s3.upload_part(
+                    Bucket=self.bucket_name,
+                    Key=object_name,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=chunk,
+                )
+                parts.append({"PartNumber": part_number, "ETag": part["ETag"]})
+                size += len(chunk)
+            self.s3.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=object_name,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            self.s3.abort_multipart_upload(Bucket=self.bucket_name, Key=object_name, UploadId=upload_id)
+            raise
+        return size
+
+    def delete_file(self, object_name: str):
+        self.s3.delete_object(Bucket=self.bucket_name, Key=object_name)
+
+    def download_file(self, object_name: str, byte_range: Optional[str] = None):
+        """
+        Returns the S3 object. `byte_range` is an HTTP Range value
+        ("bytes=0-1023") to fetch only part of it.
+        """
+        if byte_range:
+            return self.s3.get_object(Bucket=self.bucket_name, Key=object_name, Range=byte_range)
         return self.s3.get_object(Bucket=self.bucket_name, Key=object_name)
 
-# Singleton instance
-storage_client = StorageClient()
+    def ping(self) -> bool:
+        self.s3.head_bucket(Bucket=self.bucket_name)
+        return True
+
+
+# Created on first use, per process, and re-created when the bucket is unreachable
+storage_provider = LazyProvider("S3 storage", StorageClient, health_check=StorageClient.ping)
+
+
+def get_storage_client() -> StorageClient:
+    return storage_provider.get()
@@ -1 +1,18 @@
-from .crud_artifact import create_artifact, get_artifact, create_artifact_version, get_artifact_version
\ No newline at end of file
+from .crud_artifact import (
+    create_artifact,
+    get_artifact,
+    create_artifact_version,
+    delete_artifact_version,
+    get_artifact_version,
+    get_artifact_version_by_id,
+    get_artifact_version_ids,
+)
+from .crud_blob import (
+    get_blob,
+    lock_blob,
+    create_blob,
+    set_blob_text,
+    get_blob_version_ids,
+    get_orphan_blob_hashes,
+    delete_unreferenced_blob,
+)
@@ -20,15 +20,35 @@ def create_artifact_version(db: Session, version: ArtifactVersionCreate, artifac
     latest_version = max([v.version for v in artifact.versions], default=0)
 
     db_version = models.ArtifactVersion(
-        **version.dict(),
+        **version.dict(exclude={"version"}),
         artifact_id=artifact_id,
         version=latest_version + 1,
     )
     db.add(db_version)
+    _add_blob_references(db, version.file_hash, 1)
     db.commit()
     db.refresh(db_version)
     return db_version
 
+def _add_blob_references(db: Session, file_hash: str, count: int):
+    # Atomic in SQL, so concurrent uploads of the same content all count
+    db.query(models.Blob).filter(models.Blob.sha256 == file_hash).update(
+        {models.Blob.ref_count: models.Blob.ref_count + count}, synchronize_session=False
+    )
+
+def delete_artifact_version(db: Session, db_version: models.ArtifactVersion) -> None:
+    """Deletes a version and releases its reference on the blob."""
+    _add_blob_references(db, db_version.file_hash, -1)
+    db.delete(db_version)
+    db.commit()
+
+def get_artifact_version_by_id(db: Session, version_id: int) -> models.ArtifactVersion | None:
+    return db.get(models.ArtifactVersion, version_id)
+
+def get_artifact_version_ids(db: Session) -> list[int]:
+    """Ids of every artifact version, oldest first."""
+    return [version_id for (version_id,) in db.query(models.ArtifactVersion.id).order_by(models.ArtifactVersion.id)]
+
 def get_artifact_version(db: Session, artifact_id: str, version_num: int | None = None):
     query = db.query(models.ArtifactVersion).filter(models.ArtifactVersion.artifact_id == artifact_id)
     if version_num:
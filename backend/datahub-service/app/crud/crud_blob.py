@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import Callable
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.db import models
+
+def get_blob(db: Session, sha256: str) -> models.Blob | None:
+    return db.get(models.Blob, sha256)
+
+def lock_blob(db: Session, sha256: str) -> models.Blob | None:
+    """
+    Reads the blob with a row lock (SELECT ... FOR UPDATE) held until the
+    transaction ends, so it can not be deleted before a version created in
+    the same transaction references it.
+    """
+    return (
+        db.query(models.Blob)
+        .filter(models.Blob.sha256 == sha256)
+        .with_for_update()
+        .populate_existing()
+        .one_or_none()
+    )
+
+def create_blob(db: Session, sha256: str, storage_key: str, size: int) -> models.Blob:
+    """
+    Registers a stored blob with no references yet. When a concurrent upload
+    of the same content registered it first, that row is returned instead.
+    """
+    db_blob = models.Blob(sha256=sha256, storage_key=storage_key, size=size, ref_count=0)
+    db.add(db_blob)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return get_blob(db, sha256)
+    db.refresh(db_blob)
+    return db_blob
+
+def set_blob_text(db: Session, sha256: str, text: str) -> None:
+    db.query(models.Blob).filter(models.Blob.sha256 == sha256).update(
+        {models.Blob.extracted_text: text}, synchronize_session=False
+    )
+    db.commit()
+
+def get_blob_version_ids(db: Session, sha256: str, exclude_id: int | None = None) -> list[int]:
+    """Ids of the artifact versions stored in the blob, oldest first."""
+    query = db.query(models.ArtifactVersion.id).filter(models.ArtifactVersion.file_hash == sha256)
+    if exclude_id is not None:
+        query = query.filter(models.ArtifactVersion.id != exclude_id)
+    return [version_id for (version_id,) in query.order_by(models.ArtifactVersion.id)]
+
+def get_orphan_blob_hashes(db: Session, created_before: datetime) -> list[str]:
+    """Blobs no version references, created before `created_before`."""
+    query = db.query(models.Blob.sha256).filter(models.Blob.ref_count <= 0, models.Blob.created_at < created_before)
+    return [sha256 for (sha256,) in query]
+
+def delete_unreferenced_blob(db: Session, sha256: str, delete_object: Callable[[str], None]) -> str | None:
+    """
+    Deletes the blob if no artifact version references it anymore.
+
+    The row is locked first, and `delete_object` deletes its stored object
+    before the deletion is committed: an upload of the same content waits
+    for the lock, then finds no blob and stores the object again, instead
+    of referencing an object about to be deleted.
+
+    Returns:
+        The storage key of the deleted blob, or None when it is still
+        referenced (or already gone).
+    """
+    blob = lock_blob(db, sha256)
+    if blob is None or blob.ref_count > 0:
+        db.commit()  # Releases the lock
+        return None
+    storage_key = blob.storage_key
+    try:
+        db.execute(delete(models.Blob).where(models.Blob.sha256 == sha256))
+        delete_object(storage_key)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return storage_key
@@ -1,2 +1,4 @@
 from app.db.base_class import Base
 from app.db.models.artifact import Artifact, ArtifactVersion
+from app.db.models.artifact_index import ArtifactIndex
+from app.db.models.blob import Blob
@@ -4,35 +4,42 @@ from pymilvus import connections, utility
 MILVUS_HOST = os.environ.get("MILVUS_HOST", "localhost")
 MILVUS_PORT = os.environ.get("MILVUS_PORT", "19530")
 
-def get_milvus_connection():
+def get_milvus_connection(alias: str = "default"):
     """Establishes a connection to the Milvus server."""
     try:
-        connections.connect(alias="default", host=MILVUS_HOST, port=MILVUS_PORT)
+        connections.connect(alias=alias, host=MILVUS_HOST, port=MILVUS_PORT)
         print(f"Successfully connected to Milvus at {MILVUS_HOST}:{MILVUS_PORT}")
     except Exception as e:
         print(f"Failed to connect to Milvus: {e}")
         raise
 
-def close_milvus_connection():
+def close_milvus_connection(alias: str = "default"):
     """Closes the connection to the Milvus server."""
     try:
-        connections.disconnect(alias="default")
+        connections.disconnect(alias=alias)
         print("Successfully disconnected from Milvus.")
     except Exception as e:
         print(f"Failed to disconnect from Milvus: {e}")
 
-def check_and_create_collection(collection_name: str, dim: int):
-    """Checks if a collection exists, and creates it if it doesn't."""
-    if not utility.has_collection(collection_name):
+def check_and_create_collection(collection_name: str, dim: int, using: str = "default"):
+    """
+    Checks if a collection exists, and creates it if it doesn't.
+
+    Each row is one chunk of an artifact version: `chunk_no` is its position
+    and `offset` the character offset of the chunk in the extracted text.
+    """
+    if not utility.has_collection(collection_name, using=using):
         from pymilvus import Collection, FieldSchema, CollectionSchema, DataType
 
         fields = [
             FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
             FieldSchema(name="artifact_version_id", dtype=DataType.INT64),
+            FieldSchema(name="chunk_no", dtype=DataType.INT64),
+            FieldSchema(name="offset", dtype=DataType.INT64),
             FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=dim)
         ]
-        schema = CollectionSchema(fields, description="Artifact Embeddings")
-        collection = Collection(name=collection_name, schema=schema)
+        schema = CollectionSchema(fields, description="Artifact Chunk Embeddings")
+        collection = Collection(name=collection_name, schema=schema, using=using)
 
         # Create an index for the embedding field
         index_params = {
@@ -1 +1,3 @@
 from .artifact import Artifact, ArtifactVersion
+from .artifact_index import ArtifactIndex
+from .blob import Blob
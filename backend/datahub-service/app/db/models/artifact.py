@@ -10,6 +10,7 @@ class Artifact(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     process_id = Column(String, index=True, nullable=False)
     doc_type = Column(String, nullable=False)
+    org_id = Column(String, index=True)
     created_by = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -21,6 +22,6 @@ class ArtifactVersion(Base):
     artifact_id = Column(UUID(as_uuid=True), ForeignKey("artifacts.id"), nullable=False)
     version = Column(Integer, nullable=False)
     file_path = Column(String, nullable=False)
-    file_hash = Column(String, nullable=False, unique=True)
+    file_hash = Column(String, ForeignKey("blobs.sha256"), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     artifact = relationship("Artifact", back_populates="versions")
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from pgvector.sqlalchemy import VECTOR
+
+from app.db.base_class import Base
+
+# Must match app.services.embeddings.EMBEDDING_DIM
+EMBEDDING_DIM = 768
+
+
+class ArtifactIndex(Base):
+    """
+    One embedded chunk of an artifact version, used by the pgvector search
+    backend. `doc_type` and `org_id` are copied from the artifact so the
+    similarity query can filter on them without a join.
+    """
+    __tablename__ = "artifact_index"
+    __table_args__ = (
+        Index("ix_artifact_index_org_id_doc_type", "org_id", "doc_type"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    artifact_id = Column(UUID(as_uuid=True), ForeignKey("artifacts.id"), nullable=False)
+    artifact_version_id = Column(Integer, ForeignKey("artifact_versions.id"), nullable=False, index=True)
+    chunk_no = Column(Integer, nullable=False)
+    offset = Column(Integer, nullable=False)
+    doc_type = Column(String, nullable=False)
+    org_id = Column(String)
+    embedding = Column(VECTOR(EMBEDDING_DIM), nullable=False)
+    summary = Column(Text)
+
+    artifact = relationship("Artifact")
@@ -0,0 +1,17 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, Text
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class Blob(Base):
+    """
+    Content-addressed file contents, shared by every artifact version with
+    the same SHA-256. `ref_count` is the number of versions pointing at the
+    blob, and `extracted_text` caches the text extracted for indexing.
+    """
+    __tablename__ = "blobs"
+    sha256 = Column(String(64), primary_key=True)
+    storage_key = Column(String, nullable=False, unique=True)
+    size = Column(BigInteger)
+    ref_count = Column(Integer, nullable=False, default=0, server_default="0")
+    extracted_text = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -3,7 +3,7 @@ from fastapi.openapi.utils import get_openapi
 from app.api.v1.endpoints import artifacts, search
 from nexora_auth.middlewares import TraceMiddleware, TrustedHeaderMiddleware
 from app.core.logging_config import setup_logging
-from app.db.milvus import get_milvus_connection, close_milvus_connection
+from app.services.semantic_search import search_service_provider
 
 # Setup structured logging
 setup_logging()
@@ -40,13 +40,10 @@ app = FastAPI(title="NEXORA DataHub Service")
 app.openapi = custom_openapi
 
 # --- Lifespan Events for Milvus Connection ---
-@app.on_event("startup")
-async def startup_event():
-    get_milvus_connection()
-
+# The connection is opened lazily by the first search or indexing call
 @app.on_event("shutdown")
 async def shutdown_event():
-    close_milvus_connection()
+    search_service_provider.reset()
 
 # --- Middlewares ---
 app.add_middleware(TraceMiddleware)
@@ -1,2 +1 @@
 from .artifact import Artifact, DocType # noqa
-from .artifact_index import ArtifactIndex # noqa
@@ -23,6 +23,7 @@ class ArtifactBase(BaseModel):
     process_id: str
     doc_type: str
     created_by: str
+    org_id: Optional[str] = None
 
 class ArtifactCreate(ArtifactBase):
     pass
@@ -0,0 +1,71 @@
+import os
+from typing import Iterable, Iterator
+
+CHUNK_SIZE = int(os.environ.get("SEARCH_CHUNK_SIZE", "1000"))
+CHUNK_OVERLAP = int(os.environ.get("SEARCH_CHUNK_OVERLAP", "200"))
+
+
+def iter_chunks(
+    text: str | Iterable[str], size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP
+) -> Iterator[tuple[int, str]]:
+    """
+    Splits a text into overlapping chunks of about `size` characters.
+
+    Chunks end at the last whitespace before the limit when there is one, and
+    each chunk starts `overlap` characters before the end of the previous one.
+
+    `text` may also be an iterable of consecutive pieces (e.g. the pages of a
+    PDF as they are extracted): the chunks are the same as for the joined
+    text, but are produced as soon as enough text has arrived, and only about
+    one chunk of text is held at a time.
+
+    Yields:
+        (character offset in the text, chunk text) tuples; empty chunks are skipped.
+    """
+    if size <= 0:
+        raise ValueError("Chunk size must be positive")
+    overlap = max(0, min(overlap, size // 2))
+
+    pieces = iter([text] if isinstance(text, str) else text)
+    exhausted = False
+    # buffer holds the text from absolute offset `base` onwards
+    buffer, base, start = "", 0, 0
+    while True:
+        # Whether a chunk ends before the end of the text is only known once
+        # more than `size` characters past `start` have arrived
+        while not exhausted and base + len(buffer) <= start + size:
+            piece = next(pieces, None)
+            if piece is None:
+                exhausted = True
+            else:
+                buffer += piece
+        length = base + len(buffer)
+        if start >= length:
+            break
+
+        end = min(start + size, length)
+        if end < length:
+            lower = start + size // 2
+            split = max(
+                buffer.rfind(" ", lower - base, end - base),
+                buffer.rfind("\n", lower - base, end - base),
+            )
+            if split != -1:
+                end = split + base
+        chunk = buffer[start - base:end - base]
+        if chunk.strip():
+            yield start, chunk
+        if end >= length:
+            break
+        start = max(end - overlap, start + 1)
+        buffer, base = buffer[start - base:], start
+
+
+def chunk_text(text: str, size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> list[tuple[int, str]]:
+    """
+    Splits a text into overlapping chunks of about `size` characters (see iter_chunks).
+
+    Returns:
+        (character offset in `text`, chunk text) tuples; empty chunks are skipped.
+    """
+    return list(iter_chunks(text, size, overlap))
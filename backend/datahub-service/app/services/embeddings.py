@@ -0,0 +1,82 @@
+import logging
+import os
+from functools import lru_cache
+
+from nexora_core.embedding_cache import CachedEmbeddings, embedding_store_from_url
+from nexora_core.semantic_cache import HashingEmbedder
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 768
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "sentence-transformers")
+EMBEDDING_MODEL_NAME = os.environ.get(
+    "EMBEDDING_MODEL_NAME", "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
+)
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", "32"))
+
+
+class SentenceTransformerEmbeddings:
+    """Local CPU sentence-transformer model, encoding texts in batches."""
+
+    def __init__(self, model_name: str, batch_size: int = EMBEDDING_BATCH_SIZE):
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = self.model.encode(
+            texts, batch_size=self.batch_size, normalize_embeddings=True, show_progress_bar=False
+        )
+        return vectors.tolist()
+
+
+class HashingEmbeddings:
+    """
+    Pure-Python fallback: dense, L2-normalized feature-hashing vectors of the
+    words and character trigrams of each text (no model download needed).
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.model_name = f"hashing-{dim}"
+        self.dim = dim
+        self._embedder = HashingEmbedder(dim=dim)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self.dim
+            for index, value in self._embedder.embed(text.casefold()).items():
+                vector[index] = value
+            vectors.append(vector)
+        return vectors
+
+
+def _load_backend():
+    if EMBEDDING_BACKEND == "sentence-transformers":
+        # No silent fallback: a missing package or model must fail the service
+        return SentenceTransformerEmbeddings(EMBEDDING_MODEL_NAME)
+    if EMBEDDING_BACKEND == "hashing":
+        logger.warning("EMBEDDING_BACKEND=hashing: using lexical hashing embeddings, not a semantic model")
+        return HashingEmbeddings(EMBEDDING_DIM)
+    raise ValueError(
+        f"Unknown EMBEDDING_BACKEND {EMBEDDING_BACKEND!r}; expected 'sentence-transformers' or 'hashing'."
+    )
+
+
+@lru_cache(maxsize=1)
+def get_embedding_model() -> CachedEmbeddings:
+    """
+    Returns the process-wide embedding model behind the persistent embedding
+    cache. The model is loaded on first use, so forked workers load their own.
+    """
+    backend = _load_backend()
+    if backend.dim != EMBEDDING_DIM:
+        raise ValueError(
+            f"Embedding model {backend.model_name} has dimension {backend.dim}, "
+            f"but the search collection expects {EMBEDDING_DIM}."
+        )
+    logger.info("Using embedding model %s", backend.model_name)
+    return CachedEmbeddings(backend, model=backend.model_name, store=embedding_store_from_url())
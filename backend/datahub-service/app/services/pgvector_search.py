@@ -0,0 +1,196 @@
+import logging
+import os
+from typing import Iterable
+from sqlalchemy import delete, insert, literal, select, text
+from app.core.providers import LazyProvider
+from app.db.models import Artifact, ArtifactIndex, ArtifactVersion
+from app.db.session import SessionLocal
+from app.services.chunking import iter_chunks
+from app.services.embeddings import get_embedding_model
+from app.services.semantic_search import SEARCH_CANDIDATES_PER_RESULT, group_hits
+
+logger = logging.getLogger(__name__)
+
+# Candidate list size of HNSW index scans; raise it when filters are selective,
+# since rows rejected by the filter still use up candidates
+PGVECTOR_HNSW_EF_SEARCH = int(os.environ.get("PGVECTOR_HNSW_EF_SEARCH", "100"))
+# IVFFlat lists probed per query (when the index was built with PGVECTOR_INDEX_TYPE=ivfflat)
+PGVECTOR_IVFFLAT_PROBES = int(os.environ.get("PGVECTOR_IVFFLAT_PROBES", "10"))
+# pgvector >= 0.8 only: "relaxed_order" or "strict_order" keeps scanning the
+# HNSW index until enough rows pass the filters. Empty leaves the server default.
+PGVECTOR_ITERATIVE_SCAN = os.environ.get("PGVECTOR_ITERATIVE_SCAN", "")
+
+
+class PgVectorSearchService:
+    """
+    Semantic search over the `artifact_index` table with pgvector, for
+    deployments without Milvus. Same interface and result format as
+    SemanticSearchService, plus org_id/doc_type filters applied in the same
+    query as the similarity ordering.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+
+    def ping(self) -> bool:
+        with self.session_factory() as db:
+            db.execute(text("SELECT 1"))
+        return True
+
+    def add_documents(self, documents: list[tuple[int, str | Iterable[str]]]):
+        """
+        Splits a batch of (artifact_version_id, text) pairs into overlapping
+        chunks, embeds them as one batch and replaces the rows of those
+        versions with a single bulk insert. The artifact's doc_type and
+        org_id are copied onto each row for filtering.
+        """
+        if not documents:
+            return
+
+        version_ids = [artifact_version_id for artifact_version_id, _ in documents]
+        with self.session_factory() as db:
+            versions = {
+                row.id: row
+                for row in db.execute(
+                    select(ArtifactVersion.id, ArtifactVersion.artifact_id, Artifact.doc_type, Artifact.org_id)
+                    .join(Artifact, ArtifactVersion.artifact_id == Artifact.id)
+                    .where(ArtifactVersion.id.in_(version_ids))
+                )
+            }
+
+        rows, texts = [], []
+        for artifact_version_id, text_content in documents:
+            version = versions.get(artifact_version_id)
+            if version is None:
+                logger.warning("Artifact version %s not found, not indexed.", artifact_version_id)
+                continue
+            for chunk_no, (offset, chunk) in enumerate(iter_chunks(text_content)):
+                rows.append({
+                    "artifact_id": version.artifact_id,
+                    "artifact_version_id": artifact_version_id,
+                    "chunk_no": chunk_no,
+                    "offset": offset,
+                    "doc_type": version.doc_type,
+                    "org_id": version.org_id,
+                })
+                texts.append(chunk)
+
+        # Embed before opening the write transaction
+        embeddings = get_embedding_model().embed_documents(texts) if texts else []
+        for row, embedding in zip(rows, embeddings):
+            row["embedding"] = embedding
+
+        with self.session_factory() as db:
+            db.execute(delete(ArtifactIndex).where(ArtifactIndex.artifact_version_id.in_(version_ids)))
+            if rows:
+                db.execute(insert(ArtifactIndex), rows)
+            db.commit()
+        logger.info("Inserted %d chunks of %d documents into artifact_index.", len(rows), len(documents))
+
+    def add_document(self, artifact_version_id: int, text_content: str | Iterable[str]):
+        """Chunks, embeds and inserts a document into artifact_index."""
+        self.add_documents([(artifact_version_id, text_content)])
+
+    def copy_documents(self, source_version_id: int, target_version_id: int) -> int:
+        """
+        Replaces the rows of `target_version_id` with copies of those of
+        `source_version_id` (same content), with one INSERT ... SELECT and
+        the target artifact's doc_type and org_id.
+
+        Returns:
+            The number of copied chunks.
+        """
+        with self.session_factory() as db:
+            target = db.execute(
+                select(ArtifactVersion.artifact_id, Artifact.doc_type, Artifact.org_id)
+                .join(Artifact, ArtifactVersion.artifact_id == Artifact.id)
+                .where(ArtifactVersion.id == target_version_id)
+            ).first()
+            if target is None:
+                return 0
+            copies = select(
+                literal(target.artifact_id, ArtifactIndex.artifact_id.type),
+                literal(target_version_id),
+                ArtifactIndex.chunk_no,
+                ArtifactIndex.offset,
+                literal(target.doc_type),
+                literal(target.org_id, ArtifactIndex.org_id.type),
+                ArtifactIndex.embedding,
+            ).where(ArtifactIndex.artifact_version_id == source_version_id)
+            db.execute(delete(ArtifactIndex).where(ArtifactIndex.artifact_version_id == target_version_id))
+            result = db.execute(
+                insert(ArtifactIndex).from_select(
+                    ["artifact_id", "artifact_version_id", "chunk_no", "offset", "doc_type", "org_id", "embedding"],
+                    copies,
+                )
+            )
+            db.commit()
+            return result.rowcount
+
+    def delete_documents(self, artifact_version_ids: list[int]):
+        """Deletes every chunk of the given artifact versions."""
+        with self.session_factory() as db:
+            db.execute(delete(ArtifactIndex).where(ArtifactIndex.artifact_version_id.in_(artifact_version_ids)))
+            db.commit()
+
+    def flush(self):
+        """Nothing to do: committed rows are immediately searchable."""
+
+    @staticmethod
+    def search_statement(query_embedding: list[float], limit: int, org_id: str | None = None, doc_type: str | None = None):
+        """
+        Nearest chunks by L2 distance (`<->`, served by the HNSW/IVFFlat
+        index), restricted to the given org and doc type.
+        """
+        distance = ArtifactIndex.embedding.l2_distance(query_embedding)
+        statement = select(
+            ArtifactIndex.artifact_version_id,
+            ArtifactIndex.chunk_no,
+            ArtifactIndex.offset,
+            distance.label("distance"),
+        )
+        if org_id is not None:
+            statement = statement.where(ArtifactIndex.org_id == org_id)
+        if doc_type is not None:
+            statement = statement.where(ArtifactIndex.doc_type == doc_type)
+        return statement.order_by(distance).limit(limit)
+
+    def search(
+        self,
+        query_text: str,
+        top_k: int = 5,
+        org_id: str | None = None,
+        doc_type: str | None = None,
+    ) -> list[dict]:
+        """
+        Performs a semantic search over the artifact chunks, optionally
+        limited to an organization and/or document type.
+
+        Chunk hits are grouped per artifact version: an artifact scores as its
+        best chunk (smallest L2 distance) and lists its best passages.
+        """
+        query_embedding = get_embedding_model().embed_query(query_text)
+        statement = self.search_statement(query_embedding, top_k * SEARCH_CANDIDATES_PER_RESULT, org_id, doc_type)
+
+        with self.session_factory() as db:
+            # Transaction-local settings, so pooled connections are unaffected
+            db.execute(
+                text("SELECT set_config('hnsw.ef_search', :ef_search, true), set_config('ivfflat.probes', :probes, true)"),
+                {"ef_search": str(PGVECTOR_HNSW_EF_SEARCH), "probes": str(PGVECTOR_IVFFLAT_PROBES)},
+            )
+            if PGVECTOR_ITERATIVE_SCAN:
+                db.execute(
+                    text("SELECT set_config('hnsw.iterative_scan', :mode, true)"),
+                    {"mode": PGVECTOR_ITERATIVE_SCAN},
+                )
+            hits = db.execute(statement).all()
+
+        return group_hits(hits, top_k)
+
+
+# Stateless apart from the engine's connection pool (pool_pre_ping)
+pgvector_search_provider = LazyProvider(
+    "pgvector search",
+    PgVectorSearchService,
+    health_check=PgVectorSearchService.ping,
+)
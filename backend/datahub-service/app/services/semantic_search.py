@@ -1,36 +1,139 @@
-from pymilvus import Collection
-from app.db.milvus import check_and_create_collection
-import numpy as np
+import logging
+import os
+from typing import Iterable
+from pymilvus import Collection, utility
+from app.core.providers import LazyProvider
+from app.db.milvus import check_and_create_collection, close_milvus_connection, get_milvus_connection
+from app.services.chunking import iter_chunks
+from app.services.embeddings import EMBEDDING_DIM, get_embedding_model
+
+logger = logging.getLogger(__name__)
+
+# One row per chunk. The former one-vector-per-document collection held
+# placeholder (random) embeddings, so it is not read: artifacts stored before
+# are moved over by re-indexing them (reindex_all_artifacts).
+COLLECTION_NAME = "nexora_artifact_chunks"
+LEGACY_COLLECTION_NAME = "nexora_artifacts"
+
+# "milvus" (default) or "pgvector" (artifact_index table in Postgres, see pgvector_search)
+SEARCH_BACKEND = os.environ.get("SEARCH_BACKEND", "milvus")
+
+# Chunk hits fetched per requested artifact, and passages returned per artifact
+SEARCH_CANDIDATES_PER_RESULT = int(os.environ.get("SEARCH_CANDIDATES_PER_RESULT", "5"))
+SEARCH_MAX_PASSAGES = int(os.environ.get("SEARCH_MAX_PASSAGES", "3"))
+MILVUS_MAX_LIMIT = 16384
 
-COLLECTION_NAME = "nexora_artifacts"
-EMBEDDING_DIM = 768  # Example dimension for a generic sentence transformer
 
 class SemanticSearchService:
-    def __init__(self):
-        check_and_create_collection(COLLECTION_NAME, EMBEDDING_DIM)
-        self.collection = Collection(COLLECTION_NAME)
+    def __init__(self, using: str = "default"):
+        self.using = using
+        check_and_create_collection(COLLECTION_NAME, EMBEDDING_DIM, using=using)
+        self.collection = Collection(COLLECTION_NAME, using=using)
         self.collection.load()
+        if utility.has_collection(LEGACY_COLLECTION_NAME, using=using) and self.collection.num_entities == 0:
+            logger.warning(
+                "Collection '%s' is empty but '%s' exists: run the reindex_all_artifacts task "
+                "to index the artifacts stored before chunking",
+                COLLECTION_NAME, LEGACY_COLLECTION_NAME,
+            )
+
+    def ping(self) -> bool:
+        """Round-trip to the Milvus server of this service's connection."""
+        utility.get_server_version(using=self.using)
+        return True
+
+    def _generate_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return get_embedding_model().embed_documents(texts)
 
     def _generate_embedding(self, text: str) -> list[float]:
-        """Placeholder for a real embedding model."""
-        # In a real implementation, this would call out to an AI engine service
-        # or use a local sentence transformer model.
-        print(f"Generating dummy embedding for text: '{text[:30]}...'")
-        return np.random.rand(EMBEDDING_DIM).tolist()
-
-    def add_document(self, artifact_version_id: int, text_content: str):
-        """Generates embedding and inserts a document into Milvus."""
-        embedding = self._generate_embedding(text_content)
-        data = [
-            [artifact_version_id],
-            [embedding]
-        ]
-        self.collection.insert(data)
-        print(f"Inserted document for artifact version {artifact_version_id} into Milvus.")
-        self.collection.flush() # Ensure data is indexed
-
-    def search(self, query_text: str, top_k: int = 5) -> list[dict]:
-        """Performs a semantic search for similar documents."""
+        return get_embedding_model().embed_query(text)
+
+    def add_documents(self, documents: list[tuple[int, str | Iterable[str]]]):
+        """
+        Splits a batch of (artifact_version_id, text) pairs into overlapping
+        chunks, embeds them as one batch and inserts them with a single insert.
+
+        Chunks previously indexed for the same versions are deleted first, so
+        re-processing an artifact does not duplicate its rows. The collection
+        is not flushed here: inserted rows are already searchable, and
+        segments are sealed by flush() periodically.
+        """
+        if not documents:
+            return
+
+        version_ids, chunk_nos, offsets, texts = [], [], [], []
+        for artifact_version_id, text_content in documents:
+            for chunk_no, (offset, chunk) in enumerate(iter_chunks(text_content)):
+                version_ids.append(artifact_version_id)
+                chunk_nos.append(chunk_no)
+                offsets.append(offset)
+                texts.append(chunk)
+
+        self.delete_documents([artifact_version_id for artifact_version_id, _ in documents])
+        if not texts:
+            return
+
+        embeddings = self._generate_embeddings(texts)
+        self.collection.insert([version_ids, chunk_nos, offsets, embeddings])
+        logger.info("Inserted %d chunks of %d documents into Milvus", len(texts), len(documents))
+
+    def add_document(self, artifact_version_id: int, text_content: str | Iterable[str]):
+        """Chunks, embeds and inserts a document into Milvus."""
+        self.add_documents([(artifact_version_id, text_content)])
+
+    def copy_documents(self, source_version_id: int, target_version_id: int) -> int:
+        """
+        Replaces the chunks of `target_version_id` with copies of those of
+        `source_version_id` (same content), embeddings included.
+
+        Returns:
+            The number of copied chunks.
+        """
+        iterator = self.collection.query_iterator(
+            batch_size=1000,
+            expr=f"artifact_version_id == {int(source_version_id)}",
+            output_fields=["chunk_no", "offset", "embedding"],
+        )
+        chunk_nos, offsets, embeddings = [], [], []
+        try:
+            while rows := iterator.next():
+                for row in rows:
+                    chunk_nos.append(row["chunk_no"])
+                    offsets.append(row["offset"])
+                    embeddings.append(row["embedding"])
+        finally:
+            iterator.close()
+
+        self.delete_documents([target_version_id])
+        if chunk_nos:
+            self.collection.insert([[target_version_id] * len(chunk_nos), chunk_nos, offsets, embeddings])
+        return len(chunk_nos)
+
+    def delete_documents(self, artifact_version_ids: list[int]):
+        """Deletes every chunk of the given artifact versions."""
+        self.collection.delete(expr=f"artifact_version_id in {[int(i) for i in artifact_version_ids]}")
+
+    def flush(self):
+        """Seals the growing segments of the collection."""
+        self.collection.flush()
+
+    def search(
+        self,
+        query_text: str,
+        top_k: int = 5,
+        org_id: str | None = None,
+        doc_type: str | None = None,
+    ) -> list[dict]:
+        """
+        Performs a semantic search over the artifact chunks.
+
+        Chunk hits are grouped per artifact version: an artifact scores as its
+        best chunk (smallest L2 distance) and lists its best passages.
+        """
+        if org_id is not None or doc_type is not None:
+            # The Milvus collection stores no artifact metadata
+            raise ValueError("Filtering by org_id or doc_type requires SEARCH_BACKEND=pgvector.")
+
         query_embedding = self._generate_embedding(query_text)
 
         search_params = {
@@ -42,18 +145,55 @@ class SemanticSearchService:
             data=[query_embedding],
             anns_field="embedding",
             param=search_params,
-            limit=top_k,
-            output_fields=["artifact_version_id"]
+            limit=min(top_k * SEARCH_CANDIDATES_PER_RESULT, MILVUS_MAX_LIMIT),
+            output_fields=["artifact_version_id", "chunk_no", "offset"]
+        )
+
+        hits = (
+            (hit.entity.get("artifact_version_id"), hit.entity.get("chunk_no"), hit.entity.get("offset"), hit.distance)
+            for hit in results[0]
         )
+        return group_hits(hits, top_k)
+
+
+def group_hits(hits, top_k: int) -> list[dict]:
+    """
+    Groups (artifact_version_id, chunk_no, offset, distance) chunk hits,
+    ordered by distance, into at most `top_k` artifacts with up to
+    SEARCH_MAX_PASSAGES passages each.
+    """
+    artifacts: dict[int, dict] = {}
+    # The first hit of an artifact is its best one
+    for artifact_version_id, chunk_no, offset, distance in hits:
+        artifact = artifacts.setdefault(
+            artifact_version_id,
+            {"artifact_version_id": artifact_version_id, "score": distance, "passages": []},
+        )
+        if len(artifact["passages"]) < SEARCH_MAX_PASSAGES:
+            artifact["passages"].append({"chunk_no": chunk_no, "offset": offset, "score": distance})
+    return list(artifacts.values())[:top_k]
+
+
+def _create_search_service() -> SemanticSearchService:
+    # One connection alias per process: gRPC channels must not cross a fork
+    alias = f"datahub-{os.getpid()}"
+    get_milvus_connection(alias)
+    return SemanticSearchService(using=alias)
+
+
+# Connects, creates and loads the collection on first use, per process
+search_service_provider = LazyProvider(
+    "Milvus search",
+    _create_search_service,
+    health_check=SemanticSearchService.ping,
+    on_discard=lambda service: close_milvus_connection(service.using),
+)
 
-        search_results = []
-        for hit in results[0]:
-            search_results.append({
-                "artifact_version_id": hit.entity.get("artifact_version_id"),
-                "score": hit.distance
-            })
 
-        return search_results
+def get_search_service():
+    """Returns this process's search service for SEARCH_BACKEND ("milvus" or "pgvector")."""
+    if SEARCH_BACKEND == "pgvector":
+        from app.services.pgvector_search import pgvector_search_provider
 
-# Singleton instance
-search_service = SemanticSearchService()
+        return pgvector_search_provider.get()
+    return search_service_provider.get()
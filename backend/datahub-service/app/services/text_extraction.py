@@ -0,0 +1,126 @@
+"""
+Text extraction for artifact indexing.
+
+PDF pages are extracted in parallel, in page ranges, by a process pool
+(PyPDF2 is pure Python, so threads would not run in parallel). Text is
+produced as an iterator of pieces in document order, so the chunker can
+start while later pages are still being extracted.
+
+The pool is billiard's (Celery's fork of multiprocessing): Celery prefork
+children are daemonic, and the standard library refuses to start processes
+from a daemonic process, billiard does not.
+"""
+
+import io
+import logging
+import os
+import tempfile
+from typing import Iterator, Optional
+
+import billiard
+import magic
+import PyPDF2
+from docx import Document
+
+from app.core.providers import LazyProvider
+
+logger = logging.getLogger(__name__)
+
+# 0 or 1 extracts in the calling process
+EXTRACTION_PROCESSES = int(os.environ.get("EXTRACTION_PROCESSES", str(min(os.cpu_count() or 1, 4))))
+# Minimum pages per pool task: each task re-opens the PDF, which costs about
+# as much as extracting a few dozen pages
+EXTRACTION_PAGES_PER_TASK = int(os.environ.get("EXTRACTION_PAGES_PER_TASK", "32"))
+# Tasks per pool process for long documents, to balance pages of uneven cost
+TASKS_PER_PROCESS = 4
+
+PDF_MIME_TYPE = "application/pdf"
+DOCX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def _create_pool():
+    if EXTRACTION_PROCESSES <= 1:
+        return None
+    # spawn: the pool must not inherit the worker's sockets and threads
+    return billiard.get_context("spawn").Pool(EXTRACTION_PROCESSES)
+
+
+# Started on first use, per process
+extraction_pool_provider = LazyProvider(
+    "text extraction pool",
+    _create_pool,
+    on_discard=lambda pool: pool and pool.terminate(),
+)
+
+
+def extract_page_range(path: str, start: int, stop: int) -> list[str]:
+    """Extracts pages [start, stop) of a PDF file (runs in the pool workers)."""
+    reader = PyPDF2.PdfReader(path)
+    return [(reader.pages[index].extract_text() or "") + "\n" for index in range(start, stop)]
+
+
+def iter_pdf_pages(content: bytes) -> Iterator[str]:
+    """
+    Yields the text of each page of a PDF, each followed by a newline.
+
+    Documents longer than one task are written to a temporary file that the
+    pool workers read, so the content is not pickled to every task.
+    """
+    reader = PyPDF2.PdfReader(io.BytesIO(content))
+    page_count = len(reader.pages)
+    step = max(
+        EXTRACTION_PAGES_PER_TASK,
+        -(-page_count // (max(EXTRACTION_PROCESSES, 1) * TASKS_PER_PROCESS)),
+        1,
+    )
+
+    pool = extraction_pool_provider.get() if page_count > step else None
+    if pool is None:
+        for page in reader.pages:
+            yield (page.extract_text() or "") + "\n"
+        return
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(content)
+        path = f.name
+    try:
+        # Every range is submitted at once and the results are read in order.
+        # apply_async rather than imap: billiard only acknowledges the results
+        # of apply_async tasks, and a worker holding unacknowledged results
+        # waits up to 30s before it exits
+        results = [
+            pool.apply_async(extract_page_range, (path, start, min(start + step, page_count)))
+            for start in range(0, page_count, step)
+        ]
+        for result in results:
+            yield from result.get()
+    finally:
+        os.unlink(path)
+
+
+def iter_docx_paragraphs(content: bytes) -> Iterator[str]:
+    """Yields the text of each paragraph of a DOCX document, each followed by a newline."""
+    doc = Document(io.BytesIO(content))
+    for para in doc.paragraphs:
+        yield para.text + "\n"
+
+
+def iter_text(content: bytes) -> Iterator[str]:
+    """Yields the text of a file in pieces, based on its MIME type."""
+    mime_type = magic.from_buffer(content, mime=True)
+
+    if mime_type == PDF_MIME_TYPE:
+        yield from iter_pdf_pages(content)
+    elif mime_type == DOCX_MIME_TYPE:
+        yield from iter_docx_paragraphs(content)
+    else:
+        logger.info("Unsupported file type: %s. Falling back to string decoding.", mime_type)
+        try:
+            yield content.decode("utf-8")
+        except UnicodeDecodeError:
+            return
+
+
+def extract_text(content: bytes) -> str:
+    """Extracts the whole text of a file."""
+    return "".join(iter_text(content))
@@ -8,6 +8,21 @@ celery_app = Celery(
     include=["app.tasks.processing_tasks"],
 )
 
+# Inserts are not flushed per artifact; celery beat seals the segments periodically
+SEARCH_INDEX_FLUSH_INTERVAL_SECONDS = float(os.environ.get("SEARCH_INDEX_FLUSH_INTERVAL_SECONDS", "60"))
+# Blobs left without versions (failed uploads) are swept periodically too
+ORPHAN_BLOB_SWEEP_INTERVAL_SECONDS = float(os.environ.get("ORPHAN_BLOB_SWEEP_INTERVAL_SECONDS", "3600"))
+
 celery_app.conf.update(
     task_track_started=True,
+    beat_schedule={
+        "flush-search-index": {
+            "task": "app.tasks.processing_tasks.flush_search_index",
+            "schedule": SEARCH_INDEX_FLUSH_INTERVAL_SECONDS,
+        },
+        "delete-orphan-blobs": {
+            "task": "app.tasks.processing_tasks.delete_orphan_blobs",
+            "schedule": ORPHAN_BLOB_SWEEP_INTERVAL_SECONDS,
+        },
+    },
 )
@@ -1,78 +1,172 @@
 from app.tasks.celery_app import celery_app
-from app.services.semantic_search import search_service
+from app.services.semantic_search import get_search_service
 from app.db.session import SessionLocal
-from app.crud import get_artifact_version
-from app.core.storage import storage_client
-import magic
-import io
-import PyPDF2
-from docx import Document
+from app import crud
+from app.core.storage import get_storage_client
+from app.services.text_extraction import iter_text
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Artifacts embedded and inserted together by reindex_artifacts
+REINDEX_BATCH_SIZE = int(os.environ.get("REINDEX_BATCH_SIZE", "64"))
+# Artifact versions per reindex_artifacts task queued by reindex_all_artifacts
+REINDEX_VERSIONS_PER_TASK = REINDEX_BATCH_SIZE * 16
+# Age after which a blob no version references is deleted by delete_orphan_blobs
+BLOB_ORPHAN_GRACE_SECONDS = float(os.environ.get("BLOB_ORPHAN_GRACE_SECONDS", "3600"))
 
 @celery_app.task
 def process_artifact(artifact_version_id: int):
     """
     Asynchronous task to process an artifact version.
-    - Downloads the file from storage.
-    - Extracts text from the document.
+    - Downloads the file from storage and extracts its text, unless the
+      text of the same content (blob) was extracted before.
     - Adds the document to the semantic search index.
     """
-    print(f"Starting processing for artifact version {artifact_version_id}")
+    logger.info("Starting processing for artifact version %s", artifact_version_id)
 
     db = SessionLocal()
-    artifact_version = get_artifact_version(db, artifact_version_id)
-    db.close()
+    try:
+        artifact_version = crud.get_artifact_version_by_id(db, artifact_version_id)
+        if not artifact_version:
+            logger.error("Artifact version %s not found", artifact_version_id)
+            return
 
-    if not artifact_version:
-        print(f"Error: Artifact version {artifact_version_id} not found.")
-        return
+        # Pages are chunked as they are extracted, unless the blob was already processed
+        get_search_service().add_document(
+            artifact_version_id=artifact_version_id,
+            text_content=_iter_version_text(db, artifact_version),
+        )
+    finally:
+        db.close()
 
-    # Download file from S3
-    file_obj = storage_client.download_file(artifact_version.file_path)
-    file_content = file_obj["Body"].read()
+    logger.info("Finished processing for artifact version %s", artifact_version_id)
+    return {"status": "complete", "artifact_version_id": artifact_version_id}
 
-    # Extract text based on file type
-    text_content = _extract_text(file_content)
 
-    # In a real implementation, this is where you would call the AIEngine
-    # to generate an embedding for the extracted text.
-    # For now, the SemanticSearchService uses a dummy embedding generator.
+@celery_app.task
+def copy_artifact_index(artifact_version_id: int):
+    """
+    Indexes a version whose content (blob) another version already has by
+    copying that version's chunk rows, without downloading, extracting or
+    embedding anything. Falls back to process_artifact when no other
+    version of the blob is indexed yet.
+    """
+    db = SessionLocal()
+    try:
+        artifact_version = crud.get_artifact_version_by_id(db, artifact_version_id)
+        if not artifact_version:
+            logger.error("Artifact version %s not found", artifact_version_id)
+            return
+        source_ids = crud.get_blob_version_ids(db, artifact_version.file_hash, exclude_id=artifact_version_id)
+    finally:
+        db.close()
 
-    # Add document to Milvus
-    search_service.add_document(
-        artifact_version_id=artifact_version_id,
-        text_content=text_content
-    )
+    search_service = get_search_service()
+    for source_id in source_ids:
+        copied = search_service.copy_documents(source_id, artifact_version_id)
+        if copied:
+            return {"status": "complete", "artifact_version_id": artifact_version_id, "copied_from": source_id}
+    return process_artifact(artifact_version_id)
 
-    print(f"Finished processing for artifact version {artifact_version_id}")
-    return {"status": "complete", "artifact_version_id": artifact_version_id}
 
-def _extract_text(file_content: bytes) -> str:
-    """Extracts text from a file based on its MIME type."""
-    mime_type = magic.from_buffer(file_content, mime=True)
+@celery_app.task
+def delete_orphan_blobs():
+    """
+    Periodic task (celery beat) deleting the blobs no version references
+    after BLOB_ORPHAN_GRACE_SECONDS, e.g. when an upload stored the file but
+    its process died before creating the version.
+    """
+    db = SessionLocal()
+    try:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=BLOB_ORPHAN_GRACE_SECONDS)
+        deleted = 0
+        for sha256 in crud.get_orphan_blob_hashes(db, created_before=cutoff):
+            if crud.delete_unreferenced_blob(db, sha256, delete_object=get_storage_client().delete_file):
+                deleted += 1
+    finally:
+        db.close()
+    return {"status": "complete", "deleted": deleted}
+
+
+@celery_app.task
+def reindex_artifacts(artifact_version_ids: list[int]):
+    """
+    Bulk (re-)indexing of artifact versions.
+
+    Artifacts are processed REINDEX_BATCH_SIZE at a time: their texts are
+    embedded as one batch and inserted with a single Milvus insert, and the
+    collection is flushed once at the end.
+    """
+    indexed, missing = 0, []
+    for start in range(0, len(artifact_version_ids), REINDEX_BATCH_SIZE):
+        batch_ids = artifact_version_ids[start:start + REINDEX_BATCH_SIZE]
 
-    if mime_type == "application/pdf":
-        return _extract_text_from_pdf(file_content)
-    elif mime_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        return _extract_text_from_docx(file_content)
-    else:
-        print(f"Unsupported file type: {mime_type}. Falling back to string decoding.")
+        documents = []
+        db = SessionLocal()
         try:
-            return file_content.decode("utf-8")
-        except UnicodeDecodeError:
-            return ""
-
-def _extract_text_from_pdf(content: bytes) -> str:
-    text = ""
-    with io.BytesIO(content) as f:
-        reader = PyPDF2.PdfReader(f)
-        for page in reader.pages:
-            text += page.extract_text()
-    return text
-
-def _extract_text_from_docx(content: bytes) -> str:
-    text = ""
-    with io.BytesIO(content) as f:
-        doc = Document(f)
-        for para in doc.paragraphs:
-            text += para.text + "\n"
-    return text
+            for version_id in batch_ids:
+                artifact_version = crud.get_artifact_version_by_id(db, version_id)
+                if not artifact_version:
+                    missing.append(version_id)
+                    continue
+                documents.append((version_id, _iter_version_text(db, artifact_version)))
+
+            # Consumes the text iterators, so the session must still be open
+            get_search_service().add_documents(documents)
+        finally:
+            db.close()
+        indexed += len(documents)
+        logger.info("Reindexed %d/%d artifact versions", indexed, len(artifact_version_ids))
+
+    get_search_service().flush()
+    return {"status": "complete", "indexed": indexed, "missing": missing}
+
+
+@celery_app.task
+def reindex_all_artifacts():
+    """
+    Queues the re-indexing of every artifact version, split into
+    reindex_artifacts tasks the workers run in parallel. Run it once after
+    switching the search collection or backend:
+
+        celery -A app.tasks.celery_app call app.tasks.processing_tasks.reindex_all_artifacts
+    """
+    db = SessionLocal()
+    try:
+        version_ids = crud.get_artifact_version_ids(db)
+    finally:
+        db.close()
+    for start in range(0, len(version_ids), REINDEX_VERSIONS_PER_TASK):
+        reindex_artifacts.delay(version_ids[start:start + REINDEX_VERSIONS_PER_TASK])
+    return {"status": "queued", "versions": len(version_ids)}
+
+
+@celery_app.task
+def flush_search_index():
+    """Periodic task (celery beat) sealing the rows inserted since the last flush."""
+    get_search_service().flush()
+
+def _iter_version_text(db, artifact_version) -> Iterator[str]:
+    """
+    Yields the text of an artifact version in pieces (pages, paragraphs) as
+    it is extracted. The text is extracted once per blob and stored with it:
+    versions with identical content reuse it, and their chunks then hit the
+    embedding cache, so they are not embedded again either.
+    """
+    blob = crud.get_blob(db, artifact_version.file_hash)
+    if blob is not None and blob.extracted_text is not None:
+        logger.info("Reusing extracted text of blob %s", blob.sha256[:12])
+        yield blob.extracted_text
+        return
+
+    file_obj = get_storage_client().download_file(artifact_version.file_path)
+    pieces = []
+    for piece in iter_text(file_obj["Body"].read()):
+        pieces.append(piece)
+        yield piece
+    if blob is not None:
+        crud.set_blob_text(db, blob.sha256, "".join(pieces))
@@ -1,21 +1,33 @@
+import os
 import pytest
 from unittest.mock import patch, MagicMock
 
-# --- Pre-emptive Mocking for Import-Time Side Effects ---
-# Several services are instantiated as singletons at the module level,
-# which causes them to try and connect to external services (Milvus, MinIO)
-# during the test collection phase. To prevent this, we patch the underlying
-# clients *before* any application modules are imported.
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+os.environ.setdefault("S3_BUCKET_NAME", "test-bucket")
+os.environ.setdefault("S3_ENDPOINT_URL", "http://localhost:9000")
+os.environ.setdefault("S3_ACCESS_KEY", "test")
+os.environ.setdefault("S3_SECRET_KEY", "test")
+os.environ.setdefault("EMBEDDING_CACHE_URL", "none")
+os.environ.setdefault("EMBEDDING_BACKEND", "hashing")
+
+# --- Mocking of External Services ---
+# The Milvus and S3 clients are created lazily on first use (see
+# app.core.providers). We patch the underlying clients *before* any
+# application modules are imported, so no test reaches Milvus or MinIO.
 
 mock_collection_instance = MagicMock()
 patcher_milvus_check = patch("app.db.milvus.check_and_create_collection", return_value=None)
-patcher_milvus_collection = patch("pymilvus.orm.collection.Collection", return_value=mock_collection_instance)
+patcher_milvus_connect = patch("app.db.milvus.get_milvus_connection", return_value=None)
+patcher_milvus_collection = patch("pymilvus.Collection", return_value=mock_collection_instance)
+patcher_milvus_has_collection = patch("pymilvus.utility.has_collection", return_value=False)
 
 mock_s3_client = MagicMock()
 patcher_boto3 = patch("boto3.client", return_value=mock_s3_client)
 
 patcher_milvus_check.start()
+patcher_milvus_connect.start()
 patcher_milvus_collection.start()
+patcher_milvus_has_collection.start()
 patcher_boto3.start()
 
 
@@ -30,7 +42,9 @@ from app.db.base import Base
 # Teardown hook to stop the patchers after tests are done
 def pytest_unconfigure(config):
     patcher_milvus_check.stop()
+    patcher_milvus_connect.stop()
     patcher_milvus_collection.stop()
+    patcher_milvus_has_collection.stop()
     patcher_boto3.stop()
 
 # --- Fixtures ---
@@ -0,0 +1,171 @@
+import io
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from fastapi import UploadFile
+
+from app import crud, schemas
+from app.api.v1.endpoints.artifacts import _create_version, _save_upload_file
+from app.core.storage import StorageClient
+from app.tasks.processing_tasks import (
+    _iter_version_text,
+    copy_artifact_index,
+    delete_orphan_blobs,
+    reindex_all_artifacts,
+)
+
+
+def make_storage() -> StorageClient:
+    storage = StorageClient.__new__(StorageClient)
+    storage.bucket_name = "test-bucket"
+    storage.s3 = MagicMock()
+    return storage
+
+
+def upload(db, storage, content: bytes, filename: str):
+    with patch("app.api.v1.endpoints.artifacts.get_storage_client", return_value=storage):
+        return _save_upload_file(db, UploadFile(file=io.BytesIO(content), filename=filename))
+
+
+def add_version(db, file_path: str, file_hash: str):
+    artifact = crud.create_artifact(db, schemas.ArtifactCreate(process_id="p", doc_type="ETP", created_by="u"))
+    version_in = schemas.ArtifactVersionCreate(file_path=file_path, file_hash=file_hash, version=1)
+    return crud.create_artifact_version(db, version_in, artifact_id=artifact.id)
+
+
+def test_identical_upload_reuses_blob(db):
+    storage = make_storage()
+
+    first_key, first_hash, first_new = upload(db, storage, b"same docx bytes", "tr-v1.docx")
+    second_key, second_hash, second_new = upload(db, storage, b"same docx bytes", "tr-v2.docx")
+
+    assert (second_key, second_hash) == (first_key, first_hash)
+    assert (first_new, second_new) == (True, False)
+    # The duplicate never reaches S3
+    storage.s3.put_object.assert_called_once()
+    storage.s3.delete_object.assert_not_called()
+
+
+def test_blob_is_released_with_its_last_version(db):
+    storage = make_storage()
+    key, file_hash, _ = upload(db, storage, b"consolidated etp", "etp.docx")
+    first = add_version(db, key, file_hash)
+    second = add_version(db, key, file_hash)
+    assert crud.get_blob(db, file_hash).ref_count == 2
+
+    delete_object = MagicMock()
+    crud.delete_artifact_version(db, first)
+    assert crud.delete_unreferenced_blob(db, file_hash, delete_object) is None
+    delete_object.assert_not_called()
+
+    crud.delete_artifact_version(db, second)
+    assert crud.delete_unreferenced_blob(db, file_hash, delete_object) == key
+    delete_object.assert_called_once_with(key)
+    assert crud.get_blob(db, file_hash) is None
+
+
+def test_failed_object_delete_keeps_the_blob(db):
+    storage = make_storage()
+    key, file_hash, _ = upload(db, storage, b"consolidated etp", "etp.docx")
+
+    with patch.object(db, "rollback") as rollback, pytest.raises(RuntimeError):
+        crud.delete_unreferenced_blob(db, file_hash, MagicMock(side_effect=RuntimeError("s3 down")))
+
+    # The row deletion is rolled back, not committed, when the object is kept
+    rollback.assert_called_once()
+
+
+def test_duplicate_upload_locks_the_blob(db):
+    storage = make_storage()
+    upload(db, storage, b"same docx bytes", "tr-v1.docx")
+
+    with patch("app.crud.lock_blob", wraps=crud.lock_blob) as lock_blob, \
+            patch("app.crud.get_blob") as get_blob:
+        _, file_hash, is_new = upload(db, storage, b"same docx bytes", "tr-v2.docx")
+
+    assert is_new is False
+    lock_blob.assert_called_once_with(db, file_hash)
+    get_blob.assert_not_called()
+
+
+def test_extracted_text_is_reused_per_blob(db):
+    storage = make_storage()
+    storage.s3.get_object.return_value = {"Body": io.BytesIO(b"plain text artifact")}
+    key, file_hash, _ = upload(db, storage, b"plain text artifact", "notes.txt")
+    first = add_version(db, key, file_hash)
+    second = add_version(db, key, file_hash)
+
+    with patch("app.tasks.processing_tasks.get_storage_client", return_value=storage):
+        assert "".join(_iter_version_text(db, first)) == "plain text artifact"
+        assert "".join(_iter_version_text(db, second)) == "plain text artifact"
+
+    storage.s3.get_object.assert_called_once()
+
+
+def test_failed_version_insert_releases_new_blob(db):
+    storage = make_storage()
+    artifact = crud.create_artifact(db, schemas.ArtifactCreate(process_id="p", doc_type="ETP", created_by="u"))
+    upload_file = UploadFile(file=io.BytesIO(b"orphan"), filename="etp.docx")
+
+    with patch("app.api.v1.endpoints.artifacts.get_storage_client", return_value=storage):
+        key, file_hash, _ = _save_upload_file(db, upload_file)
+        version_in = schemas.ArtifactVersionCreate(file_path=key, file_hash=file_hash, version=1)
+        # The fixture's session runs in one outer transaction that a rollback would discard
+        with patch("app.crud.create_artifact_version", side_effect=RuntimeError("insert failed")), \
+                patch.object(db, "rollback"):
+            with pytest.raises(RuntimeError):
+                _create_version(db, version_in, artifact.id)
+
+    assert crud.get_blob(db, file_hash) is None
+    storage.s3.delete_object.assert_called_once_with(Bucket="test-bucket", Key=key)
+
+
+def test_orphan_blobs_are_swept(db):
+    storage = make_storage()
+    orphan_key, orphan_hash, _ = upload(db, storage, b"orphan", "a.docx")
+    used_key, used_hash, _ = upload(db, storage, b"used", "b.docx")
+    add_version(db, used_key, used_hash)
+
+    with patch("app.tasks.processing_tasks.SessionLocal", return_value=db), \
+            patch("app.tasks.processing_tasks.get_storage_client", return_value=storage), \
+            patch("app.tasks.processing_tasks.BLOB_ORPHAN_GRACE_SECONDS", -60):
+        assert delete_orphan_blobs() == {"status": "complete", "deleted": 1}
+
+    assert crud.get_blob(db, orphan_hash) is None
+    assert crud.get_blob(db, used_hash) is not None
+    storage.s3.delete_object.assert_called_once_with(Bucket="test-bucket", Key=orphan_key)
+
+
+def test_duplicate_version_copies_the_index_of_its_blob(db):
+    storage = make_storage()
+    key, file_hash, _ = upload(db, storage, b"same etp", "etp.docx")
+    first_id = add_version(db, key, file_hash).id
+    second_id = add_version(db, key, file_hash).id
+    search_service = MagicMock()
+    search_service.copy_documents.return_value = 4
+
+    with patch("app.tasks.processing_tasks.SessionLocal", return_value=db), \
+            patch("app.tasks.processing_tasks.get_search_service", return_value=search_service), \
+            patch("app.tasks.processing_tasks.process_artifact") as process:
+        result = copy_artifact_index(second_id)
+
+    search_service.copy_documents.assert_called_once_with(first_id, second_id)
+    process.assert_not_called()
+    assert result["copied_from"] == first_id
+
+
+
+def test_reindex_all_artifacts_queues_every_version(db):
+    storage = make_storage()
+    key, file_hash, _ = upload(db, storage, b"etp", "etp.docx")
+    version_ids = [add_version(db, key, file_hash).id for _ in range(3)]
+
+    with patch("app.tasks.processing_tasks.SessionLocal", return_value=db), \
+            patch("app.tasks.processing_tasks.REINDEX_VERSIONS_PER_TASK", 2), \
+            patch("app.tasks.processing_tasks.reindex_artifacts") as reindex:
+        result = reindex_all_artifacts()
+
+    assert [c.args[0] for c in reindex.delay.call_args_list] == [version_ids[:2], version_ids[2:]]
+    assert result == {"status": "queued", "versions": 3}
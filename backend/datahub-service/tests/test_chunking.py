@@ -0,0 +1,21 @@
+from app.services.chunking import chunk_text
+
+
+def test_chunks_overlap_and_keep_offsets():
+    text = " ".join(f"palavra{i}" for i in range(400))
+    chunks = chunk_text(text, size=200, overlap=50)
+
+    assert chunks[0][0] == 0
+    for offset, chunk in chunks:
+        assert text[offset:offset + len(chunk)] == chunk
+        assert len(chunk) <= 200
+    # Each chunk starts before the previous one ends
+    for (prev_offset, prev_chunk), (offset, _) in zip(chunks, chunks[1:]):
+        assert prev_offset < offset < prev_offset + len(prev_chunk)
+    assert chunks[-1][0] + len(chunks[-1][1]) == len(text)
+
+
+def test_short_and_blank_texts():
+    assert chunk_text("ETP") == [(0, "ETP")]
+    assert chunk_text("   ") == []
+    assert chunk_text("") == []
@@ -0,0 +1,108 @@
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+FILE_HASH = "ab" * 32
+URL = f"/api/v1/artifacts/{uuid.uuid4()}/versions/1/download"
+
+
+class FakeBody:
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def iter_chunks(self, chunk_size):
+        yield self.content
+
+
+@pytest.fixture
+def storage():
+    version = SimpleNamespace(
+        file_path=f"blobs/{FILE_HASH}",
+        file_hash=FILE_HASH,
+        created_at=datetime(2026, 3, 2, 12, 30, 15, 123000, tzinfo=timezone.utc),
+    )
+    storage = MagicMock()
+    with patch("app.api.v1.endpoints.artifacts.crud.get_artifact_version", return_value=version), \
+            patch("app.api.v1.endpoints.artifacts.get_storage_client", return_value=storage):
+        yield storage
+
+
+def test_full_download_sends_validators(client, storage):
+    storage.download_file.return_value = {
+        "Body": FakeBody(b"%PDF-1.7 content"), "ContentLength": 16, "ContentType": "application/pdf",
+    }
+
+    response = client.get(URL)
+
+    assert response.status_code == 200
+    assert response.content == b"%PDF-1.7 content"
+    assert response.headers["etag"] == f'"{FILE_HASH}"'
+    assert response.headers["last-modified"] == "Mon, 02 Mar 2026 12:30:15 GMT"
+    assert "immutable" in response.headers["cache-control"]
+    assert response.headers["accept-ranges"] == "bytes"
+    storage.download_file.assert_called_once_with(f"blobs/{FILE_HASH}", byte_range=None)
+
+
+@pytest.mark.parametrize("headers", [
+    {"If-None-Match": f'W/"other", "{FILE_HASH}"'},
+    {"If-None-Match": "*"},
+    {"If-Modified-Since": "Mon, 02 Mar 2026 12:30:15 GMT"},
+])
+def test_revalidation_returns_304_without_s3(client, storage, headers):
+    response = client.get(URL, headers=headers)
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == f'"{FILE_HASH}"'
+    storage.download_file.assert_not_called()
+
+
+def test_stale_etag_downloads_again(client, storage):
+    storage.download_file.return_value = {"Body": FakeBody(b"x"), "ContentLength": 1, "ContentType": "text/plain"}
+
+    response = client.get(URL, headers={"If-None-Match": '"old"', "If-Modified-Since": "Tue, 01 Jan 2030 00:00:00 GMT"})
+
+    assert response.status_code == 200
+
+
+def test_range_is_served_from_s3_ranged_get(client, storage):
+    storage.download_file.return_value = {
+        "Body": FakeBody(b"0123"), "ContentLength": 4, "ContentType": "application/pdf",
+        "ContentRange": "bytes 10-13/1000",
+    }
+
+    response = client.get(URL, headers={"Range": "bytes=10-13"})
+
+    assert response.status_code == 206
+    assert response.content == b"0123"
+    assert response.headers["content-range"] == "bytes 10-13/1000"
+    assert response.headers["content-length"] == "4"
+    storage.download_file.assert_called_once_with(f"blobs/{FILE_HASH}", byte_range="bytes=10-13")
+
+
+@pytest.mark.parametrize("headers", [
+    {"Range": "bytes=0-1, 5-6"},
+    {"Range": "bytes=0-1", "If-Range": '"outdated"'},
+])
+def test_unsupported_or_outdated_ranges_send_whole_file(client, storage, headers):
+    storage.download_file.return_value = {"Body": FakeBody(b"abc"), "ContentLength": 3, "ContentType": "text/plain"}
+
+    response = client.get(URL, headers=headers)
+
+    assert response.status_code == 200
+    storage.download_file.assert_called_once_with(f"blobs/{FILE_HASH}", byte_range=None)
+
+
+def test_unsatisfiable_range_returns_416(client, storage):
+    storage.download_file.side_effect = ClientError(
+        {"Error": {"Code": "InvalidRange", "ActualObjectSize": "1000"}}, "GetObject"
+    )
+
+    response = client.get(URL, headers={"Range": "bytes=5000-"})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */1000"
@@ -0,0 +1,39 @@
+import math
+from unittest.mock import patch
+
+import pytest
+
+from app.services import embeddings
+from app.services.embeddings import EMBEDDING_DIM, HashingEmbeddings
+
+
+def test_hashing_embeddings_are_batched_dense_and_normalized():
+    model = HashingEmbeddings()
+    vectors = model.embed_documents(["Termo de Referência", "termo de referência", "Obra de pavimentação"])
+
+    assert len(vectors) == 3
+    assert all(len(vector) == EMBEDDING_DIM for vector in vectors)
+    assert math.isclose(sum(v * v for v in vectors[0]), 1.0, rel_tol=1e-6)
+    assert vectors[0] == vectors[1]
+    assert vectors[0] != vectors[2]
+
+
+def test_hashing_backend_is_opt_in():
+    embeddings.get_embedding_model.cache_clear()
+    with patch.object(embeddings, "EMBEDDING_BACKEND", "hashing"), \
+            patch.object(embeddings, "embedding_store_from_url", return_value=None):
+        model = embeddings.get_embedding_model()
+    embeddings.get_embedding_model.cache_clear()
+
+    assert model.model == f"hashing-{EMBEDDING_DIM}"
+    assert len(model.embed_query("ETP")) == EMBEDDING_DIM
+
+
+def test_missing_sentence_transformers_fails_loudly():
+    embeddings.get_embedding_model.cache_clear()
+    with patch.object(embeddings, "EMBEDDING_BACKEND", "sentence-transformers"), \
+            patch.object(embeddings, "SentenceTransformerEmbeddings", side_effect=ImportError("missing")), \
+            patch.object(embeddings, "embedding_store_from_url", return_value=None):
+        with pytest.raises(ImportError):
+            embeddings.get_embedding_model()
+    embeddings.get_embedding_model.cache_clear()
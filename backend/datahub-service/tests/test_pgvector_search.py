@@ -0,0 +1,65 @@
+import uuid
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+from app.db.models import Artifact, ArtifactIndex, ArtifactVersion
+from app.services.pgvector_search import PgVectorSearchService
+
+
+def test_search_statement_filters_and_orders_in_one_query():
+    statement = PgVectorSearchService.search_statement([0.1] * 768, limit=25, org_id="org-1", doc_type="ETP")
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+
+    assert "WHERE artifact_index.org_id = %(org_id_1)s AND artifact_index.doc_type = %(doc_type_1)s" in sql
+    assert "ORDER BY artifact_index.embedding <-> %(embedding_1)s" in sql
+    assert "LIMIT %(param_1)s" in sql
+
+
+def test_add_documents_copies_artifact_metadata(db):
+    artifact = Artifact(id=uuid.uuid4(), process_id="p-1", doc_type="TR", org_id="org-1", created_by="u")
+    version = ArtifactVersion(artifact=artifact, version=1, file_path="a/1", file_hash="h1")
+    db.add_all([artifact, version])
+    db.commit()
+
+    embedding_model = MagicMock()
+    embedding_model.embed_documents.side_effect = lambda texts: [[0.0] * 768 for _ in texts]
+    service = PgVectorSearchService(session_factory=lambda: db)
+    with patch("app.services.pgvector_search.get_embedding_model", return_value=embedding_model):
+        service.add_documents([(version.id, "x" * 1500), (9999, "unknown version")])
+        service.add_document(version.id, "short text")
+
+    rows = db.query(ArtifactIndex).all()
+    assert [(row.artifact_version_id, row.chunk_no, row.doc_type, row.org_id) for row in rows] == [
+        (version.id, 0, "TR", "org-1"),
+    ]
+
+
+def test_search_endpoint_rejects_filters_on_milvus(client):
+    response = client.get("/api/v1/search/?q=test+query&org_id=org-1")
+
+    assert response.status_code == 400
+
+
+def test_copy_documents_reuses_rows_of_same_content(db):
+    source_artifact = Artifact(id=uuid.uuid4(), process_id="p-1", doc_type="TR", org_id="org-1", created_by="u")
+    target_artifact = Artifact(id=uuid.uuid4(), process_id="p-2", doc_type="ETP", org_id="org-2", created_by="u")
+    source = ArtifactVersion(artifact=source_artifact, version=1, file_path="blobs/h1", file_hash="h1")
+    target = ArtifactVersion(artifact=target_artifact, version=1, file_path="blobs/h1", file_hash="h1")
+    db.add_all([source_artifact, target_artifact, source, target])
+    db.commit()
+    source_id, target_id, target_artifact_id = source.id, target.id, target_artifact.id
+
+    embedding_model = MagicMock()
+    embedding_model.embed_documents.side_effect = lambda texts: [[0.5] * 768 for _ in texts]
+    service = PgVectorSearchService(session_factory=lambda: db)
+    with patch("app.services.pgvector_search.get_embedding_model", return_value=embedding_model):
+        service.add_documents([(source_id, "x" * 1500)])
+
+    assert service.copy_documents(source_id, target_id) == 2
+    embedding_model.embed_documents.assert_called_once()
+    rows = db.query(ArtifactIndex).filter(ArtifactIndex.artifact_version_id == target_id).all()
+    assert [(row.artifact_id, row.chunk_no, row.doc_type, row.org_id, list(row.embedding)[:2]) for row in rows] == [
+        (target_artifact_id, 0, "ETP", "org-2", [0.5, 0.5]),
+        (target_artifact_id, 1, "ETP", "org-2", [0.5, 0.5]),
+    ]
@@ -0,0 +1,49 @@
+import os
+from unittest.mock import MagicMock
+
+from app.core.providers import LazyProvider
+
+
+def test_created_on_first_use_only():
+    factory = MagicMock(side_effect=lambda: object())
+    provider = LazyProvider("test", factory)
+
+    factory.assert_not_called()
+    first = provider.get()
+    assert provider.get() is first
+    factory.assert_called_once()
+
+
+def test_unhealthy_instance_is_discarded_and_recreated():
+    healthy = {"value": True}
+    discarded = []
+    provider = LazyProvider(
+        "test",
+        lambda: object(),
+        health_check=lambda instance: healthy["value"],
+        on_discard=discarded.append,
+        check_interval=0,
+    )
+
+    first = provider.get()
+    assert provider.get() is first
+
+    healthy["value"] = False
+    second = provider.get()
+    assert second is not first
+    assert discarded == [first]
+
+
+def test_forked_child_builds_its_own_instance():
+    provider = LazyProvider("test", lambda: os.getpid())
+    assert provider.get() == os.getpid()
+
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_end)
+        os.write(write_end, b"1" if provider.get() == os.getpid() else b"0")
+        os._exit(0)
+    os.close(write_end)
+    assert os.read(read_end, 1) == b"1"
+    os.waitpid(pid, 0)
@@ -16,3 +16,30 @@ def test_search_artifacts(client: TestClient):
         assert len(data["results"]) == 2
         assert data["results"][0]["score"] == 0.9
         mock_search.assert_called_once_with(query_text="test query")
+
+
+def test_search_groups_chunk_hits_per_artifact():
+    from types import SimpleNamespace
+    from app.services.semantic_search import get_search_service
+
+    search_service = get_search_service()
+
+    def hit(artifact_version_id, chunk_no, offset, distance):
+        fields = {"artifact_version_id": artifact_version_id, "chunk_no": chunk_no, "offset": offset}
+        return SimpleNamespace(entity=SimpleNamespace(get=fields.get), distance=distance)
+
+    hits = [hit(7, 3, 2400, 0.1), hit(9, 0, 0, 0.2), hit(7, 1, 800, 0.3), hit(9, 5, 4000, 0.4)]
+    with patch.object(search_service, "_generate_embedding", return_value=[0.0]), \
+            patch.object(search_service, "collection") as collection:
+        collection.search.return_value = [hits]
+        results = search_service.search("pavimentação", top_k=1)
+
+    assert collection.search.call_args.kwargs["limit"] == 5
+    assert results == [{
+        "artifact_version_id": 7,
+        "score": 0.1,
+        "passages": [
+            {"chunk_no": 3, "offset": 2400, "score": 0.1},
+            {"chunk_no": 1, "offset": 800, "score": 0.3},
+        ],
+    }]
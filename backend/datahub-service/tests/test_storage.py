@@ -0,0 +1,84 @@
+import hashlib
+import io
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import UploadFile
+
+from app.api.v1.endpoints.artifacts import _save_upload_file
+from app.core.storage import StorageClient
+
+PART_SIZE = 5 * 1024 * 1024
+
+
+def make_storage() -> StorageClient:
+    storage = StorageClient.__new__(StorageClient)
+    storage.bucket_name = "test-bucket"
+    storage.s3 = MagicMock()
+    storage.s3.create_multipart_upload.return_value = {"UploadId": "upload-1"}
+    storage.s3.upload_part.side_effect = lambda **kwargs: {"ETag": f"etag-{kwargs['PartNumber']}"}
+    return storage
+
+
+def test_small_stream_uses_single_put():
+    storage = make_storage()
+    chunks = []
+
+    size = storage.upload_stream(io.BytesIO(b"small file"), "key", on_chunk=chunks.append, part_size=PART_SIZE)
+
+    assert size == 10
+    assert chunks == [b"small file"]
+    storage.s3.put_object.assert_called_once_with(Bucket="test-bucket", Key="key", Body=b"small file")
+    storage.s3.create_multipart_upload.assert_not_called()
+
+
+def test_large_stream_is_uploaded_in_parts():
+    storage = make_storage()
+    data = b"x" * (2 * PART_SIZE + 10)
+    digest = hashlib.sha256()
+
+    size = storage.upload_stream(io.BytesIO(data), "key", on_chunk=digest.update, part_size=PART_SIZE)
+
+    assert size == len(data)
+    assert digest.hexdigest() == hashlib.sha256(data).hexdigest()
+    assert [call.kwargs["PartNumber"] for call in storage.s3.upload_part.call_args_list] == [1, 2, 3]
+    storage.s3.complete_multipart_upload.assert_called_once_with(
+        Bucket="test-bucket",
+        Key="key",
+        UploadId="upload-1",
+        MultipartUpload={"Parts": [
+            {"PartNumber": 1, "ETag": "etag-1"},
+            {"PartNumber": 2, "ETag": "etag-2"},
+            {"PartNumber": 3, "ETag": "etag-3"},
+        ]},
+    )
+
+
+def test_failed_multipart_upload_is_aborted():
+    storage = make_storage()
+    storage.s3.upload_part.side_effect = RuntimeError("connection reset")
+
+    with pytest.raises(RuntimeError):
+        storage.upload_stream(io.BytesIO(b"x" * (PART_SIZE + 1)), "key", part_size=PART_SIZE)
+
+    storage.s3.abort_multipart_upload.assert_called_once_with(Bucket="test-bucket", Key="key", UploadId="upload-1")
+    storage.s3.complete_multipart_upload.assert_not_called()
+
+
+def test_save_upload_file_hashes_before_uploading(db):
+    storage = make_storage()
+    content = b"%PDF-1.4 scanned pages"
+    upload = UploadFile(file=io.BytesIO(content), filename="edital.pdf")
+
+    with patch("app.api.v1.endpoints.artifacts.get_storage_client", return_value=storage):
+        object_name, file_hash, is_new = _save_upload_file(db, upload)
+
+    assert is_new
+    assert file_hash == hashlib.sha256(content).hexdigest()
+    assert object_name == f"blobs/{file_hash}"
+    # Written once, straight to its content-addressed key
+    storage.s3.put_object.assert_called_once()
+    assert storage.s3.put_object.call_args.kwargs["Key"] == object_name
+    assert storage.s3.put_object.call_args.kwargs["Body"] == content
+    storage.s3.copy.assert_not_called()
+    storage.s3.delete_object.assert_not_called()
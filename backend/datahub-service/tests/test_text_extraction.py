@@ -0,0 +1,135 @@
+import io
+import os
+import time
+from unittest.mock import patch
+
+import billiard
+import PyPDF2
+import pytest
+
+from app.services import text_extraction
+from app.services.chunking import chunk_text, iter_chunks
+
+
+def make_pdf(page_count: int, lines_per_page: int = 40) -> bytes:
+    """Builds a text PDF whose page i contains "pagina <i>" lines."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_refs = []
+    for page in range(page_count):
+        lines = b" ".join(
+            b"(pagina %d linha %d do termo de referencia) Tj 0 -14 Td" % (page, line)
+            for line in range(lines_per_page)
+        )
+        stream = b"BT /F1 10 Tf 40 800 Td " + lines + b" ET"
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        page_refs.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(page_refs), page_count)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def legacy_extract_text_from_pdf(content: bytes) -> str:
+    # The former implementation, kept as the benchmark baseline
+    text = ""
+    with io.BytesIO(content) as f:
+        reader = PyPDF2.PdfReader(f)
+        for page in reader.pages:
+            text += page.extract_text()
+    return text
+
+
+def test_pages_are_extracted_in_order_across_the_pool():
+    content = make_pdf(12, lines_per_page=3)
+
+    with patch.object(text_extraction, "EXTRACTION_PROCESSES", 2), \
+            patch.object(text_extraction, "EXTRACTION_PAGES_PER_TASK", 5):
+        text_extraction.extraction_pool_provider.reset()
+        pieces = list(text_extraction.iter_text(content))
+    text_extraction.extraction_pool_provider.reset()
+
+    assert len(pieces) == 12
+    for page, piece in enumerate(pieces):
+        assert piece.startswith(f"pagina {page} linha 0")
+        assert piece.endswith("\n")
+
+
+def test_small_documents_are_extracted_in_process():
+    content = make_pdf(2, lines_per_page=1)
+
+    with patch.object(text_extraction.extraction_pool_provider, "get") as get_pool:
+        text = text_extraction.extract_text(content)
+
+    get_pool.assert_not_called()
+    assert "pagina 1 linha 0" in text
+
+
+def test_pool_starts_inside_a_daemonic_worker():
+    # Celery prefork children are daemonic billiard processes
+    queue = billiard.Queue()
+    worker = billiard.Process(target=_extract_in_child, args=(make_pdf(12, lines_per_page=3), queue), daemon=True)
+    worker.start()
+    pieces = queue.get(timeout=120)
+    worker.join(timeout=30)
+
+    assert [piece.split(" linha")[0] for piece in pieces] == [f"pagina {page}" for page in range(12)]
+    assert worker.exitcode == 0
+
+
+def _extract_in_child(content: bytes, queue) -> None:
+    text_extraction.EXTRACTION_PROCESSES = 2
+    text_extraction.EXTRACTION_PAGES_PER_TASK = 5
+    text_extraction.extraction_pool_provider.reset()
+    try:
+        queue.put(list(text_extraction.iter_text(content)))
+    finally:
+        text_extraction.extraction_pool_provider.reset()
+
+
+def test_streamed_pages_chunk_like_the_joined_text():
+    pages = list(text_extraction.iter_text(make_pdf(6)))
+
+    assert list(iter_chunks(iter(pages), size=300, overlap=60)) == chunk_text("".join(pages), size=300, overlap=60)
+
+
+@pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run")
+def test_benchmark_large_pdf():
+    content = make_pdf(int(os.environ.get("BENCHMARK_PDF_PAGES", "600")))
+
+    def timed(extract):
+        started = time.perf_counter()
+        result = extract()
+        return result, time.perf_counter() - started
+
+    legacy, legacy_seconds = timed(lambda: legacy_extract_text_from_pdf(content))
+    with patch.object(text_extraction, "EXTRACTION_PROCESSES", 0):
+        serial, serial_seconds = timed(lambda: list(iter_chunks(text_extraction.iter_text(content))))
+    text_extraction.extraction_pool_provider.reset()
+    list(text_extraction.iter_text(content))  # spawns the pool processes, paid once per worker
+    pooled, pooled_seconds = timed(lambda: list(iter_chunks(text_extraction.iter_text(content))))
+    text_extraction.extraction_pool_provider.reset()
+
+    print(
+        f"\n{len(content) / 1e6:.1f} MB PDF: legacy {legacy_seconds:.2f}s, "
+        f"in-process with streamed chunking {serial_seconds:.2f}s, "
+        f"{text_extraction.EXTRACTION_PROCESSES} processes with streamed chunking {pooled_seconds:.2f}s"
+    )
+    assert legacy and serial == pooled
@@ -8,6 +8,7 @@ from app.api.deps import get_db
 from app.api.v1.dependencies import get_current_user
 import json
 from app.core.rule_engine_wrapper import RuleEngineWrapper
+from app.services.render_cache import invalidate_documento
 from app.schemas.etp import ETPCreate, ETPSchema, ETPUpdate, ETPPatch
 from nexora_auth.audit import audited
 
@@ -77,6 +78,7 @@ def patch_etp(
         raise HTTPException(status_code=404, detail="ETP not found")
 
     etp = crud_etp.etp.patch(db=db, db_obj=etp, obj_in=etp_in, version=if_match)
+    invalidate_documento("etp", id)
     return etp
 
 
@@ -95,6 +97,7 @@ def update_etp(
     if not etp:
         raise HTTPException(status_code=404, detail="ETP not found")
     etp = crud_etp.etp.update(db=db, db_obj=etp, obj_in=etp_in)
+    invalidate_documento("etp", id)
     return etp
 
 
@@ -111,6 +114,7 @@ def delete_etp(
     if not etp:
         raise HTTPException(status_code=404, detail="ETP not found")
     crud_etp.etp.remove(db=db, id=id)
+    invalidate_documento("etp", id)
 
 
 from app.utils.pdf_utils import generate_pdf_response
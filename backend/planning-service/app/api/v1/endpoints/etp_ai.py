@@ -5,6 +5,7 @@ from app import schemas
 from app.api.deps import get_db
 from app.api.v1.dependencies import get_current_user
 from app.services import etp_ai_service
+from app.utils.sse import format_sse, sse_response
 
 router = APIRouter()
 
@@ -13,7 +14,7 @@ router = APIRouter()
     "/etp/{etp_id}/generate-section/{section_name}",
     response_model=schemas.ETPGenerateSectionOut,
 )
-def generate_etp_section(
+async def generate_etp_section(
     *,
     db: Session = Depends(get_db),
     etp_id: int,
@@ -25,7 +26,7 @@ def generate_etp_section(
     Generate content for a specific ETP section using AI.
     """
     try:
-        result = etp_ai_service.generate_section_content(
+        result = await etp_ai_service.generate_section_content(
             db=db,
             etp_id=etp_id,
             section_name=section_name,
@@ -56,3 +57,75 @@ def generate_etp_field(
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/etp/{etp_id}/generate/{field}/stream")
+async def stream_etp_field(
+    *,
+    db: Session = Depends(get_db),
+    etp_id: int,
+    field: str,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Stream the content generated for a specific ETP field as Server-Sent Events.
+
+    Emits "token" events with the new text, then a "done" event with the same
+    payload as the non-streaming endpoint (or an "error" event).
+    """
+    try:
+        stream = await etp_ai_service.stream_field(db=db, etp_id=etp_id, field=field)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def events():
+        try:
+            async for chunk in stream:
+                if chunk["delta"]:
+                    yield format_sse({"delta": chunk["delta"]}, event="token")
+                else:
+                    chunk.pop("delta")
+                    yield format_sse(chunk, event="done")
+        except Exception as e:
+            yield format_sse({"detail": str(e)}, event="error")
+
+    return sse_response(events())
+
+
+@router.post("/etp/{etp_id}/generate-fields")
+async def generate_etp_fields(
+    *,
+    db: Session = Depends(get_db),
+    etp_id: int,
+    payload: schemas.ETPGenerateFieldsIn,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Generate several ETP fields concurrently, streamed as Server-Sent Events.
+
+    Emits one "field" event per field as soon as it is generated (with
+    "error" when that field failed), then a "done" event with the totals.
+    """
+    try:
+        results = await etp_ai_service.generate_fields(db=db, etp_id=etp_id, fields=payload.fields)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def events():
+        generated, failed = 0, 0
+        try:
+            async for result in results:
+                if "error" in result:
+                    failed += 1
+                else:
+                    generated += 1
+                yield format_sse(result, event="field")
+            yield format_sse({"generated": generated, "failed": failed}, event="done")
+        except Exception as e:
+            yield format_sse({"detail": str(e)}, event="error")
+
+    return sse_response(events())
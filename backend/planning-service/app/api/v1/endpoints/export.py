@@ -0,0 +1,62 @@
+"""
+Endpoint de exportação em lote de ETPs e TRs
+"""
+
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db
+from app.api.v1.dependencies import get_current_user
+from app.core.config import EXPORT_MAX_DOCUMENTS
+from app.services.bulk_export import FORMATOS, MODELOS_DOCUMENTO, iter_export_zip, listar_documentos
+
+router = APIRouter()
+
+
+@router.get("/documentos", response_model=None)
+def exportar_documentos(
+    tipo: str = Query("todos", description="etp, tr ou todos"),
+    instituicao_id: Optional[int] = None,
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None,
+    formato: str = Query("docx", description="docx ou pdf"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+) -> Any:
+    """
+    Exporta em um ZIP os ETPs/TRs de uma instituição criados no período
+
+    Os documentos são gerados em paralelo e o ZIP é enviado à medida que
+    ficam prontos. Ao final vêm `manifest.json` (arquivos, SHA-256, tamanhos
+    e documentos que não puderam ser gerados) e `SHA256SUMS`, verificável
+    com `sha256sum -c`.
+    """
+    tipos = list(MODELOS_DOCUMENTO) if tipo == "todos" else [tipo]
+    if any(t not in MODELOS_DOCUMENTO for t in tipos):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Tipo inválido: use etp, tr ou todos")
+    if formato not in FORMATOS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Formato inválido: use docx ou pdf")
+
+    documentos = listar_documentos(db, tipos, instituicao_id, data_inicio, data_fim)
+    if len(documentos) > EXPORT_MAX_DOCUMENTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{len(documentos)} documentos encontrados; o limite por exportação é {EXPORT_MAX_DOCUMENTS}. Reduza o período.",
+        )
+
+    filtros = {
+        "tipo": tipo,
+        "instituicao_id": instituicao_id,
+        "data_inicio": data_inicio,
+        "data_fim": data_fim,
+    }
+    filename = f"documentos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return StreamingResponse(
+        iter_export_zip(documentos, formato, filtros),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
@@ -1,30 +1,99 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from app.rag.ingestor import ingest_document
+from typing import Optional
+
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from app.core.config import RAG_UPLOAD_DIR
+from app.rag.ingestor import (
+    delete_document,
+    document_id_from_filename,
+    ingest_document,
+    validate_document_id,
+)
+from app.rag.jobs import ingestion_jobs, upload_file_prefix
+import hashlib
 import tempfile
 import os
 
 router = APIRouter()
 
-@router.post("/rag/ingest")
-async def ingest_pdf(file: UploadFile = File(...)):
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+async def _save_upload(file: UploadFile) -> tuple:
+    """
+    Streams the upload to a temporary file in fixed-size chunks, hashing it
+    on the way, so the PDF is never held in memory as a whole.
+
+    Returns:
+        The temporary file path and the SHA-256 of its content.
+    """
+    digest = hashlib.sha256()
+    tmp = tempfile.NamedTemporaryFile(delete=False, prefix=upload_file_prefix(), suffix=".pdf", dir=RAG_UPLOAD_DIR)
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            await run_in_threadpool(tmp.write, chunk)
+    except BaseException:
+        tmp.close()
+        os.remove(tmp.name)
+        raise
+    tmp.close()
+    return tmp.name, digest.hexdigest()
+
+
+@router.post("/rag/ingest", status_code=status.HTTP_202_ACCEPTED)
+async def ingest_pdf(file: UploadFile = File(...), document_id: Optional[str] = Form(None)):
     """
     Endpoint to upload a PDF file and ingest it into the vector store.
+
+    The ingestion runs as a background job of this instance (at most
+    RAG_INGEST_MAX_CONCURRENT_JOBS at once, later ones wait as "queued");
+    poll `/rag/ingest/{job_id}` for its progress, from any instance when job
+    state is kept in Redis. Uploading a new version of a document (same `document_id`,
+    or the same file name when omitted) only embeds its new chunks and
+    removes the superseded ones.
     """
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Invalid file type. Only PDFs are accepted.")
 
+    source = file.filename or "document.pdf"
+    document_id = document_id or document_id_from_filename(source)
     try:
-        # Create a temporary file to store the uploaded PDF
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(await file.read())
-            tmp_path = tmp.name
+        validate_document_id(document_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    tmp_path, version = await _save_upload(file)
+
+    job = await ingestion_jobs.create(document_id=document_id, source=source)
+    ingestion_jobs.start(
+        job,
+        ingest_document(tmp_path, document_id=document_id, source=source, version=version, job=job),
+        cleanup_path=tmp_path,
+    )
+    return job.as_dict()
 
-        # Ingest the document from the temporary file path
-        ingest_document(tmp_path)
 
-    finally:
-        # Clean up the temporary file
-        if 'tmp_path' in locals() and os.path.exists(tmp_path):
-            os.remove(tmp_path)
+@router.get("/rag/ingest/{job_id}")
+async def get_ingestion_job(job_id: str):
+    """
+    Returns the status and progress of a RAG ingestion job.
+    """
+    job = await ingestion_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Ingestion job {job_id} not found.")
+    return job.as_dict()
 
-    return {"message": "Document ingested successfully."}
+
+@router.delete("/rag/documents/{document_id}")
+async def delete_rag_document(document_id: str):
+    """
+    Removes every chunk of a document from the vector store.
+    """
+    try:
+        deleted = await run_in_threadpool(delete_document, document_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"Document {document_id} not found.")
+    return {"document_id": document_id, "deleted": deleted}
@@ -17,6 +17,7 @@ from app.schemas.etp_schemas import (
     PaginationParams
 )
 from app.db.models.templates_gestao import ModeloSuperior, ModeloInstitucional
+from app.services.render_cache import invalidate_template
 
 router = APIRouter()
 
@@ -292,6 +293,9 @@ async def atualizar_modelo_institucional(
     db.commit()
     db.refresh(db_modelo)
     
+    # Documentos gerados com a versão anterior do modelo
+    invalidate_template(modelo_id)
+    
     return db_modelo
 
 
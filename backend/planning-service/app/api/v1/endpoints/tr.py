@@ -21,6 +21,7 @@ import uuid
 from app.api.v1.dependencies import get_current_user
 from app.db.models.tr import TRType
 from app.services.document_generator import DocumentGenerator
+from app.services.render_cache import invalidate_documento
 from app.services.etp_to_tr_transformer import build_tr_from_etp
 
 router = APIRouter()
@@ -396,6 +397,7 @@ async def atualizar_tr(
     
     db.commit()
     db.refresh(tr)
+    invalidate_documento("tr", documento_id)
     
     return {
         "success": True,
@@ -440,6 +442,7 @@ async def excluir_tr(
     
     db.delete(tr)
     db.commit()
+    invalidate_documento("tr", documento_id)
     
     return {
         "success": True,
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from app.llm.chains.technical_specs_chain import get_technical_specs_chain
 from langchain_core.runnables import Runnable
+from app.utils.sse import format_sse, sse_response
 
 router = APIRouter()
 
@@ -21,3 +22,28 @@ async def generate_technical_specs(
         return {"technical_specs": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/tr/generate/technical-specs/stream")
+async def stream_technical_specs(
+    request: TechnicalSpecsRequest,
+    chain: Runnable = Depends(get_technical_specs_chain)
+):
+    """
+    Streams the 'Technical Specifications of the Object' section as Server-Sent Events.
+
+    Emits "token" events as the chain produces text and a final "done" event
+    with the complete specification (or an "error" event).
+    """
+    async def events():
+        chunks = []
+        try:
+            async for chunk in chain.astream(request.object_description):
+                if chunk:
+                    chunks.append(chunk)
+                    yield format_sse({"delta": chunk}, event="token")
+            yield format_sse({"technical_specs": "".join(chunks)}, event="done")
+        except Exception as e:
+            yield format_sse({"detail": str(e)}, event="error")
+
+    return sse_response(events())
@@ -1,5 +1,79 @@
+import os
+
 # In a real application, these values would be loaded from a secure source
 SECRET_KEY = "a_very_secret_key"  # This should be securely managed
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 API_V1_STR = "/api/v1"
+
+# Token budget for the ETP data embedded in AI field generation prompts
+ETP_PROMPT_CONTEXT_TOKEN_BUDGET = int(os.getenv("ETP_PROMPT_CONTEXT_TOKEN_BUDGET", "2000"))
+
+# Maximum number of ETP fields generated concurrently by the batch endpoint
+ETP_BATCH_GENERATION_CONCURRENCY = int(os.getenv("ETP_BATCH_GENERATION_CONCURRENCY", "4"))
+
+# Vector store used by the RAG chains
+MILVUS_HOST = os.getenv("MILVUS_HOST", "milvus")
+MILVUS_PORT = int(os.getenv("MILVUS_PORT", "19530"))
+RAG_COLLECTION_NAME = os.getenv("RAG_COLLECTION_NAME", "rag_documents")
+
+# Per-document chunk collection written by the incremental ingestion. With
+# RAG_READ_CHUNK_COLLECTION "auto", the chains read it unless a non-empty
+# RAG_COLLECTION_NAME exists; the operator then copies that one over
+# (python -m app.rag.migrate_collection) and sets RAG_READ_CHUNK_COLLECTION
+# to "true" ("false" keeps reading the legacy collection)
+RAG_CHUNK_COLLECTION_NAME = os.getenv("RAG_CHUNK_COLLECTION_NAME", "rag_document_chunks")
+RAG_READ_CHUNK_COLLECTION = os.getenv("RAG_READ_CHUNK_COLLECTION", "auto").lower()
+
+# Connection pool shared by every OpenAI client built by app.llm.registry
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+
+# Comma-separated chain names built at startup (e.g. "risk_analysis,technical_specs")
+LLM_WARMUP_CHAINS = [name.strip() for name in os.getenv("LLM_WARMUP_CHAINS", "").split(",") if name.strip()]
+
+# RAG ingestion pipeline: page extraction processes (0 = extract in a thread),
+# pages per extraction task, chunks per embedding batch and concurrent batches
+RAG_INGEST_PROCESSES = int(os.getenv("RAG_INGEST_PROCESSES", str(min(os.cpu_count() or 1, 4))))
+RAG_INGEST_PAGES_PER_TASK = int(os.getenv("RAG_INGEST_PAGES_PER_TASK", "16"))
+RAG_INGEST_EMBED_BATCH_SIZE = int(os.getenv("RAG_INGEST_EMBED_BATCH_SIZE", "64"))
+RAG_INGEST_EMBED_CONCURRENCY = int(os.getenv("RAG_INGEST_EMBED_CONCURRENCY", "4"))
+
+# Background RAG ingestion jobs (app.rag.jobs): Redis holding their state for
+# every instance (kept in process memory when empty), jobs run at once per
+# process, seconds their state is kept and directory of the uploaded PDFs
+RAG_INGEST_JOB_REDIS_URL = os.getenv("RAG_INGEST_JOB_REDIS_URL") or os.getenv("REDIS_URL", "")
+RAG_INGEST_MAX_CONCURRENT_JOBS = int(os.getenv("RAG_INGEST_MAX_CONCURRENT_JOBS", "2"))
+RAG_INGEST_JOB_TTL_SECONDS = int(os.getenv("RAG_INGEST_JOB_TTL_SECONDS", "86400"))
+RAG_UPLOAD_DIR = os.getenv("RAG_UPLOAD_DIR", "/tmp/nexora-rag-uploads")
+
+# Hybrid (BM25 + vector) retrieval of the RAG chains: chunks kept, candidates
+# fetched from each retriever, RRF constant and BM25 index refresh interval
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "4"))
+RAG_FETCH_K = int(os.getenv("RAG_FETCH_K", "20"))
+RAG_RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+RAG_BM25_REFRESH_SECONDS = int(os.getenv("RAG_BM25_REFRESH_SECONDS", "300"))
+
+# DOCX -> PDF conversion (app.pdf): renderer ("auto", "libreoffice" or
+# "reportlab"), warm worker processes, per-document timeout, overall deadline
+# (queue wait included) and queue limit of a request, and the cache of
+# rendered PDFs keyed by the DOCX hash
+PDF_RENDERER = os.getenv("PDF_RENDERER", "auto")
+SOFFICE_BINARY = os.getenv("SOFFICE_BINARY", "soffice")
+PDF_CONVERTER_WORKERS = int(os.getenv("PDF_CONVERTER_WORKERS", "2"))
+PDF_CONVERSION_TIMEOUT_SECONDS = float(os.getenv("PDF_CONVERSION_TIMEOUT_SECONDS", "60"))
+PDF_CONVERSION_DEADLINE_SECONDS = float(os.getenv("PDF_CONVERSION_DEADLINE_SECONDS", "120"))
+PDF_CONVERTER_MAX_QUEUE = int(os.getenv("PDF_CONVERTER_MAX_QUEUE", "16"))
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", "/tmp/nexora-pdf-cache")
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Cache of generated ETP/TR DOCX files, keyed by document, template and
+# generator versions
+DOCX_CACHE_DIR = os.getenv("DOCX_CACHE_DIR", "/tmp/nexora-docx-cache")
+DOCX_CACHE_MAX_BYTES = int(os.getenv("DOCX_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Bulk ETP/TR export (/export/documentos): rendering processes (0 = one
+# thread in the API process), documents per rendering task and the maximum
+# number of documents per export
+EXPORT_PROCESSES = int(os.getenv("EXPORT_PROCESSES", str(min(os.cpu_count() or 1, 4))))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "25"))
+EXPORT_MAX_DOCUMENTS = int(os.getenv("EXPORT_MAX_DOCUMENTS", "5000"))
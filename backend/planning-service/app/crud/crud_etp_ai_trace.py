@@ -1,3 +1,5 @@
+from typing import List
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.db.models.etp_ai_trace import ETPAITrace
 from app.schemas.etp_ai_trace_schemas import ETPAITraceCreate
@@ -11,3 +13,12 @@ def create_trace(db: Session, trace_in: ETPAITraceCreate) -> ETPAITrace:
     db.commit()
     db.refresh(trace)
     return trace
+
+def create_traces(db: Session, traces_in: List[ETPAITraceCreate]) -> None:
+    """
+    Creates several ETP AI trace records with a single bulk INSERT.
+    """
+    if not traces_in:
+        return
+    db.execute(insert(ETPAITrace), [trace_in.dict() for trace_in in traces_in])
+    db.commit()
@@ -1,7 +1,11 @@
+import asyncio
+
 from langchain.prompts import PromptTemplate
 from langchain_core.runnables import Runnable
 from langchain_core.output_parsers import JsonOutputParser
-import json
+from typing import AsyncIterator, List, Optional, Tuple, Union
+
+from app.llm.prompt_context import build_etp_context
 
 # A dictionary of prompt templates for different ETP fields
 PROMPT_TEMPLATES = {
@@ -57,8 +61,8 @@ def generate_field_content(llm: Runnable, field: str, etp_data: dict) -> dict:
     parser = JsonOutputParser()
     chain = prompt_template | llm | parser
 
-    # Ensure etp_data is a JSON string for the prompt
-    etp_data_str = json.dumps(etp_data, ensure_ascii=False)
+    # Only the ETP data relevant to the field, within the token budget
+    etp_data_str = build_etp_context(field, etp_data)
 
     prompt = prompt_template.format(etp_data=etp_data_str)
     result = chain.invoke({"etp_data": etp_data_str})
@@ -68,3 +72,90 @@ def generate_field_content(llm: Runnable, field: str, etp_data: dict) -> dict:
         "response": result.get("response"),
         "confidence": result.get("confidence"),
     }
+
+
+async def astream_field_content(llm: Runnable, field: str, etp_data: dict) -> AsyncIterator[dict]:
+    """
+    Streams the content for a specific ETP field as it is generated.
+
+    The JSON answer is parsed incrementally, so each yielded chunk carries the
+    new text of "response" in "delta". The last chunk holds the complete
+    response and confidence, with the same keys as generate_field_content.
+
+    Args:
+        llm: The AI provider client (e.g., ChatOpenAI).
+        field: The name of the field to generate content for.
+        etp_data: The data from the ETP document.
+
+    Yields:
+        Dictionaries with the prompt, the response so far, the confidence
+        score (once available) and the newly generated delta.
+    """
+    if field not in PROMPT_TEMPLATES:
+        raise ValueError(f"No prompt template found for field: {field}")
+
+    prompt_template = PROMPT_TEMPLATES[field]
+    chain = prompt_template | llm | JsonOutputParser()
+
+    # Trimming a large ETP is CPU-bound; keep it off the event loop
+    etp_data_str = await asyncio.to_thread(build_etp_context, field, etp_data)
+    prompt = prompt_template.format(etp_data=etp_data_str)
+
+    response = ""
+    confidence = None
+    async for partial in chain.astream({"etp_data": etp_data_str}):
+        if not isinstance(partial, dict):
+            continue
+        current = partial.get("response") or ""
+        confidence = partial.get("confidence", confidence)
+        delta = current[len(response):] if current.startswith(response) else current
+        response = current
+        if delta:
+            yield {"prompt": prompt, "response": response, "confidence": confidence, "delta": delta}
+
+    yield {"prompt": prompt, "response": response, "confidence": confidence, "delta": ""}
+
+
+async def abatch_field_content(
+    llm: Runnable, fields: List[str], etp_data: dict, max_concurrency: Optional[int] = None
+) -> AsyncIterator[Tuple[str, Union[dict, Exception]]]:
+    """
+    Generates several ETP fields concurrently, yielding each one as it completes.
+
+    All prompts go through a single `llm | JsonOutputParser` runnable with
+    `abatch_as_completed`, so at most `max_concurrency` LLM calls run at once.
+    A failing field yields its exception instead of aborting the batch.
+
+    Args:
+        llm: The AI provider client (e.g., ChatOpenAI).
+        fields: The names of the fields to generate; all must be in PROMPT_TEMPLATES.
+        etp_data: The data from the ETP document.
+        max_concurrency: Maximum number of concurrent LLM calls.
+
+    Yields:
+        Tuples of (field, result) where result has the same keys as
+        generate_field_content's return value, or is the raised exception.
+    """
+    unknown = [field for field in fields if field not in PROMPT_TEMPLATES]
+    if unknown:
+        raise ValueError(f"No prompt template found for field: {', '.join(unknown)}")
+
+    contexts = await asyncio.to_thread(lambda: [build_etp_context(field, etp_data) for field in fields])
+    prompts = [
+        PROMPT_TEMPLATES[field].format(etp_data=context)
+        for field, context in zip(fields, contexts)
+    ]
+    chain = llm | JsonOutputParser()
+
+    async for index, output in chain.abatch_as_completed(
+        prompts, config={"max_concurrency": max_concurrency}, return_exceptions=True
+    ):
+        field = fields[index]
+        if isinstance(output, Exception):
+            yield field, output
+            continue
+        yield field, {
+            "prompt": prompts[index],
+            "response": output.get("response"),
+            "confidence": output.get("confidence"),
+        }
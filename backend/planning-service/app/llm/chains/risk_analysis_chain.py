@@ -1,10 +1,13 @@
 from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import JsonOutputParser
 
-def get_risk_analysis_chain():
+from app.llm.registry import get_chain, get_chat_model, register_chain
+
+
+@register_chain("risk_analysis", model_name="gpt-4o", temperature=0.7)
+def build_risk_analysis_chain(model_name: str, temperature: float):
     """
-    Creates and returns a LangChain chain specifically for generating a
+    Builds a LangChain chain specifically for generating a
     risk matrix based on a procurement description.
     """
     prompt = PromptTemplate(
@@ -40,5 +43,12 @@ def get_risk_analysis_chain():
         """,
         input_variables=["description"],
     )
-    llm = ChatOpenAI(model_name="gpt-4o", temperature=0.7)
+    llm = get_chat_model(model_name, temperature)
     return prompt | llm | JsonOutputParser()
+
+
+def get_risk_analysis_chain():
+    """
+    Returns the process-wide risk analysis chain.
+    """
+    return get_chain("risk_analysis")
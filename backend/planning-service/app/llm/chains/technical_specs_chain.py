@@ -1,22 +1,19 @@
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain.prompts import PromptTemplate
 from langchain_core.runnables import RunnableParallel, RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
-from langchain_milvus.vectorstores import Milvus
 
-def get_technical_specs_chain():
+from app.llm.registry import get_chain, get_chat_model, register_chain
+from app.rag.hybrid_retriever import get_hybrid_retriever
+
+
+@register_chain("technical_specs", model_name="gpt-4o", temperature=0.3)
+def build_technical_specs_chain(model_name: str, temperature: float):
     """
-    Creates and returns a RAG-based LangChain chain for generating the
+    Builds a RAG-based LangChain chain for generating the
     'Technical Specifications' section of a Terms of Reference.
     """
-    # 1. Create a retriever
-    embeddings = OpenAIEmbeddings()
-    vector_store = Milvus(
-        embedding_function=embeddings,
-        connection_args={"host": "milvus", "port": 19530},
-        collection_name="rag_documents",
-    )
-    retriever = vector_store.as_retriever()
+    # 1. Create a hybrid (BM25 + vector) retriever
+    retriever = get_hybrid_retriever()
 
     # 2. Update the Prompt Template
     prompt_template = """
@@ -39,7 +36,7 @@ def get_technical_specs_chain():
     )
 
     # 3. Define the LLM
-    llm = ChatOpenAI(temperature=0.3, model_name="gpt-4o")
+    llm = get_chat_model(model_name, temperature)
 
     # 4. Refactor the Chain for RAG using LCEL
     rag_chain = (
@@ -50,3 +47,10 @@ def get_technical_specs_chain():
     )
 
     return rag_chain
+
+
+def get_technical_specs_chain():
+    """
+    Returns the process-wide 'Technical Specifications' chain.
+    """
+    return get_chain("technical_specs")
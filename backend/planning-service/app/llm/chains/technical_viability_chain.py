@@ -1,13 +1,15 @@
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
 from langchain_core.runnables import RunnablePassthrough
-from langchain_milvus.vectorstores import Milvus
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 
+from app.llm.registry import get_chain, get_chat_model, register_chain
+from app.rag.hybrid_retriever import get_hybrid_retriever
 
-def get_technical_viability_chain():
+
+@register_chain("technical_viability", model_name="gpt-4", temperature=0.7)
+def build_technical_viability_chain(model_name: str, temperature: float):
     """
-    Returns a LangChain chain that generates a technical viability analysis
+    Builds a LangChain chain that generates a technical viability analysis
     for a given problem description, using a RAG setup.
     """
     template = """Você é um analista de sistemas sênior. Sua tarefa é redigir a seção 'Análise de Viabilidade Técnica' de um ETP.
@@ -23,14 +25,9 @@ PROBLEMA A SER RESOLVIDO:
 Análise de Viabilidade Técnica:
 """
     prompt = PromptTemplate.from_template(template)
-    llm = ChatOpenAI(temperature=0.7, model_name="gpt-4")
+    llm = get_chat_model(model_name, temperature)
 
-    vector_store = Milvus(
-        embedding_function=OpenAIEmbeddings(),
-        connection_args={"host": "milvus", "port": 19530},
-        collection_name="rag_documents",
-    )
-    retriever = vector_store.as_retriever()
+    retriever = get_hybrid_retriever()
 
     def format_docs(docs):
         return "\n\n".join(doc.page_content for doc in docs)
@@ -43,3 +40,10 @@ Análise de Viabilidade Técnica:
     )
 
     return rag_chain
+
+
+def get_technical_viability_chain():
+    """
+    Returns the process-wide technical viability chain.
+    """
+    return get_chain("technical_viability")
@@ -0,0 +1,260 @@
+"""
+Builds the ETP context sent in field generation prompts.
+
+Instead of serializing the whole `etp_data`, only the keys relevant to the
+generated field are kept and the result is limited to a token budget.
+"""
+
+import json
+import logging
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.core.config import ETP_PROMPT_CONTEXT_TOKEN_BUDGET
+
+logger = logging.getLogger(__name__)
+
+TRUNCATION_MARKER = " [...]"
+
+# ETP keys (at any nesting level of `dados`) relevant to each field.
+FIELD_CONTEXT_KEYS: Dict[str, List[str]] = {
+    "justificativa": [
+        "objeto", "necessidade", "problema", "impacto", "publico_impactado",
+        "situacao_atual", "alinhamento_estrategico", "solucao_escolhida",
+        "justificativa_escolha", "beneficios", "resultados_pretendidos",
+    ],
+    "necessidade": [
+        "objeto", "problema", "publico_impactado", "impacto", "situacao_atual",
+        "alinhamento_estrategico", "previsto_pca", "beneficios",
+    ],
+    "objeto": [
+        "objeto", "descricao_completa", "solucao_escolhida", "itens",
+        "bem_servico_comum", "servico_continuo", "prazo_vigencia", "modalidade",
+        "problema",
+    ],
+}
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:  # tiktoken missing or encoding file unavailable
+        logger.warning("tiktoken unavailable, estimating token counts: %s", e)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Counts tokens with the local tiktoken tokenizer, or estimates ~4 characters per token."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def _truncate_tokens(text: str, max_tokens: int) -> str:
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return encoding.decode(tokens[:max_tokens]) + TRUNCATION_MARKER
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars] + TRUNCATION_MARKER
+
+
+def _select(data: Any, keys: set) -> Optional[Any]:
+    """Keeps the relevant keys and the branches that contain them."""
+    if not isinstance(data, dict):
+        return None
+    selected = {}
+    for key, value in data.items():
+        if key in keys:
+            selected[key] = value
+        else:
+            nested = _select(value, keys)
+            if nested:
+                selected[key] = nested
+    return selected
+
+
+def _cap_strings(data: Any, max_tokens: int) -> Any:
+    if isinstance(data, str):
+        return _truncate_tokens(data, max_tokens)
+    if isinstance(data, dict):
+        return {k: _cap_strings(v, max_tokens) for k, v in data.items()}
+    if isinstance(data, list):
+        return [_cap_strings(v, max_tokens) for v in data]
+    return data
+
+
+def _string_leaves(data: Any) -> Iterable[str]:
+    if isinstance(data, str):
+        yield data
+    elif isinstance(data, dict):
+        for value in data.values():
+            yield from _string_leaves(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from _string_leaves(value)
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _fit_strings(data: Any, budget: int) -> Optional[str]:
+    """
+    Serializes `data` within `budget`, shortening its texts to the largest
+    per-text limit that fits (binary search). None when even the shortest
+    texts do not fit.
+    """
+    text = _dumps(data)
+    if count_tokens(text) <= budget:
+        return text
+    low, high = 1, max((count_tokens(s) for s in _string_leaves(data)), default=1)
+    best = None
+    while low <= high:
+        cap = (low + high) // 2
+        candidate = _dumps(_cap_strings(data, cap))
+        if count_tokens(candidate) <= budget:
+            best, low = candidate, cap + 1
+        else:
+            high = cap - 1
+    return best
+
+
+def _lists(data: Any) -> Iterable[list]:
+    if isinstance(data, dict):
+        for value in data.values():
+            yield from _lists(value)
+    elif isinstance(data, list):
+        yield data
+        for value in data:
+            yield from _lists(value)
+
+
+def _truncate_lists(data: Any, max_items: int) -> Any:
+    """Keeps the first `max_items` items of every list."""
+    if isinstance(data, dict):
+        return {k: _truncate_lists(v, max_items) for k, v in data.items()}
+    if isinstance(data, list):
+        return [_truncate_lists(v, max_items) for v in data[:max_items]]
+    return data
+
+
+def _field_paths(data: Any, path: tuple = ()) -> Iterable[tuple]:
+    """(path, value) of every field whose value has no nested fields to drop."""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            nested = isinstance(value, dict) and value or isinstance(value, list) and any(
+                isinstance(item, (dict, list)) for item in value
+            )
+            if nested:
+                yield from _field_paths(value, path + (key,))
+            else:
+                yield path + (key,), value
+    elif isinstance(data, list):
+        for index, value in enumerate(data):
+            yield from _field_paths(value, path + (index,))
+
+
+def _without(data: Any, paths: set, path: tuple = ()) -> Any:
+    """Copy of `data` without the fields in `paths` and the containers they emptied."""
+    if isinstance(data, dict):
+        kept = {}
+        for key, value in data.items():
+            if path + (key,) in paths:
+                continue
+            value = _without(value, paths, path + (key,))
+            if value not in ({}, []):
+                kept[key] = value
+        return kept
+    if isinstance(data, list):
+        kept = [_without(value, paths, path + (index,)) for index, value in enumerate(data)]
+        return [value for value in kept if value not in ({}, [])]
+    return data
+
+
+def _fit_structure(data: Any, budget: int) -> str:
+    """
+    Fits `data` within `budget` when shortening its texts is not enough.
+
+    The decisions are checked on the shortest-texts form of `data`: first the
+    largest number of items kept per list (from the start), then how many
+    fields to drop, largest (full text) first, each found by binary search,
+    with the field sizes counted once. The texts of what is left are then shortened
+    to the largest limit that fits, as in _fit_strings.
+    """
+    shortest = _cap_strings(data, 1)
+
+    def fits(candidate: Any) -> bool:
+        return count_tokens(_dumps(candidate)) <= budget
+
+    keep, low, high = 1, 1, max((len(items) for items in _lists(shortest)), default=1)
+    while low <= high:
+        middle = (low + high) // 2
+        if fits(_truncate_lists(shortest, middle)):
+            keep, low = middle, middle + 1
+        else:
+            high = middle - 1
+    shortest, data = _truncate_lists(shortest, keep), _truncate_lists(data, keep)
+
+    if not fits(shortest):
+        by_size = sorted(
+            _field_paths(data), key=lambda field: count_tokens(_dumps(field[1])), reverse=True
+        )
+        paths = [path for path, _ in by_size]
+        dropped, low, high = len(paths), 1, len(paths)
+        while low <= high:
+            middle = (low + high) // 2
+            if fits(_without(shortest, set(paths[:middle]))):
+                dropped, high = middle, middle - 1
+            else:
+                low = middle + 1
+        data = _without(data, set(paths[:dropped]))
+
+    return _fit_strings(data, budget) or _dumps({})
+
+
+def build_etp_context(field: str, etp_data: dict, token_budget: Optional[int] = None) -> str:
+    """
+    Builds the JSON ETP context for a field prompt.
+
+    Keeps the keys listed in FIELD_CONTEXT_KEYS (or the whole `etp_data` when
+    none of them is present) and, when the result exceeds `token_budget`,
+    shortens the longest texts until it fits. When even that is not enough,
+    whole list items (from the end) and then whole fields (largest first)
+    are dropped, so the context is always valid JSON. CPU-bound on large
+    documents: async callers run it in a thread.
+
+    Args:
+        field: The ETP field being generated.
+        etp_data: The data from the ETP document.
+        token_budget: Token limit for the context; defaults to ETP_PROMPT_CONTEXT_TOKEN_BUDGET.
+
+    Returns:
+        The context serialized as JSON.
+    """
+    budget = token_budget or ETP_PROMPT_CONTEXT_TOKEN_BUDGET
+    full_text = _dumps(etp_data)
+    full_tokens = count_tokens(full_text)
+
+    keys = FIELD_CONTEXT_KEYS.get(field)
+    selected = _select(etp_data, set(keys)) if keys else None
+    context = selected or etp_data
+
+    context_text = _fit_strings(context, budget)
+    if context_text is None:
+        context_text = _fit_structure(context, budget)
+
+    context_tokens = count_tokens(context_text)
+    logger.info(
+        "ETP prompt context for field '%s': %d -> %d tokens (saved %d)",
+        field, full_tokens, context_tokens, max(full_tokens - context_tokens, 0),
+    )
+    return context_text
@@ -0,0 +1,179 @@
+"""
+Process-wide registry of LangChain chains and the clients they depend on.
+
+Building a chain creates a `ChatOpenAI`, an `OpenAIEmbeddings` and (for the
+RAG chains) a Milvus connection. The registry builds each of them once per
+process, keyed by model and temperature, and every OpenAI client shares the
+same pooled HTTP connections.
+"""
+
+import logging
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import httpx
+from langchain_core.runnables import Runnable
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from nexora_core.embedding_cache import CachedEmbeddings, embedding_store_from_url
+
+from app.core.config import (
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_WARMUP_CHAINS,
+    MILVUS_HOST,
+    MILVUS_PORT,
+    RAG_COLLECTION_NAME,
+)
+
+logger = logging.getLogger(__name__)
+
+ChainBuilder = Callable[[str, float], Runnable]
+
+_builders: Dict[str, Tuple[ChainBuilder, str, float]] = {}
+_chains: Dict[Tuple[str, str, float], Runnable] = {}
+_lock = threading.Lock()
+
+
+def _http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_HTTP_MAX_CONNECTIONS,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_http_client() -> httpx.Client:
+    """Shared connection pool for the synchronous OpenAI clients."""
+    return httpx.Client(limits=_http_limits(), timeout=httpx.Timeout(60.0, connect=5.0))
+
+
+@lru_cache(maxsize=None)
+def get_async_http_client() -> httpx.AsyncClient:
+    """Shared connection pool for the asynchronous OpenAI clients."""
+    return httpx.AsyncClient(limits=_http_limits(), timeout=httpx.Timeout(60.0, connect=5.0))
+
+
+@lru_cache(maxsize=None)
+def get_chat_model(model_name: str, temperature: float) -> ChatOpenAI:
+    """Returns the process-wide ChatOpenAI client for a model and temperature."""
+    return ChatOpenAI(
+        model_name=model_name,
+        temperature=temperature,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_embeddings() -> CachedEmbeddings:
+    """
+    Returns the process-wide OpenAIEmbeddings client, behind the persistent
+    embedding cache configured by EMBEDDING_CACHE_URL.
+    """
+    embeddings = OpenAIEmbeddings(
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+    )
+    return CachedEmbeddings(embeddings, model=embeddings.model, store=embedding_store_from_url())
+
+
+@lru_cache(maxsize=None)
+def get_vector_store(collection_name: str = RAG_COLLECTION_NAME):
+    """Returns the process-wide Milvus vector store for a collection."""
+    from langchain_milvus.vectorstores import Milvus
+
+    return Milvus(
+        embedding_function=get_embeddings(),
+        connection_args={"host": MILVUS_HOST, "port": MILVUS_PORT},
+        collection_name=collection_name,
+    )
+
+
+def register_chain(name: str, model_name: str, temperature: float):
+    """
+    Registers a chain builder under `name` with its default model and temperature.
+
+    The decorated function receives `(model_name, temperature)` and is only
+    called the first time that combination is requested through get_chain().
+    """
+    def decorator(builder: ChainBuilder) -> ChainBuilder:
+        _builders[name] = (builder, model_name, temperature)
+        return builder
+
+    return decorator
+
+
+def get_chain(name: str, model_name: Optional[str] = None, temperature: Optional[float] = None) -> Runnable:
+    """
+    Returns the chain registered as `name`, building it on first use.
+
+    Args:
+        name: The name given to register_chain.
+        model_name: Overrides the registered model.
+        temperature: Overrides the registered temperature.
+
+    Returns:
+        The cached chain for (name, model_name, temperature).
+    """
+    if name not in _builders:
+        raise KeyError(f"No chain registered under '{name}'")
+
+    builder, default_model, default_temperature = _builders[name]
+    key = (
+        name,
+        model_name or default_model,
+        default_temperature if temperature is None else temperature,
+    )
+
+    chain = _chains.get(key)
+    if chain is None:
+        with _lock:
+            chain = _chains.get(key)
+            if chain is None:
+                chain = builder(key[1], key[2])
+                _chains[key] = chain
+    return chain
+
+
+def warm_up(names: Optional[Iterable[str]] = None) -> None:
+    """
+    Builds the given chains (LLM_WARMUP_CHAINS by default) ahead of the first request.
+
+    Failures are logged instead of raised so an unavailable dependency does
+    not prevent the service from starting.
+    """
+    for name in LLM_WARMUP_CHAINS if names is None else names:
+        try:
+            get_chain(name)
+            logger.info("Chain '%s' warmed up", name)
+        except Exception as e:
+            logger.warning("Could not warm up chain '%s': %s", name, e)
+
+
+def clear() -> None:
+    """
+    Drops every cached chain and client, the BM25 index built from the vector
+    store and the choice of the collection the chains read.
+    """
+    # Chains capture their retriever's vector store when they are built, so
+    # the three are dropped together
+    from app.rag.hybrid_retriever import bm25_index_cache, read_collection_name
+
+    with _lock:
+        _chains.clear()
+    get_vector_store.cache_clear()
+    read_collection_name.cache_clear()
+    bm25_index_cache.clear()
+    get_embeddings.cache_clear()
+    get_chat_model.cache_clear()
+
+
+async def aclose() -> None:
+    """Closes the shared HTTP connection pools."""
+    if get_async_http_client.cache_info().currsize:
+        await get_async_http_client().aclose()
+    if get_http_client.cache_info().currsize:
+        get_http_client().close()
+    clear()
+    get_async_http_client.cache_clear()
+    get_http_client.cache_clear()
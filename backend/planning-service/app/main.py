@@ -1,12 +1,22 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
+from prometheus_client import make_asgi_app
 from app.api.v1.endpoints import (
     health, planning, plans, etp, etp_ai, etp_validation,
     tr, tr_ai, tr_transform, templates, dashboard, market_ai, rag, sla,
-    tr_consolidation, etp_consolidation, etp_workflow, risk, etp_ai_acceptance
+    tr_consolidation, etp_consolidation, etp_workflow, risk, etp_ai_acceptance, export
 )
 from nexora_auth.middlewares import TraceMiddleware, TrustedHeaderMiddleware
+from nexora_core.ai_engine import get_ai_engine
+from app.llm import registry as chain_registry
+from app.rag import hybrid_retriever
+from app.rag.ingestor import shutdown_extraction_pool
+from app.rag.jobs import cleanup_uploads
+from app.pdf import converter as pdf_converter
+from app.services.bulk_export import shutdown_export_pool
+# Imported for their register_chain side effect, so they can be warmed up
+from app.llm.chains import risk_analysis_chain, technical_specs_chain, technical_viability_chain  # noqa: F401
 from app.core.logging_config import setup_logging
 
 # Setup structured logging
@@ -44,6 +54,24 @@ def custom_openapi():
 app = FastAPI(title="NEXORA Planning Service")
 app.openapi = custom_openapi
 
+# --- Lifespan Events for the shared AIEngine, chain registry, BM25 index and PDF converter ---
+@app.on_event("startup")
+async def startup_event():
+    chain_registry.warm_up()
+    hybrid_retriever.warm_up()
+    cleanup_uploads()
+    pdf_converter.warm_up()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if get_ai_engine.cache_info().currsize:
+        await get_ai_engine().aclose()
+    await chain_registry.aclose()
+    shutdown_extraction_pool()
+    pdf_converter.shutdown()
+    shutdown_export_pool()
+
 # --- Middlewares ---
 app.add_middleware(TraceMiddleware)
 app.add_middleware(TrustedHeaderMiddleware)
@@ -61,6 +89,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- Prometheus metrics (AI provider circuit breakers, workers) ---
+app.mount("/metrics", make_asgi_app())
+
 # --- API Routers ---
 app.include_router(health.router, prefix="/api/v1", tags=["Health"])
 app.include_router(planning.router, prefix="/api/v1/planning", tags=["Planning"])
@@ -81,3 +112,4 @@ app.include_router(etp_consolidation.router, prefix="/api/v1", tags=["ETP Consol
 app.include_router(etp_workflow.router, prefix="/api/v1/etp", tags=["ETP Workflow"])
 app.include_router(risk.router, prefix="/api/v1/risk", tags=["Risk"])
 app.include_router(etp_ai_acceptance.router, prefix="/api/v1/etp", tags=["ETP AI Acceptance"])
+app.include_router(export.router, prefix="/api/v1/export", tags=["Export"])
@@ -0,0 +1,353 @@
+"""
+DOCX to PDF conversion service: a pool of warm renderer processes fed by a
+bounded job queue, with a per-job timeout, an overall deadline per request
+and a PDF cache keyed by the DOCX hash.
+
+Each worker process creates its renderer (app.pdf.renderers) once and keeps
+it for every job, so a LibreOffice renderer starts soffice only once. A job
+that exceeds its timeout gets its worker killed and restarted, and the
+caller gets a PdfConversionTimeout; so does a caller whose job is still
+queued or rendering when its deadline passes. When too many jobs are
+already queued, submit() fails fast with PdfConverterBusy. Identical DOCX files (same SHA-256 and
+renderer) are rendered once: later requests, and concurrent requests for a
+file being rendered, get the cached PDF.
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional
+
+from app.core.config import (
+    PDF_CACHE_DIR,
+    PDF_CACHE_MAX_BYTES,
+    PDF_CONVERSION_DEADLINE_SECONDS,
+    PDF_CONVERSION_TIMEOUT_SECONDS,
+    PDF_CONVERTER_MAX_QUEUE,
+    PDF_CONVERTER_WORKERS,
+    PDF_RENDERER,
+    SOFFICE_BINARY,
+)
+from app.pdf.renderers import create_renderer, resolve_backend
+from app.utils.file_cache import FileCache
+
+logger = logging.getLogger(__name__)
+
+# Time allowed for a worker to start its renderer (soffice start-up)
+WORKER_STARTUP_TIMEOUT_SECONDS = 120.0
+
+
+class PdfConversionError(RuntimeError):
+    pass
+
+
+class PdfConversionTimeout(PdfConversionError):
+    pass
+
+
+class PdfConverterBusy(PdfConversionError):
+    pass
+
+
+def _worker_main(conn, backend: str, soffice_binary: str) -> None:
+    """Worker process loop: creates the renderer once, then converts jobs until told to stop."""
+    try:
+        renderer = create_renderer(backend, soffice_binary)
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+        return
+    conn.send(("ready", renderer.name))
+    try:
+        while True:
+            job = conn.recv()
+            if job is None:
+                break
+            docx_path, pdf_path = job
+            try:
+                renderer.convert(docx_path, pdf_path)
+                conn.send(("ok", None))
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        renderer.close()
+
+
+class _Worker:
+    """Parent-side handle of one renderer process, driven by one dispatcher thread."""
+
+    def __init__(self, index: int, backend: str, soffice_binary: str):
+        self.index = index
+        self.backend = backend
+        self.soffice_binary = soffice_binary
+        self.process = None
+        self.conn = None
+
+    def ensure_started(self) -> None:
+        if self.process is not None and self.process.is_alive():
+            return
+        self.stop()
+        # spawn: the API process runs threads and an event loop
+        context = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, self.backend, self.soffice_binary),
+            name=f"pdf-converter-{self.index}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        if not self.conn.poll(WORKER_STARTUP_TIMEOUT_SECONDS):
+            self.stop()
+            raise PdfConversionError("PDF converter worker did not start in time")
+        status, detail = self.conn.recv()
+        if status != "ready":
+            self.stop()
+            raise PdfConversionError(f"PDF converter worker failed to start: {detail}")
+        logger.info("PDF converter worker %d ready (%s)", self.index, detail)
+
+    def convert(self, docx_path: str, pdf_path: str, timeout: float) -> None:
+        self.ensure_started()
+        try:
+            self.conn.send((docx_path, pdf_path))
+            if not self.conn.poll(timeout):
+                logger.warning("PDF conversion of %s timed out, restarting worker %d", docx_path, self.index)
+                self.stop()
+                raise PdfConversionTimeout(f"PDF conversion timed out after {timeout:g}s")
+            status, detail = self.conn.recv()
+        except (EOFError, OSError) as e:
+            self.stop()
+            raise PdfConversionError(f"PDF converter worker died: {e}")
+        if status != "ok":
+            raise PdfConversionError(detail)
+
+    def stop(self, graceful: bool = False) -> None:
+        if self.process is None:
+            return
+        if graceful and self.process.is_alive():
+            try:
+                self.conn.send(None)
+                self.process.join(10)
+            except (OSError, ValueError):
+                pass
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(5)
+        self.conn.close()
+        self.process, self.conn = None, None
+
+
+class ConverterPool:
+    """
+    `size` renderer processes consuming a shared job queue of at most
+    `max_queue` waiting jobs. Workers are started by start() (or the first
+    job) and restarted after a timeout or crash.
+    """
+
+    def __init__(
+        self,
+        size: int = PDF_CONVERTER_WORKERS,
+        backend: str = PDF_RENDERER,
+        timeout: float = PDF_CONVERSION_TIMEOUT_SECONDS,
+        soffice_binary: str = SOFFICE_BINARY,
+        max_queue: int = PDF_CONVERTER_MAX_QUEUE,
+    ):
+        self.timeout = timeout
+        self.max_queue = max_queue
+        self._jobs: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._workers = [_Worker(index, backend, soffice_binary) for index in range(max(size, 1))]
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for worker in self._workers:
+                thread = threading.Thread(
+                    target=self._dispatch, args=(worker,), name=f"pdf-dispatch-{worker.index}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _dispatch(self, worker: _Worker) -> None:
+        try:
+            worker.ensure_started()  # warm up before the first job arrives
+        except PdfConversionError as e:
+            logger.warning("%s; retrying with the first job", e)
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            docx_path, pdf_path, timeout, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                worker.convert(docx_path, pdf_path, timeout)
+                future.set_result(pdf_path)
+            except Exception as e:
+                future.set_exception(e)
+        worker.stop(graceful=True)
+
+    def submit(self, docx_path: str, pdf_path: str, timeout: Optional[float] = None) -> Future:
+        """
+        Queues a conversion; the future resolves to `pdf_path`.
+
+        Raises:
+            PdfConverterBusy: `max_queue` jobs are already waiting for a worker.
+        """
+        self.start()
+        if self._jobs.qsize() >= self.max_queue:
+            raise PdfConverterBusy(f"PDF converter busy: {self.max_queue} conversions already queued")
+        future: Future = Future()
+        self._jobs.put((docx_path, pdf_path, timeout or self.timeout, future))
+        return future
+
+    def close(self) -> None:
+        with self._lock:
+            threads, self._threads = self._threads, []
+            for _ in threads:
+                self._jobs.put(None)
+        for thread in threads:
+            thread.join(15)
+
+
+class PdfCache(FileCache):
+    """Rendered PDFs, as `<key>.pdf` files."""
+
+    def __init__(self, directory: str = PDF_CACHE_DIR, max_bytes: int = PDF_CACHE_MAX_BYTES):
+        super().__init__(directory, max_bytes, ".pdf")
+
+
+def _remove(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PdfConverter:
+    """Converts DOCX files to PDF through the pool, once per distinct file."""
+
+    def __init__(
+        self,
+        pool: Optional[ConverterPool] = None,
+        cache: Optional[PdfCache] = None,
+        backend: str = PDF_RENDERER,
+        deadline: float = PDF_CONVERSION_DEADLINE_SECONDS,
+    ):
+        self.pool = pool or ConverterPool(backend=backend)
+        self.deadline = deadline
+        self.cache = cache or PdfCache()
+        self.backend = resolve_backend(backend, SOFFICE_BINARY)
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def cache_key(self, docx_path: str) -> str:
+        return f"{self.backend}-{_file_sha256(docx_path)}"
+
+    def convert(self, docx_path: str, timeout: Optional[float] = None) -> str:
+        """
+        Returns the path of the PDF rendering of a DOCX file.
+
+        The returned file belongs to the cache: copy it to keep it.
+
+        Raises:
+            PdfConversionTimeout: The conversion took longer than `timeout`
+                (PDF_CONVERSION_TIMEOUT_SECONDS by default), or queue wait
+                and conversion together took longer than the converter's
+                deadline (PDF_CONVERSION_DEADLINE_SECONDS).
+            PdfConverterBusy: Too many conversions are already queued.
+            PdfConversionError: The renderer failed.
+        """
+        deadline_at = time.monotonic() + self.deadline
+        key = self.cache_key(docx_path)
+        cached = self.cache.get(key)
+        if cached:
+            return cached
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not owner:
+            return self._wait(future, deadline_at)
+
+        try:
+            started = time.monotonic()
+            # Not ".pdf", so eviction leaves renders in progress alone
+            fd, tmp_path = tempfile.mkstemp(suffix=".part", dir=self.cache.directory)
+            os.close(fd)
+            try:
+                job = self.pool.submit(docx_path, tmp_path, timeout)
+                try:
+                    self._wait(job, deadline_at)
+                except PdfConversionTimeout:
+                    if not job.cancel():
+                        # Still rendering: discard its output once it is done
+                        job.add_done_callback(lambda _: _remove(tmp_path))
+                    raise
+                path = self.cache.put(key, tmp_path)
+            except BaseException:
+                _remove(tmp_path)
+                raise
+            logger.info("Rendered %s to PDF in %.2fs", os.path.basename(docx_path), time.monotonic() - started)
+            future.set_result(path)
+            return path
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _wait(self, future: Future, deadline_at: float) -> str:
+        try:
+            return future.result(timeout=max(deadline_at - time.monotonic(), 0))
+        except FutureTimeoutError:
+            raise PdfConversionTimeout(f"PDF conversion did not complete within {self.deadline:g}s")
+
+
+_converter: Optional[PdfConverter] = None
+_converter_lock = threading.Lock()
+
+
+def get_pdf_converter() -> PdfConverter:
+    """Returns the process-wide converter, creating it (and its pool) on first use."""
+    global _converter
+    with _converter_lock:
+        if _converter is None:
+            _converter = PdfConverter()
+        return _converter
+
+
+def warm_up() -> None:
+    """Starts the converter workers ahead of the first request."""
+    get_pdf_converter().pool.start()
+
+
+def shutdown() -> None:
+    global _converter
+    with _converter_lock:
+        converter, _converter = _converter, None
+    if converter is not None:
+        converter.pool.close()
@@ -0,0 +1,280 @@
+"""
+DOCX to PDF renderers, run inside the converter pool's worker processes.
+
+Each renderer is created once per worker (which is what keeps it warm) and
+converts one file at a time. Kept free of application imports so spawned
+workers start quickly.
+"""
+
+import importlib.util
+import os
+import pathlib
+import shutil
+import subprocess
+import tempfile
+import time
+from typing import Optional
+from xml.sax.saxutils import escape
+
+DEJAVU_FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+
+class LibreOfficeRenderer:
+    """
+    Converts through a long-lived headless LibreOffice, driven over UNO.
+
+    Starting soffice takes seconds; the worker starts it once, with its own
+    user profile, and then only loads, exports and closes documents.
+    Requires the `soffice` binary and the `uno` Python bridge (python3-uno).
+    """
+
+    name = "libreoffice"
+
+    def __init__(self, soffice_binary: str = "soffice", startup_timeout: float = 60.0):
+        import uno  # noqa: F401 - fails early when the bridge is missing
+        from com.sun.star.connection import NoConnectException
+
+        self._profile_dir = tempfile.mkdtemp(prefix="nexora-soffice-")
+        pipe_name = f"nexora_pdf_{os.getpid()}"
+        self._process = subprocess.Popen(
+            [
+                soffice_binary,
+                "--headless",
+                "--invisible",
+                "--nologo",
+                "--nodefault",
+                "--norestore",
+                "--nolockcheck",
+                f"-env:UserInstallation={pathlib.Path(self._profile_dir).as_uri()}",
+                f"--accept=pipe,name={pipe_name};urp;StarOffice.ComponentContext",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context
+        )
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            try:
+                context = resolver.resolve(f"uno:pipe,name={pipe_name};urp;StarOffice.ComponentContext")
+                break
+            except NoConnectException:
+                if self._process.poll() is not None or time.monotonic() > deadline:
+                    self.close()
+                    raise RuntimeError("LibreOffice did not start")
+                time.sleep(0.2)
+        self._desktop = context.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", context)
+
+    @staticmethod
+    def _properties(**values):
+        from com.sun.star.beans import PropertyValue
+
+        properties = []
+        for name, value in values.items():
+            prop = PropertyValue()
+            prop.Name, prop.Value = name, value
+            properties.append(prop)
+        return tuple(properties)
+
+    def convert(self, docx_path: str, pdf_path: str) -> None:
+        import uno
+
+        document = self._desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(os.path.abspath(docx_path)), "_blank", 0, self._properties(Hidden=True)
+        )
+        try:
+            document.storeToURL(
+                uno.systemPathToFileUrl(os.path.abspath(pdf_path)),
+                self._properties(FilterName="writer_pdf_Export"),
+            )
+        finally:
+            document.close(True)
+
+    def close(self) -> None:
+        try:
+            if getattr(self, "_desktop", None) is not None:
+                self._desktop.terminate()
+        except Exception:
+            pass  # the bridge dies with soffice
+        if self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        shutil.rmtree(self._profile_dir, ignore_errors=True)
+
+
+class ReportLabRenderer:
+    """
+    Pure-Python renderer: lays out the paragraphs (alignment, bold, italic,
+    underline, size and color of each run) and tables of the DOCX with
+    reportlab, using the page size and margins of its first section.
+
+    It does not reproduce everything Word or LibreOffice would (images,
+    floating shapes, numbering), but needs no system packages.
+    """
+
+    name = "reportlab"
+
+    def __init__(self, font_path: Optional[str] = None):
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+
+        # A TrueType font covers the accents and symbols (☑, →) the
+        # built-in Helvetica lacks
+        font_path = font_path or DEJAVU_FONT_PATH
+        self.font = "Helvetica"
+        self.bold_font = "Helvetica-Bold"
+        if os.path.exists(font_path):
+            pdfmetrics.registerFont(TTFont("DocFont", font_path))
+            bold_path = font_path.replace(".ttf", "-Bold.ttf")
+            if os.path.exists(bold_path):
+                pdfmetrics.registerFont(TTFont("DocFont-Bold", bold_path))
+                self.bold_font = "DocFont-Bold"
+            else:
+                self.bold_font = "DocFont"
+            # No oblique variant is registered: <i> falls back to the upright faces
+            pdfmetrics.registerFontFamily(
+                "DocFont", normal="DocFont", bold=self.bold_font, italic="DocFont", boldItalic=self.bold_font
+            )
+            self.font = "DocFont"
+
+    def _paragraph_markup(self, paragraph) -> tuple[str, float]:
+        """Returns the reportlab markup of the runs and the largest font size used."""
+        parts, max_size = [], 0.0
+        for run in paragraph.runs:
+            if not run.text:
+                continue
+            text = escape(run.text).replace("\n", "<br/>").replace("\t", "&nbsp;" * 4)
+            if run.bold:
+                text = f"<b>{text}</b>"
+            if run.italic:
+                text = f"<i>{text}</i>"
+            if run.underline:
+                text = f"<u>{text}</u>"
+            attributes = []
+            if run.font.size is not None:
+                attributes.append(f'size="{run.font.size.pt:g}"')
+                max_size = max(max_size, run.font.size.pt)
+            if run.font.color is not None and run.font.color.type is not None and run.font.color.rgb is not None:
+                attributes.append(f'color="#{run.font.color.rgb}"')
+            if attributes:
+                text = f"<font {' '.join(attributes)}>{text}</font>"
+            parts.append(text)
+        return "".join(parts), max_size
+
+    def _paragraph_style(self, paragraph, styles, max_size: float):
+        from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT, TA_RIGHT
+        from reportlab.lib.styles import ParagraphStyle
+
+        alignments = {"CENTER": TA_CENTER, "RIGHT": TA_RIGHT, "JUSTIFY": TA_JUSTIFY}
+        alignment = TA_LEFT
+        if paragraph.alignment is not None:
+            alignment = alignments.get(paragraph.alignment.name, TA_LEFT)
+
+        style_name = paragraph.style.name if paragraph.style is not None else ""
+        if style_name.startswith("Heading") or style_name == "Title":
+            level = style_name.rsplit(" ", 1)[-1]
+            size = {"1": 16, "2": 14, "3": 12}.get(level, 18 if style_name == "Title" else 12)
+            return ParagraphStyle(
+                style_name, parent=styles["Normal"], fontName=self.bold_font, fontSize=size,
+                leading=size * 1.25, spaceBefore=size * 0.5, spaceAfter=size * 0.25, alignment=alignment,
+            )
+        font_size = max_size or 11
+        return ParagraphStyle(
+            f"Body-{alignment}", parent=styles["Normal"], fontName=self.font, fontSize=font_size,
+            leading=font_size * 1.25, spaceAfter=4, alignment=alignment,
+        )
+
+    def _table(self, table, styles):
+        from reportlab.lib import colors
+        from reportlab.platypus import Paragraph, Table, TableStyle
+
+        cell_style = styles["Normal"].clone("Cell", fontName=self.font, fontSize=10, leading=12)
+        rows = [
+            [Paragraph(escape(cell.text).replace("\n", "<br/>"), cell_style) for cell in row.cells]
+            for row in table.rows
+        ]
+        if not rows:
+            return None
+        flowable = Table(rows, repeatRows=0)
+        flowable.setStyle(TableStyle([
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ]))
+        return flowable
+
+    def convert(self, docx_path: str, pdf_path: str) -> None:
+        from docx import Document
+        from docx.table import Table as DocxTable
+        from docx.text.paragraph import Paragraph as DocxParagraph
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+        document = Document(docx_path)
+        styles = getSampleStyleSheet()
+
+        story = []
+        # Body paragraphs and tables, in document order
+        for element in document.element.body.iterchildren():
+            tag = element.tag.rsplit("}", 1)[-1]
+            if tag == "p":
+                paragraph = DocxParagraph(element, document)
+                markup, max_size = self._paragraph_markup(paragraph)
+                if markup.strip():
+                    story.append(Paragraph(markup, self._paragraph_style(paragraph, styles, max_size)))
+                else:
+                    story.append(Spacer(1, 8))
+            elif tag == "tbl":
+                table = self._table(DocxTable(element, document), styles)
+                if table is not None:
+                    story.append(table)
+                    story.append(Spacer(1, 8))
+
+        section = document.sections[0] if document.sections else None
+
+        def length(value, default):
+            return value.pt if value is not None else default
+
+        page_size = (
+            length(section.page_width if section else None, 8.5 * inch),
+            length(section.page_height if section else None, 11 * inch),
+        )
+        SimpleDocTemplate(
+            pdf_path,
+            pagesize=page_size,
+            leftMargin=length(section.left_margin if section else None, inch),
+            rightMargin=length(section.right_margin if section else None, inch),
+            topMargin=length(section.top_margin if section else None, inch),
+            bottomMargin=length(section.bottom_margin if section else None, inch),
+        ).build(story or [Spacer(1, 1)])
+
+    def close(self) -> None:
+        pass
+
+
+def resolve_backend(backend: str, soffice_binary: str = "soffice") -> str:
+    """
+    Resolves "auto" to "libreoffice" when soffice and the UNO bridge are
+    installed, "reportlab" otherwise; other values are returned unchanged.
+    """
+    if backend != "auto":
+        return backend
+    if shutil.which(soffice_binary) and importlib.util.find_spec("uno") is not None:
+        return "libreoffice"
+    return "reportlab"
+
+
+def create_renderer(backend: str, soffice_binary: str = "soffice"):
+    """Creates the renderer for a backend ("libreoffice", "reportlab" or "auto")."""
+    backend = resolve_backend(backend, soffice_binary)
+    if backend == "reportlab":
+        return ReportLabRenderer()
+    if backend == "libreoffice":
+        return LibreOfficeRenderer(soffice_binary)
+    raise ValueError(f"Unknown PDF renderer '{backend}'")
@@ -0,0 +1,284 @@
+"""
+Hybrid retrieval for the RAG chains: a local BM25 inverted index over the
+chunks stored in Milvus, fused with the vector search results by reciprocal
+rank fusion (RRF).
+
+Vector search alone often misses exact legal citations ("art. 18 Lei
+14.133"); BM25 matches them literally, and RRF only needs the ranks of
+each list, so the two scores never have to be calibrated against each other.
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.pydantic_v1 import Field
+from langchain_core.retrievers import BaseRetriever
+
+from app.core.config import (
+    RAG_BM25_REFRESH_SECONDS,
+    RAG_CHUNK_COLLECTION_NAME,
+    RAG_COLLECTION_NAME,
+    RAG_FETCH_K,
+    RAG_READ_CHUNK_COLLECTION,
+    RAG_RRF_K,
+    RAG_TOP_K,
+)
+from app.llm.registry import get_vector_store
+
+logger = logging.getLogger(__name__)
+
+# Field names of the collection created by langchain_milvus with its defaults
+PRIMARY_FIELD = "pk"
+TEXT_FIELD = "text"
+VECTOR_FIELD = "vector"
+
+# Numbers keep their separators so "14.133" and "8.666/93" stay single tokens
+_TOKEN_RE = re.compile(r"\d+(?:[./-]\d+)*|\w+", re.UNICODE)
+
+
+def all_rows_expr(collection) -> str:
+    """Filter matching every row, for the VARCHAR chunk ids or the INT64 ids of the legacy collection."""
+    from pymilvus import DataType
+
+    if collection.schema.primary_field.dtype == DataType.VARCHAR:
+        return f'{PRIMARY_FIELD} != ""'
+    return f"{PRIMARY_FIELD} >= 0"
+
+
+def tokenize(text: str) -> List[str]:
+    """Case- and accent-insensitive tokens of a text."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _TOKEN_RE.findall(stripped)
+
+
+class BM25Index:
+    """Okapi BM25 over an in-memory inverted index (term -> {doc: term frequency})."""
+
+    def __init__(self, documents: Sequence[Document], k1: float = 1.5, b: float = 0.75):
+        self.documents = list(documents)
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._lengths: List[int] = []
+
+        for index, doc in enumerate(self.documents):
+            terms = Counter(tokenize(doc.page_content))
+            self._lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                self._postings[term][index] = tf
+
+        count = len(self.documents)
+        self._avg_length = (sum(self._lengths) / count) if count else 0.0
+        self._idf = {
+            term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def search(self, query: str, k: int) -> List[Tuple[Document, float]]:
+        """Returns the `k` best scoring documents for `query`."""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf[term]
+            for index, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[index] / (self._avg_length or 1.0))
+                scores[index] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.documents[index], score) for index, score in best]
+
+
+def reciprocal_rank_fusion(result_lists: Sequence[Sequence[Document]], k: int = RAG_RRF_K) -> List[Document]:
+    """
+    Fuses ranked lists: each document scores sum(1 / (k + rank)) over the
+    lists it appears in. Documents are identified by their Milvus primary key
+    (or their text when it is missing).
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    documents: Dict[str, Document] = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results, start=1):
+            key = doc.metadata.get(PRIMARY_FIELD) or doc.page_content
+            scores[key] += 1.0 / (k + rank)
+            documents.setdefault(key, doc)
+    return [documents[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+class BM25IndexCache:
+    """
+    Serves a BM25 index over every chunk in the vector store.
+
+    Queries never build the index: it is built by a background thread at
+    startup (warm_up), after `invalidate()` (called by the ingestor) and once
+    it is older than `refresh_seconds`, so ingestions by other instances are
+    picked up too. The previous index is served while a new one is built;
+    until the first build completes, queries get an empty index and only the
+    vector results.
+    """
+
+    def __init__(self, refresh_seconds: float = RAG_BM25_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._index: Optional[BM25Index] = None
+        self._vector_store = None
+        self._refreshed_at = 0.0
+        self._stale = True
+        self._builder: Optional[threading.Thread] = None
+        # Bumped by clear(), so a build started before it is discarded
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Rebuilds the index on the next query, serving the current one meanwhile."""
+        with self._lock:
+            self._stale = True
+
+    def clear(self) -> None:
+        """Drops the index, e.g. when the vector store it was built from is discarded."""
+        with self._lock:
+            self._index = None
+            self._vector_store = None
+            self._stale = True
+            self._generation += 1
+
+    def get(self, vector_store) -> BM25Index:
+        """Returns the current index, starting a background rebuild when it is out of date."""
+        with self._lock:
+            if (
+                self._stale
+                or vector_store is not self._vector_store
+                or time.monotonic() - self._refreshed_at > self.refresh_seconds
+            ):
+                self._start_build(vector_store)
+            return self._index or _EMPTY_INDEX
+
+    def refresh(self, vector_store) -> threading.Thread:
+        """Starts rebuilding the index unless a build is running; returns the building thread."""
+        with self._lock:
+            return self._start_build(vector_store)
+
+    def _start_build(self, vector_store) -> threading.Thread:
+        if self._builder is None or not self._builder.is_alive():
+            self._stale = False
+            self._vector_store = vector_store
+            self._refreshed_at = time.monotonic()
+            self._builder = threading.Thread(
+                target=self._build, args=(vector_store, self._generation), name="bm25-index", daemon=True
+            )
+            self._builder.start()
+        return self._builder
+
+    def _build(self, vector_store, generation: int) -> None:
+        try:
+            index = BM25Index(self._load(vector_store))
+        except Exception:
+            # Retried after refresh_seconds or the next invalidate()
+            logger.exception("Could not build the BM25 index")
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._index = index
+        logger.info("Built BM25 index over %d RAG chunks", len(index))
+
+    @staticmethod
+    def _load(vector_store) -> List[Document]:
+        if vector_store.col is None:
+            return []
+        output_fields = [name for name in vector_store.fields if name != VECTOR_FIELD]
+        iterator = vector_store.col.query_iterator(
+            batch_size=1000, expr=all_rows_expr(vector_store.col), output_fields=output_fields
+        )
+        documents = []
+        try:
+            while True:
+                rows = iterator.next()
+                if not rows:
+                    break
+                for row in rows:
+                    row = dict(row)
+                    documents.append(Document(page_content=row.pop(TEXT_FIELD), metadata=row))
+        finally:
+            iterator.close()
+        return documents
+
+
+_EMPTY_INDEX = BM25Index([])
+
+bm25_index_cache = BM25IndexCache()
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Retrieves the `k` best chunks by fusing `fetch_k` vector results with
+    `fetch_k` BM25 results through reciprocal rank fusion.
+    """
+
+    vector_store: object
+    k: int = RAG_TOP_K
+    fetch_k: int = RAG_FETCH_K
+    rrf_k: int = RAG_RRF_K
+    index_cache: object = Field(default_factory=lambda: bm25_index_cache)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        vector_results = self.vector_store.similarity_search(query, k=self.fetch_k)
+        lexical_results = [doc for doc, _ in self.index_cache.get(self.vector_store).search(query, self.fetch_k)]
+        return reciprocal_rank_fusion([vector_results, lexical_results], k=self.rrf_k)[: self.k]
+
+
+@lru_cache(maxsize=1)
+def read_collection_name() -> str:
+    """
+    The collection the chains read, decided once per process.
+
+    RAG_READ_CHUNK_COLLECTION "true"/"false" forces the chunk or the legacy
+    collection. With "auto" (the default) the chunk collection, where the
+    ingestion writes, is read unless the legacy collection exists with rows
+    that were not migrated yet.
+    """
+    if RAG_READ_CHUNK_COLLECTION in ("1", "true", "yes"):
+        return RAG_CHUNK_COLLECTION_NAME
+    if RAG_READ_CHUNK_COLLECTION in ("0", "false", "no"):
+        return RAG_COLLECTION_NAME
+
+    legacy = get_vector_store(RAG_COLLECTION_NAME).col
+    if legacy is None or not legacy.num_entities:
+        return RAG_CHUNK_COLLECTION_NAME
+    logger.warning(
+        "Reading the legacy RAG collection '%s': documents ingested into '%s' are not searched until it is "
+        "copied with `python -m app.rag.migrate_collection` and RAG_READ_CHUNK_COLLECTION=true is set",
+        RAG_COLLECTION_NAME, RAG_CHUNK_COLLECTION_NAME,
+    )
+    return RAG_COLLECTION_NAME
+
+
+def get_hybrid_retriever(k: Optional[int] = None) -> HybridRetriever:
+    """Returns a hybrid retriever over the RAG collection, keeping the top `k` (RAG_TOP_K) chunks."""
+    return HybridRetriever(vector_store=get_vector_store(read_collection_name()), k=k or RAG_TOP_K)
+
+
+def warm_up() -> None:
+    """Starts building the BM25 index in the background, ahead of the first query."""
+    def build() -> None:
+        try:
+            bm25_index_cache.refresh(get_vector_store(read_collection_name()))
+        except Exception as e:
+            logger.warning("Could not warm up the BM25 index: %s", e)
+
+    threading.Thread(target=build, name="bm25-warm-up", daemon=True).start()
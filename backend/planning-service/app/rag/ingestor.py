@@ -1,33 +1,293 @@
-from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
-from langchain_milvus.vectorstores import Milvus
+import asyncio
+import hashlib
+import logging
+import multiprocessing
 import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Tuple
 
+from app.core.config import (
+    RAG_CHUNK_COLLECTION_NAME,
+    RAG_INGEST_EMBED_BATCH_SIZE,
+    RAG_INGEST_EMBED_CONCURRENCY,
+    RAG_INGEST_PAGES_PER_TASK,
+    RAG_INGEST_PROCESSES,
+)
+from app.llm.registry import get_vector_store
+from app.rag import pdf_pages
+from app.rag.hybrid_retriever import bm25_index_cache
+from app.rag.jobs import IngestionJob
 
-def ingest_document(file_path: str):
+logger = logging.getLogger(__name__)
+
+DOCUMENT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+
+def document_id_from_filename(filename: str) -> str:
+    """
+    Derives a stable document id from an uploaded file name, so uploading a
+    file with the same name supersedes its previous version.
     """
-    Ingests a PDF document into the Milvus vector store.
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    document_id = re.sub(r"[^A-Za-z0-9_.-]+", "-", stem).strip("-.")[:128]
+    return document_id or "document"
 
-    Args:
-        file_path: The path to the PDF file.
+
+def validate_document_id(document_id: str) -> None:
+    # The id is interpolated into Milvus filter expressions.
+    if not DOCUMENT_ID_PATTERN.match(document_id):
+        raise ValueError(
+            "Invalid document id. Use up to 128 letters, digits, '.', '_' or '-'."
+        )
+
+
+def _file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_id(document_id: str, text: str) -> str:
+    """Content-addressed chunk id: SHA-256 of the document id and the chunk text."""
+    return hashlib.sha256(f"{document_id}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def _document_filter(document_id: str) -> str:
+    return f'document_id == "{document_id}"'
+
+
+def _get_store():
     """
-    loader = PyPDFLoader(file_path)
-    documents = loader.load()
+    Returns the per-document chunk collection (RAG_CHUNK_COLLECTION_NAME).
+
+    Nothing is ever dropped here: a collection under that name without a
+    `document_id` field (e.g. the legacy RAG_COLLECTION_NAME configured by
+    mistake) is refused, and the legacy collection is only copied over by
+    the operator with app.rag.migrate_collection.
+    """
+    vector_store = get_vector_store(RAG_CHUNK_COLLECTION_NAME)
+    if vector_store.col is not None:
+        field_names = {field.name for field in vector_store.col.schema.fields}
+        if "document_id" not in field_names:
+            raise RuntimeError(
+                f"RAG collection '{vector_store.collection_name}' has no document_id field; "
+                "set RAG_CHUNK_COLLECTION_NAME to a new collection"
+            )
+    return vector_store
+
+
+@lru_cache(maxsize=1)
+def _get_extraction_pool() -> Optional[Executor]:
+    if RAG_INGEST_PROCESSES <= 0:
+        return None  # the event loop's default thread pool
+    # spawn: forking a process that runs the event loop and client threads is unsafe
+    return ProcessPoolExecutor(
+        max_workers=RAG_INGEST_PROCESSES,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def shutdown_extraction_pool() -> None:
+    if _get_extraction_pool.cache_info().currsize:
+        pool = _get_extraction_pool()
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        _get_extraction_pool.cache_clear()
+
+
+async def extract_pages(file_path: str, job: Optional[IngestionJob] = None) -> List[Tuple[int, str]]:
+    """
+    Extracts the text of every page, RAG_INGEST_PAGES_PER_TASK pages per task
+    across the extraction process pool.
+
+    Returns:
+        (page number, text) tuples in page order.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_extraction_pool()
+
+    total = await loop.run_in_executor(pool, pdf_pages.count_pages, file_path)
+    if job:
+        job.pages_total = total
+
+    step = max(RAG_INGEST_PAGES_PER_TASK, 1)
+    tasks = [
+        loop.run_in_executor(pool, pdf_pages.extract_pages, file_path, start, min(start + step, total))
+        for start in range(0, total, step)
+    ]
+    pages: List[Tuple[int, str]] = []
+    for task in asyncio.as_completed(tasks):
+        extracted = await task
+        pages.extend(extracted)
+        if job:
+            job.pages_done += len(extracted)
+    pages.sort()
+    return pages
+
 
+def iter_chunks(
+    pages: Iterable[Tuple[int, str]], document_id: str, version: str, source: str
+) -> Iterator[Tuple[str, Document]]:
+    """
+    Splits the pages lazily into (chunk id, Document) pairs, skipping chunks
+    whose text already appeared earlier in the document.
+    """
     text_splitter = RecursiveCharacterTextSplitter(
         chunk_size=1000,
         chunk_overlap=200,
     )
-    docs = text_splitter.split_documents(documents)
+    seen = set()
+    for page, text in pages:
+        for chunk in text_splitter.split_text(text):
+            cid = chunk_id(document_id, chunk)
+            if cid in seen:
+                continue
+            seen.add(cid)
+            yield cid, Document(
+                page_content=chunk,
+                metadata={
+                    "document_id": document_id,
+                    "version": version,
+                    "source": source,
+                    "page": page,
+                },
+            )
+
+
+def _batches(items: Iterable[Tuple[str, Document]], size: int) -> Iterator[List[Tuple[str, Document]]]:
+    batch: List[Tuple[str, Document]] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _add_batches(vector_store, batches: Iterator[List[Tuple[str, Document]]], job: Optional[IngestionJob]) -> None:
+    """
+    Embeds and inserts the batches with up to RAG_INGEST_EMBED_CONCURRENCY
+    batches in flight. The first batch runs alone because it may create the
+    collection.
+    """
+    limit = max(RAG_INGEST_EMBED_CONCURRENCY, 1)
 
-    embeddings = OpenAIEmbeddings()
+    async def add(batch):
+        ids = [cid for cid, _ in batch]
+        docs = [doc for _, doc in batch]
+        await asyncio.to_thread(vector_store.add_documents, docs, ids=ids)
+        if job:
+            job.chunks_embedded += len(batch)
 
-    vector_store = Milvus.from_documents(
-        docs,
-        embedding=embeddings,
-        connection_args={"host": "milvus", "port": 19530},
-        collection_name="rag_documents",
-        drop_old=True,
+    first = next(batches, None)
+    if first is None:
+        return
+    await add(first)
+
+    # Pull the next batch from the generator only when a slot frees up
+    pending = set()
+    try:
+        for batch in batches:
+            if len(pending) >= limit:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+            pending.add(asyncio.ensure_future(add(batch)))
+        if pending:
+            await asyncio.gather(*pending)
+    except BaseException:
+        for task in pending:
+            task.cancel()
+        raise
+
+
+async def ingest_document(
+    file_path: str,
+    document_id: Optional[str] = None,
+    source: Optional[str] = None,
+    version: Optional[str] = None,
+    job: Optional[IngestionJob] = None,
+) -> dict:
+    """
+    Ingests a PDF document into the Milvus vector store incrementally.
+
+    Pages are extracted in a process pool, split lazily, and only chunks whose
+    content-hash id is not yet stored for the document are embedded and
+    inserted, in concurrent batches. Chunks of the previous version that no
+    longer exist are deleted; other documents are left untouched.
+
+    Args:
+        file_path: The path to the PDF file.
+        document_id: Stable id of the document; derived from `source` when omitted.
+        source: Original file name, stored with each chunk.
+        version: SHA-256 of the file, computed when omitted.
+        job: Background job whose progress counters are updated.
+
+    Returns:
+        A summary with the document id, version and the added/deleted/unchanged chunk counts.
+    """
+    source = source or os.path.basename(file_path)
+    document_id = document_id or document_id_from_filename(source)
+    validate_document_id(document_id)
+    version = version or await asyncio.to_thread(_file_sha256, file_path)
+
+    pages = await extract_pages(file_path, job)
+
+    vector_store = await asyncio.to_thread(_get_store)
+    existing = set(await asyncio.to_thread(vector_store.get_pks, _document_filter(document_id)) or [])
+
+    current: set = set()
+    counts = {"added": 0}
+
+    def new_chunks() -> Iterator[Tuple[str, Document]]:
+        for cid, doc in iter_chunks(pages, document_id, version, source):
+            current.add(cid)
+            if job:
+                job.chunks_total += 1
+            if cid not in existing:
+                counts["added"] += 1
+                yield cid, doc
+
+    await _add_batches(vector_store, _batches(new_chunks(), max(RAG_INGEST_EMBED_BATCH_SIZE, 1)), job)
+
+    stale_ids = [cid for cid in existing if cid not in current]
+    if stale_ids:
+        await asyncio.to_thread(vector_store.delete, ids=stale_ids)
+
+    added = counts["added"]
+    if added or stale_ids:
+        bm25_index_cache.invalidate()
+    logger.info(
+        "Ingested RAG document '%s' (version %s): %d added, %d deleted, %d unchanged",
+        document_id, version[:12], added, len(stale_ids), len(current) - added,
     )
-    return vector_store
+    return {
+        "document_id": document_id,
+        "version": version,
+        "added": added,
+        "deleted": len(stale_ids),
+        "unchanged": len(current) - added,
+    }
+
+
+def delete_document(document_id: str) -> int:
+    """
+    Deletes every chunk of a document from the vector store.
+
+    Returns:
+        The number of deleted chunks (0 when the document is unknown).
+    """
+    validate_document_id(document_id)
+    vector_store = _get_store()
+    ids = vector_store.get_pks(_document_filter(document_id)) or []
+    if ids:
+        vector_store.delete(ids=ids)
+        bm25_index_cache.invalidate()
+    return len(ids)
@@ -0,0 +1,234 @@
+"""
+Background RAG ingestion jobs and their progress.
+
+The uploaded file lives on the disk of the instance that received it, so the
+job runs in that process, at most RAG_INGEST_MAX_CONCURRENT_JOBS at a time
+(the others wait as "queued"). Its state is saved to Redis
+(RAG_INGEST_JOB_REDIS_URL) every PROGRESS_SAVE_SECONDS while it runs, so the
+polls can reach any instance; without Redis it is kept in memory and only
+the receiving process knows it.
+
+A job whose process died is no longer saved: once its state is older than
+JOB_STALE_SECONDS it is reported as failed, and cleanup_uploads() removes
+its upload when the service starts again.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Coroutine, Dict, Optional
+
+from app.core.config import (
+    RAG_INGEST_JOB_REDIS_URL,
+    RAG_INGEST_JOB_TTL_SECONDS,
+    RAG_INGEST_MAX_CONCURRENT_JOBS,
+    RAG_UPLOAD_DIR,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_FINISHED_JOBS = 100
+PROGRESS_SAVE_SECONDS = 1.0
+JOB_STALE_SECONDS = 60.0
+REDIS_KEY_PREFIX = "rag:ingest-job:"
+# Uploads are named after the process that ingests them
+_UPLOAD_RE = re.compile(r"^upload-(\d+)-")
+
+_DATETIME_FIELDS = ("created_at", "updated_at", "finished_at")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class IngestionJob:
+    job_id: str
+    document_id: str
+    source: str
+    status: str = "queued"
+    pages_total: int = 0
+    pages_done: int = 0
+    chunks_total: int = 0
+    chunks_embedded: int = 0
+    added: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    version: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=_now)
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict(), default=lambda value: value.isoformat())
+
+    @classmethod
+    def from_json(cls, raw) -> "IngestionJob":
+        data = json.loads(raw)
+        for name in _DATETIME_FIELDS:
+            if data.get(name):
+                data[name] = datetime.fromisoformat(data[name])
+        return cls(**data)
+
+
+class MemoryJobStore:
+    """Jobs of this process, keeping the last `max_finished` finished ones."""
+
+    def __init__(self, max_finished: int = MAX_FINISHED_JOBS):
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+
+    async def save(self, job: IngestionJob) -> None:
+        self._jobs[job.job_id] = job
+        finished = [job_id for job_id, saved in self._jobs.items() if saved.finished_at is not None]
+        for job_id in finished[: max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job_id]
+
+    async def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self._jobs.get(job_id)
+
+
+class RedisJobStore:
+    """Jobs of every instance, expiring `ttl_seconds` after their last save."""
+
+    def __init__(self, client, ttl_seconds: int = RAG_INGEST_JOB_TTL_SECONDS):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+
+    async def save(self, job: IngestionJob) -> None:
+        await self.client.set(REDIS_KEY_PREFIX + job.job_id, job.to_json(), ex=self.ttl_seconds)
+
+    async def get(self, job_id: str) -> Optional[IngestionJob]:
+        raw = await self.client.get(REDIS_KEY_PREFIX + job_id)
+        return IngestionJob.from_json(raw) if raw else None
+
+
+def job_store_from_url(url: str = RAG_INGEST_JOB_REDIS_URL):
+    if not url:
+        return MemoryJobStore()
+    import redis.asyncio as aioredis
+
+    return RedisJobStore(aioredis.from_url(url))
+
+
+class IngestionJobRegistry:
+    def __init__(self, store=None, max_concurrent: int = RAG_INGEST_MAX_CONCURRENT_JOBS):
+        self.store = store if store is not None else job_store_from_url()
+        self.max_concurrent = max(max_concurrent, 1)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop = None
+
+    async def create(self, document_id: str, source: str) -> IngestionJob:
+        job = IngestionJob(job_id=str(uuid.uuid4()), document_id=document_id, source=source)
+        await self._save(job)
+        return job
+
+    async def get(self, job_id: str) -> Optional[IngestionJob]:
+        """Returns the job, reported as failed when its process stopped saving it."""
+        job = await self.store.get(job_id)
+        if (
+            job is not None
+            and job.finished_at is None
+            and job.updated_at is not None
+            and (_now() - job.updated_at).total_seconds() > JOB_STALE_SECONDS
+        ):
+            job = replace(job, status="error", error="Ingestion interrupted: the instance running it stopped")
+        return job
+
+    def start(self, job: IngestionJob, work: Coroutine, cleanup_path: Optional[str] = None) -> asyncio.Task:
+        """Runs `work` in the background once a slot is free, recording its outcome on `job`."""
+        async def run():
+            progress = asyncio.create_task(self._save_progress(job))
+            try:
+                async with self._get_slots():
+                    job.status = "running"
+                    result = await work
+                for key, value in result.items():
+                    setattr(job, key, value)
+                job.status = "done"
+            except Exception as e:
+                logger.error("RAG ingestion job %s failed: %s", job.job_id, e, exc_info=True)
+                job.status = "error"
+                job.error = str(e)
+            finally:
+                progress.cancel()
+                job.finished_at = _now()
+                await self._save(job)
+                self._tasks.pop(job.job_id, None)
+                if cleanup_path and os.path.exists(cleanup_path):
+                    os.remove(cleanup_path)
+
+        # Keep a reference so the task is not garbage collected mid-run
+        task = asyncio.create_task(run())
+        self._tasks[job.job_id] = task
+        return task
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots, self._slots_loop = asyncio.Semaphore(self.max_concurrent), loop
+        return self._slots
+
+    async def _save(self, job: IngestionJob) -> None:
+        job.updated_at = _now()
+        try:
+            await self.store.save(job)
+        except Exception as e:
+            logger.warning("Could not save RAG ingestion job %s: %s", job.job_id, e)
+
+    async def _save_progress(self, job: IngestionJob) -> None:
+        while True:
+            await asyncio.sleep(PROGRESS_SAVE_SECONDS)
+            await self._save(job)
+
+
+def upload_file_prefix() -> str:
+    """Prefix of the uploads ingested by this process, in RAG_UPLOAD_DIR (created if needed)."""
+    os.makedirs(RAG_UPLOAD_DIR, exist_ok=True)
+    return f"upload-{os.getpid()}-"
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def cleanup_uploads(directory: str = RAG_UPLOAD_DIR) -> int:
+    """
+    Removes the uploads left behind by processes that stopped mid-ingestion.
+    Run at startup: an upload named after this process's own pid comes from
+    a previous run (e.g. a restarted container) too.
+    """
+    if not os.path.isdir(directory):
+        return 0
+    removed = 0
+    for name in os.listdir(directory):
+        match = _UPLOAD_RE.match(name)
+        if not match:
+            continue
+        pid = int(match.group(1))
+        if pid == os.getpid() or not _process_alive(pid):
+            os.remove(os.path.join(directory, name))
+            removed += 1
+    if removed:
+        logger.info("Removed %d RAG uploads left by stopped ingestion jobs", removed)
+    return removed
+
+
+ingestion_jobs = IngestionJobRegistry()
@@ -0,0 +1,109 @@
+"""
+Copies the legacy RAG collection (RAG_COLLECTION_NAME, written by the old
+drop-and-rebuild ingestion) into the per-document chunk collection
+(RAG_CHUNK_COLLECTION_NAME).
+
+Run it once before setting RAG_READ_CHUNK_COLLECTION=true, so the chains do
+not lose the documents indexed before the incremental ingestion (until then,
+"auto" keeps reading the legacy collection while it has rows):
+
+    python -m app.rag.migrate_collection
+
+Legacy chunks are grouped into documents by their `source` file name and
+stored with version "legacy". Chunks already copied are skipped, so the
+command can be re-run. The legacy collection is left untouched; drop it by
+hand once the chunk collection is being read.
+"""
+
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, Iterator, List, Tuple
+
+from langchain_core.documents import Document
+
+from app.core.config import RAG_COLLECTION_NAME, RAG_INGEST_EMBED_BATCH_SIZE
+from app.llm.registry import get_vector_store
+from app.rag.hybrid_retriever import TEXT_FIELD, all_rows_expr, bm25_index_cache
+from app.rag.ingestor import _add_batches, _batches, _document_filter, _get_store, chunk_id, document_id_from_filename
+
+logger = logging.getLogger(__name__)
+
+LEGACY_VERSION = "legacy"
+
+
+def _iter_legacy_rows(legacy_store) -> Iterator[dict]:
+    output_fields = [name for name in (TEXT_FIELD, "source", "page") if name in legacy_store.fields]
+    iterator = legacy_store.col.query_iterator(
+        batch_size=1000, expr=all_rows_expr(legacy_store.col), output_fields=output_fields
+    )
+    try:
+        while True:
+            rows = iterator.next()
+            if not rows:
+                break
+            yield from rows
+    finally:
+        iterator.close()
+
+
+def legacy_chunks(rows: Iterator[dict]) -> Dict[str, List[Tuple[str, Document]]]:
+    """Groups legacy rows into (chunk id, Document) pairs per derived document id."""
+    documents: Dict[str, List[Tuple[str, Document]]] = defaultdict(list)
+    seen = set()
+    for row in rows:
+        source = os.path.basename(str(row.get("source") or "legado.pdf"))
+        document_id = document_id_from_filename(source)
+        text = row[TEXT_FIELD]
+        cid = chunk_id(document_id, text)
+        if cid in seen:
+            continue
+        seen.add(cid)
+        documents[document_id].append((cid, Document(
+            page_content=text,
+            metadata={
+                "document_id": document_id,
+                "version": LEGACY_VERSION,
+                "source": source,
+                "page": int(row.get("page") or 0),
+            },
+        )))
+    return documents
+
+
+async def migrate() -> dict:
+    """
+    Copies every legacy chunk missing from the chunk collection.
+
+    Returns:
+        The number of documents and of copied/already present chunks.
+    """
+    legacy_store = get_vector_store(RAG_COLLECTION_NAME)
+    if legacy_store.col is None:
+        logger.info("No legacy RAG collection '%s': nothing to migrate", RAG_COLLECTION_NAME)
+        return {"documents": 0, "copied": 0, "skipped": 0}
+
+    documents = legacy_chunks(_iter_legacy_rows(legacy_store))
+    chunk_store = _get_store()
+    copied = skipped = 0
+    for document_id, chunks in documents.items():
+        existing = set(chunk_store.get_pks(_document_filter(document_id)) or []) if chunk_store.col is not None else set()
+        missing = [(cid, doc) for cid, doc in chunks if cid not in existing]
+        await _add_batches(chunk_store, _batches(iter(missing), max(RAG_INGEST_EMBED_BATCH_SIZE, 1)), None)
+        copied += len(missing)
+        skipped += len(chunks) - len(missing)
+        logger.info("Migrated RAG document '%s': %d copied, %d already present",
+                    document_id, len(missing), len(chunks) - len(missing))
+    if copied:
+        bm25_index_cache.invalidate()
+    return {"documents": len(documents), "copied": copied, "skipped": skipped}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    result = asyncio.run(migrate())
+    print(
+        f"{result['documents']} documents: {result['copied']} chunks copied, "
+        f"{result['skipped']} already present. Set RAG_READ_CHUNK_COLLECTION=true to read them."
+    )
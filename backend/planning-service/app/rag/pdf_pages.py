@@ -0,0 +1,24 @@
+"""
+PDF page text extraction, run in worker processes by the RAG ingestion pipeline.
+
+Kept free of application imports so spawned workers start quickly.
+"""
+
+from typing import List, Tuple
+
+from pypdf import PdfReader
+
+
+def count_pages(file_path: str) -> int:
+    return len(PdfReader(file_path).pages)
+
+
+def extract_pages(file_path: str, start: int, stop: int) -> List[Tuple[int, str]]:
+    """
+    Extracts the text of pages [start, stop) of a PDF.
+
+    Returns:
+        (page number, text) tuples, with zero-based page numbers as in PyPDFLoader.
+    """
+    reader = PdfReader(file_path)
+    return [(page, reader.pages[page].extract_text() or "") for page in range(start, stop)]
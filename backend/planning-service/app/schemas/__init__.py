@@ -13,6 +13,7 @@ from .ai_execution import (
     AIExecutionCreate,
     ETPGenerateSectionIn,
     ETPGenerateSectionOut,
+    ETPGenerateFieldsIn,
 )
 
 
@@ -32,6 +33,7 @@ __all__ = [
     "AIExecutionCreate",
     "ETPGenerateSectionIn",
     "ETPGenerateSectionOut",
+    "ETPGenerateFieldsIn",
     "IAAcceptanceCreate",
     "IAAcceptanceHistorySchema",
 ]
@@ -1,6 +1,6 @@
 import uuid
-from typing import Optional
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 
 # --- AI Execution Schemas ---
 
@@ -36,3 +36,6 @@ class ETPGenerateSectionIn(BaseModel):
 class ETPGenerateSectionOut(BaseModel):
     generated_text: str
     execution_id: uuid.UUID
+
+class ETPGenerateFieldsIn(BaseModel):
+    fields: List[str] = Field(..., min_length=1)
@@ -0,0 +1,241 @@
+"""
+Bulk export of ETP/TR documents as a ZIP archive streamed while it is built.
+
+Documents are rendered by DocumentGenerator in a process pool, in batches
+of EXPORT_BATCH_SIZE (each batch loads its documents and templates with
+two queries), and each file is appended to the archive as soon as its
+batch finishes. Only one read block of the archive is held in memory; the
+rendered files wait in a temporary directory until they are written. The
+archive ends with manifest.json and SHA256SUMS, with the SHA-256 of every
+file, plus the documents that could not be rendered.
+"""
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import EXPORT_BATCH_SIZE, EXPORT_PROCESSES, PDF_CONVERTER_WORKERS
+from app.db.models.etp_modular import DocumentoETP, DocumentoTR
+from app.db.models.templates_gestao import ModeloInstitucional
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+MODELOS_DOCUMENTO = {"etp": DocumentoETP, "tr": DocumentoTR}
+FORMATOS = ("docx", "pdf")
+
+READ_BLOCK_SIZE = 64 * 1024
+
+# (tipo, documento_id, rendered file path or None, error or None)
+RenderResult = Tuple[str, int, Optional[str], Optional[str]]
+
+
+@lru_cache(maxsize=1)
+def _get_export_pool() -> Optional[Executor]:
+    if EXPORT_PROCESSES <= 0:
+        return None
+    # spawn: forking a process that runs the event loop and client threads is unsafe
+    return ProcessPoolExecutor(
+        max_workers=EXPORT_PROCESSES,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def shutdown_export_pool() -> None:
+    if _get_export_pool.cache_info().currsize:
+        pool = _get_export_pool()
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        _get_export_pool.cache_clear()
+
+
+def listar_documentos(
+    db: Session,
+    tipos: List[str],
+    instituicao_id: Optional[int] = None,
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None,
+) -> List[Tuple[str, int]]:
+    """
+    Returns the (tipo, id) of the documents to export, created in
+    [data_inicio, data_fim] and, with `instituicao_id`, made from a template
+    of that institution.
+    """
+    documentos = []
+    for tipo in tipos:
+        modelo = MODELOS_DOCUMENTO[tipo]
+        query = db.query(modelo.id)
+        if instituicao_id is not None:
+            query = query.join(ModeloInstitucional, ModeloInstitucional.id == modelo.template_id).filter(
+                ModeloInstitucional.instituicao_id == instituicao_id
+            )
+        if data_inicio is not None:
+            query = query.filter(modelo.created_at >= data_inicio)
+        if data_fim is not None:
+            query = query.filter(modelo.created_at <= data_fim)
+        documentos.extend((tipo, documento_id) for (documento_id,) in query.order_by(modelo.id))
+    return documentos
+
+
+def render_batch(tipo: str, documento_ids: List[int], export_dir: str) -> List[RenderResult]:
+    """Renders a batch of documents to DOCX files in `export_dir` (runs in the pool workers)."""
+    # Imported here so the API process does not need it loaded to list documents
+    from app.services.document_generator import DocumentGenerator
+
+    modelo = MODELOS_DOCUMENTO[tipo]
+    db = SessionLocal()
+    try:
+        generator = DocumentGenerator(db)
+        generator.precarregar(modelo, documento_ids)
+        gerar = generator.gerar_etp_docx if tipo == "etp" else generator.gerar_tr_docx
+        results = []
+        for documento_id in documento_ids:
+            try:
+                path = gerar(documento_id, output_path=os.path.join(export_dir, f"{tipo}_{documento_id}.docx"))
+                results.append((tipo, documento_id, path, None))
+            except Exception as e:
+                results.append((tipo, documento_id, None, str(e)))
+        return results
+    finally:
+        db.close()
+
+
+def _convert_to_pdf(result: RenderResult) -> RenderResult:
+    from app.pdf.converter import get_pdf_converter
+
+    tipo, documento_id, docx_path, _ = result
+    pdf_path = os.path.splitext(docx_path)[0] + ".pdf"
+    try:
+        # Copied out of the PDF cache, which may evict it before it is zipped
+        shutil.copyfile(get_pdf_converter().convert(docx_path), pdf_path)
+    except Exception as e:
+        return (tipo, documento_id, None, str(e))
+    finally:
+        os.remove(docx_path)
+    return (tipo, documento_id, pdf_path, None)
+
+
+def _render_all(documentos: List[Tuple[str, int]], formato: str, export_dir: str) -> Iterator[RenderResult]:
+    """Yields the rendered documents in completion order."""
+    pool = _get_export_pool()
+    local_pool = ThreadPoolExecutor(max_workers=1) if pool is None else None
+    converters = ThreadPoolExecutor(max_workers=max(PDF_CONVERTER_WORKERS, 1)) if formato == "pdf" else None
+
+    # Render batches map to their (tipo, ids); PDF conversions to None
+    pending: Dict[Future, Optional[Tuple[str, List[int]]]] = {}
+    for tipo in MODELOS_DOCUMENTO:
+        ids = [documento_id for t, documento_id in documentos if t == tipo]
+        for start in range(0, len(ids), max(EXPORT_BATCH_SIZE, 1)):
+            batch = ids[start:start + max(EXPORT_BATCH_SIZE, 1)]
+            pending[(pool or local_pool).submit(render_batch, tipo, batch, export_dir)] = (tipo, batch)
+
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = pending.pop(future)
+                if batch is None:
+                    yield future.result()
+                    continue
+                tipo, ids = batch
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logger.error("Export batch of %d %s documents failed: %s", len(ids), tipo, e)
+                    results = [(tipo, documento_id, None, str(e)) for documento_id in ids]
+                for result in results:
+                    if converters is not None and result[2] is not None:
+                        pending[converters.submit(_convert_to_pdf, result)] = None
+                    else:
+                        yield result
+    finally:
+        # Client gone or export done: drop the batches not started yet
+        for future in pending:
+            future.cancel()
+        for executor in (local_pool, converters):
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+
+class _ZipBuffer:
+    """Write-only, unseekable file object collecting what zipfile writes until drained."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> Iterator[bytes]:
+        if self._parts:
+            data = b"".join(self._parts)
+            self._parts.clear()
+            yield data
+
+
+def iter_export_zip(documentos: List[Tuple[str, int]], formato: str = "docx", filtros: Optional[dict] = None) -> Iterator[bytes]:
+    """
+    Renders the documents and yields the bytes of a ZIP archive holding
+    `<tipo>/<tipo>_<id>.<formato>` for each of them, then manifest.json and
+    SHA256SUMS.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido: {formato}")
+
+    export_dir = tempfile.mkdtemp(prefix="nexora-export-")
+    buffer = _ZipBuffer()
+    arquivos, erros = [], []
+    try:
+        # DOCX and PDF are already compressed: the fastest level is enough
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+            for tipo, documento_id, path, erro in _render_all(documentos, formato, export_dir):
+                if erro is not None:
+                    erros.append({"tipo": tipo, "documento_id": documento_id, "erro": erro})
+                    continue
+                arcname = f"{tipo}/{tipo}_{documento_id}.{formato}"
+                digest, size = hashlib.sha256(), 0
+                with open(path, "rb") as source, archive.open(arcname, "w") as target:
+                    for block in iter(lambda: source.read(READ_BLOCK_SIZE), b""):
+                        digest.update(block)
+                        size += len(block)
+                        target.write(block)
+                        yield from buffer.drain()
+                os.remove(path)
+                arquivos.append({
+                    "arquivo": arcname,
+                    "tipo": tipo,
+                    "documento_id": documento_id,
+                    "sha256": digest.hexdigest(),
+                    "tamanho_bytes": size,
+                })
+                yield from buffer.drain()
+
+            manifest = {
+                "gerado_em": datetime.now(timezone.utc).isoformat(),
+                "formato": formato,
+                "filtros": filtros or {},
+                "total_documentos": len(documentos),
+                "arquivos": arquivos,
+                "erros": erros,
+            }
+            archive.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2, default=str))
+            archive.writestr("SHA256SUMS", "".join(f"{a['sha256']}  {a['arquivo']}\n" for a in arquivos))
+        yield from buffer.drain()
+        logger.info("Exported %d documents (%d errors)", len(arquivos), len(erros))
+    finally:
+        shutil.rmtree(export_dir, ignore_errors=True)
@@ -2,10 +2,12 @@
 Serviço de geração de documentos DOCX e PDF para ETP e TR
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional, Tuple
 from datetime import datetime
 from io import BytesIO
 import os
+import shutil
+import tempfile
 
 from docx import Document
 from docx.shared import Inches, Pt, RGBColor
@@ -14,6 +16,8 @@ from sqlalchemy.orm import Session
 
 from app.db.models.etp_modular import DocumentoETP, DocumentoTR
 from app.db.models.templates_gestao import ModeloInstitucional, Instituicao
+from app.pdf.converter import get_pdf_converter
+from app.services.render_cache import get_render_cache, render_key
 
 
 class DocumentGenerator:
@@ -23,6 +27,65 @@ class DocumentGenerator:
     
     def __init__(self, db: Session):
         self.db = db
+        # Memória por requisição/lote: documentos já carregados e, por
+        # template_id, o template com sua instituição
+        self._documentos: Dict[Tuple[type, Any], Any] = {}
+        self._modelos: Dict[int, Tuple[ModeloInstitucional, Optional[Instituicao]]] = {}
+    
+    def precarregar(self, modelo_documento: type, documento_ids: Iterable[Any]) -> None:
+        """
+        Carrega de uma vez os documentos de um lote, com seus templates e
+        instituições: duas consultas, qualquer que seja o tamanho do lote
+        
+        Args:
+            modelo_documento: DocumentoETP ou DocumentoTR
+            documento_ids: IDs dos documentos que serão gerados
+        """
+        pendentes = [i for i in documento_ids if (modelo_documento, i) not in self._documentos]
+        if pendentes:
+            for documento in self.db.query(modelo_documento).filter(modelo_documento.id.in_(pendentes)):
+                self._documentos[(modelo_documento, documento.id)] = documento
+        
+        template_ids = {
+            documento.template_id
+            for (modelo, _), documento in self._documentos.items()
+            if modelo is modelo_documento
+        } - self._modelos.keys()
+        if template_ids:
+            rows = self.db.query(ModeloInstitucional, Instituicao).outerjoin(
+                Instituicao, Instituicao.id == ModeloInstitucional.instituicao_id
+            ).filter(ModeloInstitucional.id.in_(template_ids))
+            for template, instituicao in rows:
+                self._modelos[template.id] = (template, instituicao)
+    
+    def _carregar(self, modelo_documento: type, documento_id: Any) -> Tuple[Any, ModeloInstitucional, Optional[Instituicao]]:
+        """
+        Retorna documento, template e instituição, em uma única consulta
+        (com joins) quando ainda não estão em memória
+        """
+        documento = self._documentos.get((modelo_documento, documento_id))
+        if documento is None:
+            row = self.db.query(modelo_documento, ModeloInstitucional, Instituicao).outerjoin(
+                ModeloInstitucional, ModeloInstitucional.id == modelo_documento.template_id
+            ).outerjoin(
+                Instituicao, Instituicao.id == ModeloInstitucional.instituicao_id
+            ).filter(
+                modelo_documento.id == documento_id
+            ).first()
+            
+            if not row:
+                raise ValueError(f"Documento {documento_id} não encontrado")
+            
+            documento, template, instituicao = row
+            self._documentos[(modelo_documento, documento_id)] = documento
+            if template is not None:
+                self._modelos[template.id] = (template, instituicao)
+        
+        template, instituicao = self._modelos.get(documento.template_id, (None, None))
+        if not template:
+            raise ValueError(f"Template {documento.template_id} não encontrado")
+        
+        return documento, template, instituicao
     
     def gerar_etp_docx(
         self,
@@ -37,28 +100,17 @@ class DocumentGenerator:
             output_path: Caminho para salvar o arquivo (opcional)
         
         Returns:
-            Caminho do arquivo gerado
+            Caminho do arquivo gerado. Sem `output_path`, é o arquivo do cache
+            de renderizações (app.services.render_cache): não alterar nem mover
         """
-        # Buscar documento
-        documento = self.db.query(DocumentoETP).filter(
-            DocumentoETP.id == documento_id
-        ).first()
-        
-        if not documento:
-            raise ValueError(f"Documento {documento_id} não encontrado")
+        # Buscar documento, template e instituição
+        documento, template, instituicao = self._carregar(DocumentoETP, documento_id)
         
-        # Buscar template
-        template = self.db.query(ModeloInstitucional).filter(
-            ModeloInstitucional.id == documento.template_id
-        ).first()
-        
-        if not template:
-            raise ValueError(f"Template {documento.template_id} não encontrado")
-        
-        # Buscar instituição
-        instituicao = self.db.query(Instituicao).filter(
-            Instituicao.id == template.instituicao_id
-        ).first()
+        # Reaproveitar a renderização em cache, se documento e template não mudaram
+        chave = render_key("etp", documento, template, instituicao)
+        cached_path = get_render_cache().get(chave) if chave else None
+        if cached_path:
+            return self._entregar(cached_path, output_path)
         
         # Criar documento Word
         doc = Document()
@@ -79,15 +131,16 @@ class DocumentGenerator:
         self._adicionar_secoes(doc, documento, template)
         
         # Adicionar rodapé
-        self._adicionar_rodape(doc, template, instituicao)
+        self._adicionar_rodape(doc, template, instituicao, self._data_rodape(documento, chave))
         
         # Salvar documento
-        if not output_path:
-            output_path = f"/tmp/etp_{documento_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
+        if not chave:
+            if not output_path:
+                output_path = f"/tmp/etp_{documento_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
+            doc.save(output_path)
+            return output_path
         
-        doc.save(output_path)
-        
-        return output_path
+        return self._entregar(self._salvar_em_cache(doc, chave), output_path)
     
     def gerar_tr_docx(
         self,
@@ -102,28 +155,17 @@ class DocumentGenerator:
             output_path: Caminho para salvar o arquivo (opcional)
         
         Returns:
-            Caminho do arquivo gerado
+            Caminho do arquivo gerado. Sem `output_path`, é o arquivo do cache
+            de renderizações (app.services.render_cache): não alterar nem mover
         """
-        # Buscar documento
-        documento = self.db.query(DocumentoTR).filter(
-            DocumentoTR.id == documento_id
-        ).first()
-        
-        if not documento:
-            raise ValueError(f"Documento {documento_id} não encontrado")
-        
-        # Buscar template
-        template = self.db.query(ModeloInstitucional).filter(
-            ModeloInstitucional.id == documento.template_id
-        ).first()
-        
-        if not template:
-            raise ValueError(f"Template {documento.template_id} não encontrado")
+        # Buscar documento, template e instituição
+        documento, template, instituicao = self._carregar(DocumentoTR, documento_id)
         
-        # Buscar instituição
-        instituicao = self.db.query(Instituicao).filter(
-            Instituicao.id == template.instituicao_id
-        ).first()
+        # Reaproveitar a renderização em cache, se documento e template não mudaram
+        chave = render_key("tr", documento, template, instituicao)
+        cached_path = get_render_cache().get(chave) if chave else None
+        if cached_path:
+            return self._entregar(cached_path, output_path)
         
         # Criar documento Word
         doc = Document()
@@ -144,14 +186,39 @@ class DocumentGenerator:
         self._adicionar_secoes_tr(doc, documento, template)
         
         # Adicionar rodapé
-        self._adicionar_rodape(doc, template, instituicao)
+        self._adicionar_rodape(doc, template, instituicao, self._data_rodape(documento, chave))
         
         # Salvar documento
-        if not output_path:
-            output_path = f"/tmp/tr_{documento_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
-        
-        doc.save(output_path)
+        if not chave:
+            if not output_path:
+                output_path = f"/tmp/tr_{documento_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
+            doc.save(output_path)
+            return output_path
         
+        return self._entregar(self._salvar_em_cache(doc, chave), output_path)
+    
+    def _salvar_em_cache(self, doc: Document, chave: str) -> str:
+        """
+        Salva o documento no cache de renderizações e retorna o caminho
+        """
+        cache = get_render_cache()
+        fd, tmp_path = tempfile.mkstemp(suffix=".part", dir=cache.directory)
+        os.close(fd)
+        try:
+            doc.save(tmp_path)
+            return cache.put(chave, tmp_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    
+    def _entregar(self, cached_path: str, output_path: Optional[str]) -> str:
+        """
+        Copia a renderização para `output_path`, se informado; senão retorna
+        o próprio arquivo do cache (somente leitura)
+        """
+        if not output_path:
+            return cached_path
+        shutil.copyfile(cached_path, output_path)
         return output_path
     
     def _aplicar_configuracoes(
@@ -318,11 +385,24 @@ class DocumentGenerator:
             
             doc.add_paragraph()  # Espaço entre seções
     
+    def _data_rodape(self, documento: Any, chave: Optional[str]) -> Optional[str]:
+        """
+        Texto de data do rodapé. Renderizações em cache são servidas muitas
+        vezes: trazem a data da última atualização do documento (parte da
+        chave), nunca a da renderização
+        """
+        if not chave:
+            return f"Documento gerado em {datetime.now().strftime('%d/%m/%Y às %H:%M')}"
+        if documento.updated_at:
+            return f"Documento atualizado em {documento.updated_at.strftime('%d/%m/%Y às %H:%M')}"
+        return None
+    
     def _adicionar_rodape(
         self,
         doc: Document,
         template: ModeloInstitucional,
-        instituicao: Optional[Instituicao]
+        instituicao: Optional[Instituicao],
+        texto_data: Optional[str]
     ):
         """
         Adiciona rodapé do documento
@@ -341,13 +421,12 @@ class DocumentGenerator:
             run.font.color.rgb = RGBColor(128, 128, 128)
         
         # Data de geração
-        p = doc.add_paragraph()
-        p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        run = p.add_run(
-            f"Documento gerado em {datetime.now().strftime('%d/%m/%Y às %H:%M')}"
-        )
-        run.font.size = Pt(8)
-        run.font.color.rgb = RGBColor(128, 128, 128)
+        if texto_data:
+            p = doc.add_paragraph()
+            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            run = p.add_run(texto_data)
+            run.font.size = Pt(8)
+            run.font.color.rgb = RGBColor(128, 128, 128)
         
         # Assinatura do sistema
         p = doc.add_paragraph()
@@ -360,23 +439,17 @@ class DocumentGenerator:
         """
         Converte documento DOCX para PDF
         
+        A conversão roda no pool de conversores (app.pdf.converter) e o PDF
+        fica em cache pelo hash do DOCX: documentos idênticos são
+        convertidos uma única vez.
+        
         Args:
             docx_path: Caminho do arquivo DOCX
         
         Returns:
-            Caminho do arquivo PDF gerado
+            Caminho do arquivo PDF gerado, no cache de PDFs: não alterar nem mover
         """
-        # TODO: Implementar conversão para PDF
-        # Opções:
-        # 1. LibreOffice headless: soffice --headless --convert-to pdf
-        # 2. python-docx-template + reportlab
-        # 3. docx2pdf (Windows only)
-        # 4. pypandoc
-        
-        pdf_path = docx_path.replace(".docx", ".pdf")
-        
-        # Por enquanto, apenas retornar path mockado
-        return pdf_path
+        return get_pdf_converter().convert(docx_path)
 
 
 
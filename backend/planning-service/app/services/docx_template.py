@@ -0,0 +1,132 @@
+"""
+DOCX templates with {{key}} placeholders, compiled once per file.
+
+Word often splits a placeholder typed by the user over several runs
+("{{", "obj", "eto}}") when formatting or spell checking touches it, so
+placeholders are located in the joined text of each paragraph with a
+single regex scan and mapped back to the runs they span. Rendering then
+edits only those runs: the value takes the formatting of the run where the
+placeholder starts and every other run keeps its own.
+"""
+
+import io
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
+
+from docx import Document
+from docx.document import Document as DocxDocument
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+
+PLACEHOLDER_RE = re.compile(r"\{\{([^{}]+)\}\}")
+
+
+@dataclass(frozen=True)
+class Placeholder:
+    key: str
+    paragraph: int  # index in iter_paragraphs order
+    first_run: int
+    start: int  # offset in the first run
+    last_run: int
+    end: int  # offset just past the placeholder in the last run
+
+
+def iter_paragraphs(document: DocxDocument) -> Iterator[Paragraph]:
+    """
+    Every paragraph of the body in document order, including those in table
+    cells (merged cells once, nested tables too), from a single walk of the
+    XML tree.
+    """
+    body = document._body
+    for p in body._element.iter(qn("w:p")):
+        yield Paragraph(p, body)
+
+
+def _locate(paragraph_index: int, paragraph: Paragraph) -> Iterator[Placeholder]:
+    texts = [run.text for run in paragraph.runs]
+    joined = "".join(texts)
+    if "{{" not in joined:
+        return
+    # Start offset of each run in the joined text
+    starts, offset = [], 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text)
+
+    run = 0
+    for match in PLACEHOLDER_RE.finditer(joined):
+        while starts[run] + len(texts[run]) <= match.start():
+            run += 1
+        first_run = run
+        last_run = run
+        while starts[last_run] + len(texts[last_run]) < match.end():
+            last_run += 1
+        yield Placeholder(
+            key=match.group(1),
+            paragraph=paragraph_index,
+            first_run=first_run,
+            start=match.start() - starts[first_run],
+            last_run=last_run,
+            end=match.end() - starts[last_run],
+        )
+        run = last_run
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    content: bytes
+    placeholders: Tuple[Placeholder, ...]
+
+    def render(self, context: Dict[str, object]) -> DocxDocument:
+        """
+        Returns a new document from the template with every placeholder whose
+        key is in `context` replaced by its value; others are left as they are.
+        """
+        document = Document(io.BytesIO(self.content))
+        if not self.placeholders:
+            return document
+        paragraphs = list(iter_paragraphs(document))
+        runs_by_paragraph: Dict[int, List] = {}
+        # Last to first, so earlier offsets in the same run stay valid
+        for placeholder in reversed(self.placeholders):
+            if placeholder.key not in context:
+                continue
+            runs = runs_by_paragraph.get(placeholder.paragraph)
+            if runs is None:
+                runs = runs_by_paragraph[placeholder.paragraph] = paragraphs[placeholder.paragraph].runs
+            value = str(context[placeholder.key])
+            first, last = runs[placeholder.first_run], runs[placeholder.last_run]
+            if placeholder.first_run == placeholder.last_run:
+                text = first.text
+                first.text = text[:placeholder.start] + value + text[placeholder.end:]
+                continue
+            last.text = last.text[placeholder.end:]
+            for run in runs[placeholder.first_run + 1:placeholder.last_run]:
+                run.text = ""
+            first.text = first.text[:placeholder.start] + value
+        return document
+
+
+@lru_cache(maxsize=32)
+def _compile(path: str, mtime_ns: int, size: int) -> CompiledTemplate:
+    with open(path, "rb") as f:
+        content = f.read()
+    document = Document(io.BytesIO(content))
+    placeholders = tuple(
+        placeholder
+        for index, paragraph in enumerate(iter_paragraphs(document))
+        for placeholder in _locate(index, paragraph)
+    )
+    return CompiledTemplate(content=content, placeholders=placeholders)
+
+
+def compile_template(path: str) -> CompiledTemplate:
+    """
+    Returns the compiled template of a DOCX file, cached per path and
+    recompiled when the file changes (modification time or size).
+    """
+    stat = os.stat(path)
+    return _compile(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
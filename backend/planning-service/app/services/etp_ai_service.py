@@ -1,17 +1,26 @@
+import asyncio
 import time
+from typing import AsyncIterator, List, Tuple
 from sqlalchemy.orm import Session
 from langchain_core.runnables import Runnable, RunnableLambda
 
 from app import crud, schemas
-from nexora_core.ai_engine import AIEngine
+from nexora_core.ai_engine import get_ai_engine
 from app.crud.crud_documento_etp import get_documento_etp
-from app.crud.crud_etp_ai_trace import create_trace
-from app.llm.chains.etp_field_chain import generate_field_content
+from app.core.config import ETP_BATCH_GENERATION_CONCURRENCY
+from app.crud.crud_etp_ai_trace import create_trace, create_traces
+from app.db.session import SessionLocal
+from app.llm.chains.etp_field_chain import (
+    PROMPT_TEMPLATES,
+    generate_field_content,
+    astream_field_content,
+    abatch_field_content,
+)
 from app.services.ai_provider import get_ai_provider
 from app.schemas.etp_ai_trace_schemas import ETPAITraceCreate
 
 
-def generate_section_content(db: Session, *, etp_id: int, section_name: str, keywords: str) -> schemas.ETPGenerateSectionOut:
+async def generate_section_content(db: Session, *, etp_id: int, section_name: str, keywords: str) -> schemas.ETPGenerateSectionOut:
     """
     Generates content for a specific ETP section using AI.
     """
@@ -23,10 +32,10 @@ def generate_section_content(db: Session, *, etp_id: int, section_name: str, key
     # 2. Prompt Engineering
     prompt = f"Aja como um especialista em compras públicas. Com base nas palavras-chave '{keywords}', escreva um parágrafo para a seção '{section_name}' de um Estudo Técnico Preliminar."
 
-    # 3. Call AIEngine
-    ai_engine = AIEngine()
+    # 3. Call the shared AIEngine without blocking the event loop
+    ai_engine = get_ai_engine()
     start_time = time.time()
-    generation_result = ai_engine.generate(prompt)
+    generation_result = await ai_engine.agenerate(prompt, semantic_key=keywords)
     end_time = time.time()
     latency_ms = int((end_time - start_time) * 1000)
 
@@ -50,24 +59,11 @@ def generate_section_content(db: Session, *, etp_id: int, section_name: str, key
     )
 
 
-def generate_field(db: Session, *, etp_id: int, field: str) -> dict:
+def _resolve_llm() -> Tuple[Runnable, str, str]:
     """
-    Generates content for a specific ETP field, orchestrating the process.
-
-    Args:
-        db: The database session.
-        etp_id: The ID of the ETP document.
-        field: The name of the field to generate content for.
-
-    Returns:
-        A dictionary containing the generated content and trace information.
+    Resolves the configured AI provider into a runnable LLM plus the provider
+    and model names recorded in the ETP AI traces.
     """
-    # 1. Busca o ETP
-    etp = get_documento_etp(db, etp_id=etp_id)
-    if not etp:
-        raise ValueError(f"ETP with id {etp_id} not found.")
-
-    # 2. Obtém o provedor de IA
     provider = get_ai_provider()
 
     get_client = getattr(provider, "get_client", None)
@@ -101,6 +97,29 @@ def generate_field(db: Session, *, etp_id: int, field: str) -> dict:
         else getattr(provider, "model_name", "unknown")
     )
 
+    return llm, provider_name, model_name
+
+
+def generate_field(db: Session, *, etp_id: int, field: str) -> dict:
+    """
+    Generates content for a specific ETP field, orchestrating the process.
+
+    Args:
+        db: The database session.
+        etp_id: The ID of the ETP document.
+        field: The name of the field to generate content for.
+
+    Returns:
+        A dictionary containing the generated content and trace information.
+    """
+    # 1. Busca o ETP
+    etp = get_documento_etp(db, etp_id=etp_id)
+    if not etp:
+        raise ValueError(f"ETP with id {etp_id} not found.")
+
+    # 2. Obtém o provedor de IA
+    llm, provider_name, model_name = _resolve_llm()
+
     # 3. Chama a cadeia de geração
     generation_result = generate_field_content(llm=llm, field=field, etp_data=etp.dados)
 
@@ -122,3 +141,136 @@ def generate_field(db: Session, *, etp_id: int, field: str) -> dict:
         "provider": provider_name,
         "confidence": generation_result.get("confidence"),
     }
+
+
+async def stream_field(db: Session, *, etp_id: int, field: str) -> AsyncIterator[dict]:
+    """
+    Streams the content generated for a specific ETP field.
+
+    The ETP and the provider are resolved with `db` before the first chunk is
+    produced, so lookup errors surface before streaming starts. The trace is
+    written to etp_ai_traces once the stream finishes, with a session the
+    stream opens itself: the request's session is closed by then.
+
+    Args:
+        db: The database session, only used before streaming starts.
+        etp_id: The ID of the ETP document.
+        field: The name of the field to generate content for.
+
+    Returns:
+        An async iterator of chunks with the new text in "delta"; the last
+        chunk also carries the provider and confidence.
+    """
+    etp = get_documento_etp(db, etp_id=etp_id)
+    if not etp:
+        raise ValueError(f"ETP with id {etp_id} not found.")
+    if field not in PROMPT_TEMPLATES:
+        raise ValueError(f"No prompt template found for field: {field}")
+
+    llm, provider_name, model_name = _resolve_llm()
+    stream = astream_field_content(llm=llm, field=field, etp_data=etp.dados)
+
+    async def _generate():
+        final_chunk = None
+        async for chunk in stream:
+            final_chunk = chunk
+            if chunk["delta"]:
+                yield {"delta": chunk["delta"]}
+
+        trace_in = ETPAITraceCreate(
+            etp_id=etp_id,
+            field=field,
+            prompt=final_chunk.get("prompt", ""),
+            response=final_chunk.get("response", ""),
+            confidence=final_chunk.get("confidence"),
+            provider=provider_name,
+            model=model_name,
+        )
+        trace_db = SessionLocal()
+        try:
+            create_trace(trace_db, trace_in=trace_in)
+        finally:
+            trace_db.close()
+
+        yield {
+            "delta": "",
+            "generated_content": final_chunk.get("response"),
+            "provider": provider_name,
+            "confidence": final_chunk.get("confidence"),
+        }
+
+    return _generate()
+
+
+async def generate_fields(db: Session, *, etp_id: int, fields: List[str]) -> AsyncIterator[dict]:
+    """
+    Generates several ETP fields concurrently, yielding each result as it completes.
+
+    Concurrency is bounded by ETP_BATCH_GENERATION_CONCURRENCY. The traces of
+    the successful fields are collected and written with a single bulk insert
+    when the stream ends, in a worker thread and with a session of its own
+    (the request's session is closed by then). The write runs in a finally
+    block, so a client disconnecting mid-batch does not lose the traces of
+    the fields already generated.
+
+    Args:
+        db: The database session, only used before streaming starts.
+        etp_id: The ID of the ETP document.
+        fields: The names of the fields to generate.
+
+    Returns:
+        An async iterator of per-field results; failed fields carry "error".
+    """
+    etp = get_documento_etp(db, etp_id=etp_id)
+    if not etp:
+        raise ValueError(f"ETP with id {etp_id} not found.")
+
+    fields = list(dict.fromkeys(fields))
+    unknown = [field for field in fields if field not in PROMPT_TEMPLATES]
+    if unknown:
+        raise ValueError(f"No prompt template found for field: {', '.join(unknown)}")
+
+    llm, provider_name, model_name = _resolve_llm()
+    results = abatch_field_content(
+        llm=llm,
+        fields=fields,
+        etp_data=etp.dados,
+        max_concurrency=ETP_BATCH_GENERATION_CONCURRENCY,
+    )
+
+    async def _generate():
+        traces_in = []
+        try:
+            async for field, result in results:
+                if isinstance(result, Exception):
+                    yield {"field": field, "error": str(result)}
+                    continue
+
+                traces_in.append(ETPAITraceCreate(
+                    etp_id=etp_id,
+                    field=field,
+                    prompt=result.get("prompt", ""),
+                    response=result.get("response", ""),
+                    confidence=result.get("confidence"),
+                    provider=provider_name,
+                    model=model_name,
+                ))
+                yield {
+                    "field": field,
+                    "generated_content": result.get("response"),
+                    "provider": provider_name,
+                    "confidence": result.get("confidence"),
+                }
+        finally:
+            if traces_in:
+                await asyncio.to_thread(_save_traces, traces_in)
+
+    return _generate()
+
+
+def _save_traces(traces_in: List[ETPAITraceCreate]) -> None:
+    trace_db = SessionLocal()
+    try:
+        create_traces(trace_db, traces_in)
+    finally:
+        trace_db.close()
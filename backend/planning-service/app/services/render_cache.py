@@ -0,0 +1,65 @@
+"""
+Cache of the DOCX files generated by DocumentGenerator.
+
+A rendering depends only on the document, its template, the institution
+and the generator code, so its key is built from their ids and versions
+(updated_at, versao) plus GENERATOR_VERSION: any edit changes the key, and
+stale entries age out of the LRU. The invalidate_* hooks drop entries
+right away, for changes that do not touch updated_at (e.g. a JSON column
+mutated in place) and to free space once a document or template is gone.
+"""
+
+import hashlib
+import threading
+from typing import Any, Optional
+
+from app.core.config import DOCX_CACHE_DIR, DOCX_CACHE_MAX_BYTES
+from app.utils.file_cache import FileCache
+
+# Bump whenever DocumentGenerator's output changes, to discard old renderings
+GENERATOR_VERSION = "2"
+
+
+def render_key(tipo: str, documento: Any, template: Any, instituicao: Optional[Any]) -> Optional[str]:
+    """
+    Cache key of a rendering, as `<tipo>-<documento id>-t<template id>-<digest>`
+    so the hooks can match entries by prefix. None when the document has no
+    version to key on (not cached).
+    """
+    if documento.updated_at is None and getattr(documento, "versao", None) is None:
+        return None
+    versions = (
+        GENERATOR_VERSION,
+        documento.updated_at,
+        getattr(documento, "versao", None),
+        template.versao,
+        template.updated_at,
+        instituicao.id if instituicao else None,
+        instituicao.updated_at if instituicao else None,
+    )
+    digest = hashlib.sha256(repr(versions).encode()).hexdigest()[:32]
+    return f"{tipo}-{documento.id}-t{template.id}-{digest}"
+
+
+_cache: Optional[FileCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_render_cache() -> FileCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = FileCache(DOCX_CACHE_DIR, DOCX_CACHE_MAX_BYTES, ".docx")
+        return _cache
+
+
+def invalidate_documento(tipo: str, documento_id: Any) -> int:
+    """Drops the cached renderings of a document ("etp" or "tr")."""
+    prefix = f"{tipo}-{documento_id}-"
+    return get_render_cache().invalidate(lambda key: key.startswith(prefix))
+
+
+def invalidate_template(template_id: int) -> int:
+    """Drops the cached renderings of every document using a template."""
+    marker = f"-t{template_id}-"
+    return get_render_cache().invalidate(lambda key: marker in key)
@@ -2,9 +2,9 @@ import hashlib
 import os
 import shutil
 import tempfile
-from reportlab.pdfgen import canvas
 from sqlalchemy.orm import Session
 from app.db.models.tr import TR, TRStatus
+from app.pdf.converter import get_pdf_converter
 from app.schemas.tr_version import TRVersionCreate
 from app.services.tr_docx_builder import TRDocxBuilder
 import app.crud as crud
@@ -34,8 +34,8 @@ class TRConsolidationService:
         docx_builder = TRDocxBuilder(tr, template_path=template_path)
         docx_path = docx_builder.build()
 
-        # 2. Generate PDF (placeholder)
-        pdf_path = self._generate_pdf(tr)
+        # 2. Generate PDF
+        pdf_path = self._generate_pdf(tr, docx_path)
 
         # 3. Process and store artifacts
         self._process_artifact(tr, docx_path, "docx")
@@ -71,15 +71,14 @@ class TRConsolidationService:
         )
         crud.tr_version.create(self.db, obj_in=version_data)
 
-    def _generate_pdf(self, tr: TR) -> str:
+    def _generate_pdf(self, tr: TR, docx_path: str) -> str:
         """
-        Generates a placeholder PDF.
+        Renders the consolidated DOCX to PDF through the converter pool.
+        Returns a copy of the cached rendering, since storing moves the file.
         """
         temp_dir = tempfile.gettempdir()
         file_path = os.path.join(temp_dir, f"tr_{tr.id}.pdf")
-        c = canvas.Canvas(file_path)
-        c.drawString(100, 750, f"Termo de Referência - {tr.title}")
-        c.save()
+        shutil.copyfile(get_pdf_converter().convert(docx_path), file_path)
         return file_path
 
     def _calculate_sha256(self, file_path: str) -> str:
@@ -1,15 +1,16 @@
 import os
 import tempfile
-from docx import Document
 from app.db.models.tr import TR
+from app.services.docx_template import compile_template
 
 class TRDocxBuilder:
     def __init__(self, tr: TR, template_path: str):
         self.tr = tr
         if not os.path.exists(template_path):
             raise FileNotFoundError(f"Template not found at path: {template_path}")
-        self.document = Document(template_path)
-        self.context = self.tr.data
+        self.template = compile_template(template_path)
+        self.context = {**self.tr.data, "objeto": self.tr.title}
+        self.document = None
 
     def build(self) -> str:
         """
@@ -22,34 +23,10 @@ class TRDocxBuilder:
 
     def _replace_placeholders(self):
         """
-        Replaces placeholders in the format {{key}} with data from the TR.
+        Renders the compiled template, replacing placeholders in the format
+        {{key}} with data from the TR while keeping the formatting of their runs.
         """
-        context = {**self.tr.data, "objeto": self.tr.title}
-
-        # Replace in paragraphs
-        for p in self.document.paragraphs:
-            text = p.text
-            for key, value in context.items():
-                placeholder = f"{{{{{key}}}}}"
-                if placeholder in text:
-                    text = text.replace(placeholder, str(value))
-            if p.text != text:
-                p.clear()
-                p.add_run(text)
-
-        # Replace in tables
-        for table in self.document.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for p in cell.paragraphs:
-                        text = p.text
-                        for key, value in context.items():
-                            placeholder = f"{{{{{key}}}}}"
-                            if placeholder in text:
-                                text = text.replace(placeholder, str(value))
-                        if p.text != text:
-                            p.clear()
-                            p.add_run(text)
+        self.document = self.template.render(self.context)
 
     def _add_gap_report(self):
         """
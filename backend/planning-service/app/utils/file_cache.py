@@ -0,0 +1,65 @@
+import os
+from typing import Callable, Optional
+
+
+class FileCache:
+    """
+    Files stored as `<key><suffix>` in a directory, evicted least recently
+    used first once they exceed `max_bytes` in total. Several processes may
+    share the directory: entries are only ever replaced atomically.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, suffix: str):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{self.suffix}")
+
+    def get(self, key: str) -> Optional[str]:
+        path = self.path(key)
+        try:
+            os.utime(path)  # recency for eviction
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, source_path: str) -> str:
+        """Moves `source_path` (on the same filesystem) into the cache."""
+        path = self.path(key)
+        os.replace(source_path, path)
+        self._evict()
+        return path
+
+    def invalidate(self, match: Callable[[str], bool]) -> int:
+        """Removes the entries whose key satisfies `match`; returns how many."""
+        removed = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.suffix) and match(entry.name[:-len(self.suffix)]):
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.suffix):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
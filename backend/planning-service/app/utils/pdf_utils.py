@@ -2,6 +2,7 @@ import uuid
 from fastapi import HTTPException, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from app.pdf.converter import PdfConversionTimeout, PdfConverterBusy
 from app.services.document_generator import DocumentGenerator
 
 def generate_pdf_response(doc_id: uuid.UUID, doc_type: str, db: Session):
@@ -21,18 +22,30 @@ def generate_pdf_response(doc_id: uuid.UUID, doc_type: str, db: Session):
             )
 
         pdf_path = doc_generator.converter_para_pdf(docx_path)
+        # Opened now: the cached file may be evicted before streaming starts
+        pdf_file = open(pdf_path, "rb")
 
-        def file_iterator(file_path):
-            with open(file_path, "rb") as f:
+        def file_iterator(f):
+            with f:
                 yield from f
 
         return StreamingResponse(
-            file_iterator(pdf_path),
+            file_iterator(pdf_file),
             media_type="application/pdf",
             headers={
                 "Content-Disposition": f"attachment; filename={doc_type}_{doc_id}.pdf"
             },
         )
+    except PdfConverterBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to generate PDF: {e}",
+        )
+    except PdfConversionTimeout as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Failed to generate PDF: {e}",
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,28 @@
+import json
+from typing import Any, AsyncIterator, Optional
+
+from fastapi.responses import StreamingResponse
+
+
+def format_sse(data: Any, event: Optional[str] = None) -> str:
+    """
+    Formats a payload as a Server-Sent Events message.
+
+    The payload is JSON-encoded so multi-line text never breaks the framing.
+    """
+    message = f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    if event:
+        message = f"event: {event}\n{message}"
+    return message
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """
+    Wraps an iterator of formatted SSE messages in a streaming response with
+    the headers needed to stop proxies from buffering it.
+    """
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,6 +1,6 @@
 import pytest
 import uuid
-from unittest.mock import patch
+from unittest.mock import patch, AsyncMock
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from app.db.models.etp_modular import DocumentoETP
@@ -20,7 +20,7 @@ def test_etp(db: Session) -> DocumentoETP:
     db.refresh(etp)
     return etp
 
-@patch("nexora_core.ai_engine.AIEngine.generate")
+@patch("nexora_core.ai_engine.AIEngine.agenerate", new_callable=AsyncMock)
 def test_generate_etp_section_success(mock_ai_generate, client: TestClient, db: Session, test_etp: DocumentoETP):
     # Mock the AIEngine response
     mock_ai_generate.return_value = {
@@ -47,7 +47,7 @@ def test_generate_etp_section_success(mock_ai_generate, client: TestClient, db:
 
     # Verify prompt construction
     expected_prompt = "Aja como um especialista em compras públicas. Com base nas palavras-chave 'aquisição de notebooks', escreva um parágrafo para a seção 'necessidade' de um Estudo Técnico Preliminar."
-    mock_ai_generate.assert_called_once_with(expected_prompt)
+    mock_ai_generate.assert_awaited_once_with(expected_prompt, semantic_key="aquisição de notebooks")
 
     # Verify database record
     execution_id = uuid.UUID(data["execution_id"])
@@ -1,11 +1,28 @@
+import asyncio
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 from unittest.mock import patch
 from app.db.models.etp_modular import DocumentoETP
+from app.services import etp_ai_service
 from tests.utils.user import create_test_token
 
 
+@pytest.fixture(autouse=True)
+def stream_sessions(db: Session, monkeypatch):
+    """Sessions opened by the streams, on the test transaction."""
+    sessions = []
+    factory = sessionmaker(bind=db.get_bind())
+
+    def session_local():
+        sessions.append(factory())
+        return sessions[-1]
+
+    monkeypatch.setattr(etp_ai_service, "SessionLocal", session_local)
+    return sessions
+
+
 @pytest.fixture
 def test_etp(db: Session) -> DocumentoETP:
     etp = DocumentoETP(
@@ -60,3 +77,126 @@ def test_generate_etp_field_not_found(client: TestClient, db: Session):
     )
     assert response.status_code == 404
     assert "not found" in response.json()["detail"]
+
+
+@patch("app.services.etp_ai_service.get_ai_provider")
+def test_stream_etp_field_success(mock_get_ai_provider, client: TestClient, db: Session, test_etp: DocumentoETP, stream_sessions):
+    class MockProvider:
+        def get_client(self):
+            class MockClient:
+                def invoke(self, *args, **kwargs):
+                    return '{"response": "Streamed content", "confidence": 0.8}'
+            return MockClient()
+
+    mock_get_ai_provider.return_value = MockProvider()
+    token = create_test_token("test@example.com")
+
+    response = client.post(
+        f"/api/v1/etp/{test_etp.id}/generate/justificativa/stream",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    body = response.text
+    assert "event: token" in body
+    assert "event: done" in body
+    assert '"generated_content": "Streamed content"' in body
+
+    # The trace is written once the stream finishes
+    from sqlalchemy import text
+    trace = db.execute(text("SELECT * FROM etp_ai_traces")).fetchone()
+    assert trace is not None
+    assert trace.field == "justificativa"
+    assert trace.response == "Streamed content"
+    # Written with a session owned (and closed) by the stream
+    assert len(stream_sessions) == 1
+    assert not stream_sessions[0].in_transaction()
+
+
+def test_stream_etp_field_not_found(client: TestClient, db: Session):
+    token = create_test_token("test@example.com")
+    response = client.post(
+        "/api/v1/etp/999/generate/justificativa/stream",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 404
+    assert "not found" in response.json()["detail"]
+
+
+@patch("app.services.etp_ai_service.get_ai_provider")
+def test_generate_etp_fields_batch(mock_get_ai_provider, client: TestClient, db: Session, test_etp: DocumentoETP):
+    class MockProvider:
+        def get_client(self):
+            class MockClient:
+                def invoke(self, prompt, *args, **kwargs):
+                    if "defina o objeto" in str(prompt):
+                        raise RuntimeError("provider failure")
+                    return '{"response": "Batch content", "confidence": 0.7}'
+            return MockClient()
+
+    mock_get_ai_provider.return_value = MockProvider()
+    token = create_test_token("test@example.com")
+
+    response = client.post(
+        f"/api/v1/etp/{test_etp.id}/generate-fields",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"fields": ["justificativa", "necessidade", "objeto"]},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    body = response.text
+    assert body.count("event: field") == 3
+    assert '"field": "objeto", "error": "provider failure"' in body
+    assert '"generated": 2, "failed": 1' in body
+
+    # The successful fields are written in one bulk insert at the end
+    from sqlalchemy import text
+    traces = db.execute(text("SELECT field, response FROM etp_ai_traces ORDER BY field")).fetchall()
+    assert [(t.field, t.response) for t in traces] == [
+        ("justificativa", "Batch content"),
+        ("necessidade", "Batch content"),
+    ]
+
+
+def test_generate_etp_fields_unknown_field(client: TestClient, db: Session, test_etp: DocumentoETP):
+    token = create_test_token("test@example.com")
+    response = client.post(
+        f"/api/v1/etp/{test_etp.id}/generate-fields",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"fields": ["justificativa", "inexistente"]},
+    )
+    assert response.status_code == 404
+    assert "inexistente" in response.json()["detail"]
+
+
+@patch("app.services.etp_ai_service.get_ai_provider")
+def test_generate_fields_keeps_traces_of_fields_done_before_disconnect(
+    mock_get_ai_provider, db: Session, test_etp: DocumentoETP, stream_sessions
+):
+    class MockProvider:
+        def get_client(self):
+            class MockClient:
+                def invoke(self, *args, **kwargs):
+                    return '{"response": "Batch content", "confidence": 0.7}'
+            return MockClient()
+
+    mock_get_ai_provider.return_value = MockProvider()
+
+    async def consume_first_field():
+        results = await etp_ai_service.generate_fields(
+            db, etp_id=test_etp.id, fields=["justificativa", "necessidade", "objeto"]
+        )
+        first = await results.__anext__()
+        await results.aclose()  # the client went away
+        return first
+
+    with patch.object(etp_ai_service, "create_traces", wraps=etp_ai_service.create_traces) as create_traces:
+        first = asyncio.run(consume_first_field())
+
+    create_traces.assert_called_once()
+    from sqlalchemy import text
+    traces = db.execute(text("SELECT field FROM etp_ai_traces")).fetchall()
+    assert first["field"] in [t.field for t in traces]
+    assert not stream_sessions[0].in_transaction()
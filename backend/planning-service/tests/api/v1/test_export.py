@@ -0,0 +1,83 @@
+import hashlib
+import io
+import json
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import API_V1_STR
+from app.services import bulk_export, render_cache
+from app.utils.file_cache import FileCache
+from tests.utils.documento import create_documento_etp, create_instituicao, create_modelo_institucional
+
+
+@pytest.fixture(autouse=True)
+def in_process_export(db: Session, tmp_path, monkeypatch):
+    # Render in a thread of the test process, on the test transaction
+    monkeypatch.setattr(bulk_export, "_get_export_pool", lambda: None)
+    monkeypatch.setattr(bulk_export, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    monkeypatch.setattr(bulk_export, "EXPORT_BATCH_SIZE", 2)
+    monkeypatch.setattr(render_cache, "_cache", FileCache(str(tmp_path / "docx"), 10 * 1024 * 1024, ".docx"))
+
+
+def _export(client: TestClient, **params) -> zipfile.ZipFile:
+    response = client.get(f"{API_V1_STR}/export/documentos", params=params)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/zip"
+    return zipfile.ZipFile(io.BytesIO(response.content))
+
+
+def test_export_zip_with_checksums(client: TestClient, db: Session) -> None:
+    instituicao = create_instituicao(db)
+    modelo = create_modelo_institucional(db, instituicao)
+    documentos = [create_documento_etp(db, modelo, f"Item {i}") for i in range(5)]
+    outra = create_modelo_institucional(db, create_instituicao(db))
+    create_documento_etp(db, outra)
+
+    archive = _export(client, tipo="etp", instituicao_id=instituicao.id)
+
+    manifest = json.loads(archive.read("manifest.json"))
+    assert manifest["erros"] == []
+    assert sorted(a["documento_id"] for a in manifest["arquivos"]) == [d.id for d in documentos]
+    for arquivo in manifest["arquivos"]:
+        content = archive.read(arquivo["arquivo"])
+        assert hashlib.sha256(content).hexdigest() == arquivo["sha256"]
+        assert len(content) == arquivo["tamanho_bytes"]
+        assert content.startswith(b"PK")  # a DOCX
+
+    sums = archive.read("SHA256SUMS").decode().splitlines()
+    assert sorted(sums) == sorted(f"{a['sha256']}  {a['arquivo']}" for a in manifest["arquivos"])
+
+
+def test_export_reports_documents_that_fail(client: TestClient, db: Session) -> None:
+    modelo = create_modelo_institucional(db, create_instituicao(db))
+    ok = create_documento_etp(db, modelo)
+    broken = create_documento_etp(db, modelo)
+    broken.template_id = 12345
+    db.commit()
+
+    manifest = json.loads(_export(client, tipo="etp").read("manifest.json"))
+
+    assert [a["documento_id"] for a in manifest["arquivos"]] == [ok.id]
+    assert manifest["erros"] == [
+        {"tipo": "etp", "documento_id": broken.id, "erro": "Template 12345 não encontrado"}
+    ]
+
+
+def test_export_rejects_invalid_filters(client: TestClient, monkeypatch) -> None:
+    assert client.get(f"{API_V1_STR}/export/documentos", params={"tipo": "plano"}).status_code == 400
+    assert client.get(f"{API_V1_STR}/export/documentos", params={"formato": "odt"}).status_code == 400
+
+
+def test_export_limit(client: TestClient, db: Session, monkeypatch) -> None:
+    from app.api.v1.endpoints import export
+
+    monkeypatch.setattr(export, "EXPORT_MAX_DOCUMENTS", 1)
+    modelo = create_modelo_institucional(db, create_instituicao(db))
+    create_documento_etp(db, modelo)
+    create_documento_etp(db, modelo)
+
+    response = client.get(f"{API_V1_STR}/export/documentos", params={"tipo": "etp"})
+    assert response.status_code == 400
@@ -0,0 +1,49 @@
+import hashlib
+import time
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+async def fake_ingest_document(file_path, document_id=None, source=None, version=None, job=None):
+    with open(file_path, "rb") as f:
+        assert f.read() == b"%PDF-1.4 fake"
+    job.pages_total = job.pages_done = 3
+    return {"document_id": document_id, "version": version, "added": 4, "deleted": 0, "unchanged": 0}
+
+
+@patch("app.api.v1.endpoints.rag.ingest_document", fake_ingest_document)
+def test_ingest_runs_as_background_job():
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/rag/rag/ingest",
+            files={"file": ("Lei 14.133.pdf", b"%PDF-1.4 fake", "application/pdf")},
+        )
+        assert response.status_code == 202
+        job = response.json()
+        assert job["document_id"] == "Lei-14.133"
+        assert job["status"] in ("queued", "running", "done")
+
+        for _ in range(50):
+            job = client.get(f"/api/v1/rag/rag/ingest/{job['job_id']}").json()
+            if job["status"] not in ("queued", "running"):
+                break
+            time.sleep(0.02)
+
+    assert job["status"] == "done"
+    assert job["added"] == 4
+    assert job["pages_done"] == 3
+    # SHA-256 computed while streaming the upload
+    assert job["version"] == hashlib.sha256(b"%PDF-1.4 fake").hexdigest()
+
+
+def test_ingest_rejects_non_pdf_and_unknown_job():
+    client = TestClient(app)
+    response = client.post(
+        "/api/v1/rag/rag/ingest",
+        files={"file": ("notes.txt", b"hello", "text/plain")},
+    )
+    assert response.status_code == 400
+    assert client.get("/api/v1/rag/rag/ingest/unknown").status_code == 404
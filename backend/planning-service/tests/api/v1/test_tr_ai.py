@@ -0,0 +1,26 @@
+from fastapi.testclient import TestClient
+from langchain_core.runnables import RunnableGenerator
+
+from app.llm.chains.technical_specs_chain import get_technical_specs_chain
+from app.main import app
+
+
+def test_stream_technical_specs(client: TestClient):
+    async def fake_chain(inputs):
+        async for object_description in inputs:
+            for chunk in ["Especificação ", "de ", object_description]:
+                yield chunk
+
+    app.dependency_overrides[get_technical_specs_chain] = lambda: RunnableGenerator(fake_chain)
+    try:
+        response = client.post(
+            "/api/v1/tr/ai/tr/generate/technical-specs/stream",
+            json={"object_description": "notebooks"},
+        )
+    finally:
+        del app.dependency_overrides[get_technical_specs_chain]
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.count("event: token") == 3
+    assert '"technical_specs": "Especificação de notebooks"' in response.text
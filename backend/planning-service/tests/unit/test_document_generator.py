@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import event
+
+from app.db.models.etp_modular import DocumentoETP
+from app.services import render_cache
+from app.services.document_generator import DocumentGenerator
+from app.utils.file_cache import FileCache
+from tests.utils.documento import create_documento_etp, create_instituicao, create_modelo_institucional
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(render_cache, "_cache", FileCache(str(tmp_path), 10 * 1024 * 1024, ".docx"))
+
+
+@pytest.fixture
+def count_queries(db):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    engine = db.get_bind().engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_document_template_and_institution_load_in_one_query(db, count_queries):
+    modelo = create_modelo_institucional(db, create_instituicao(db))
+    documento = create_documento_etp(db, modelo)
+    expected = (documento.id, modelo.id, modelo.instituicao_id)
+    db.expire_all()
+    count_queries.clear()
+
+    loaded, template, instituicao = DocumentGenerator(db)._carregar(DocumentoETP, expected[0])
+
+    assert (loaded.id, template.id, instituicao.id) == expected
+    assert len(count_queries) == 1
+
+
+def test_batch_issues_constant_queries(db, count_queries):
+    instituicao = create_instituicao(db)
+    modelos = [create_modelo_institucional(db, instituicao, versao=str(i)) for i in range(2)]
+    documentos = [create_documento_etp(db, modelos[i % 2], f"Item {i}") for i in range(6)]
+    ids = [documento.id for documento in documentos]
+    db.expire_all()
+    count_queries.clear()
+
+    generator = DocumentGenerator(db)
+    generator.precarregar(DocumentoETP, ids)
+    paths = [generator.gerar_etp_docx(documento_id) for documento_id in ids]
+
+    assert len(set(paths)) == len(ids)
+    assert len(count_queries) == 2
+
+
+def test_missing_documento_and_template(db):
+    generator = DocumentGenerator(db)
+    with pytest.raises(ValueError, match="Documento 999 não encontrado"):
+        generator.gerar_etp_docx(999)
+
+    documento = create_documento_etp(db, create_modelo_institucional(db, create_instituicao(db)))
+    documento.template_id = 12345
+    db.commit()
+    with pytest.raises(ValueError, match="Template 12345 não encontrado"):
+        DocumentGenerator(db).gerar_etp_docx(documento.id)
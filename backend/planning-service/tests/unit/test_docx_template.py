@@ -0,0 +1,82 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+from docx import Document
+
+from app.services import docx_template
+from app.services.docx_template import compile_template, iter_paragraphs
+from app.services.tr_docx_builder import TRDocxBuilder
+
+
+def _template(path, *paragraph_runs, table_cell=None):
+    """Each paragraph is a list of (text, bold) runs."""
+    document = Document()
+    for runs in paragraph_runs:
+        paragraph = document.add_paragraph()
+        for text, bold in runs:
+            paragraph.add_run(text).bold = bold
+    if table_cell is not None:
+        table = document.add_table(rows=1, cols=2)
+        table.rows[0].cells[0].text = "Objeto"
+        table.rows[0].cells[1].text = table_cell
+    document.save(str(path))
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def clear_compiled():
+    docx_template._compile.cache_clear()
+
+
+def test_placeholders_split_across_runs_keep_formatting(tmp_path):
+    path = _template(
+        tmp_path / "t.docx",
+        [("Objeto: ", False), ("{{ob", True), ("jeto}}", False), (" em {{prazo}} dias", False)],
+    )
+
+    document = compile_template(path).render({"objeto": "Notebooks", "prazo": 30})
+
+    runs = document.paragraphs[0].runs
+    assert [(run.text, bool(run.bold)) for run in runs] == [
+        ("Objeto: ", False), ("Notebooks", True), ("", False), (" em 30 dias", False),
+    ]
+
+
+def test_tables_unknown_keys_and_repeated_placeholders(tmp_path):
+    path = _template(
+        tmp_path / "t.docx",
+        [("{{a}} e {{a}}, {{desconhecido}}", False)],
+        table_cell="{{a}}{{b}}",
+    )
+
+    document = compile_template(path).render({"a": "X", "b": "Y"})
+
+    assert document.paragraphs[0].text == "X e X, {{desconhecido}}"
+    assert document.tables[0].rows[0].cells[1].text == "XY"
+
+
+def test_compiled_once_per_template_version(tmp_path):
+    path = _template(tmp_path / "t.docx", [("{{a}}", False)])
+
+    first = compile_template(path)
+    assert compile_template(path) is first
+    assert [p.text for p in iter_paragraphs(first.render({"a": 1}))] == ["1"]
+    assert [p.text for p in iter_paragraphs(first.render({"a": 2}))] == ["2"]
+
+    _template(tmp_path / "t.docx", [("{{a}}!", False)])
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    assert compile_template(path).render({"a": 3}).paragraphs[0].text == "3!"
+    assert docx_template._compile.cache_info().misses == 2
+
+
+def test_tr_docx_builder(tmp_path):
+    path = _template(tmp_path / "t.docx", [("TR: {{objeto}} - {{valor}}", False)])
+    tr = SimpleNamespace(id=1, title="Notebooks", data={"valor": "R$ 10,00"}, gaps={})
+
+    output = TRDocxBuilder(tr, template_path=path).build()
+
+    paragraphs = [p.text for p in Document(output).paragraphs]
+    assert paragraphs[0] == "TR: Notebooks - R$ 10,00"
+    assert paragraphs[-1] == "Nenhum gap encontrado."
+    os.remove(output)
@@ -0,0 +1,145 @@
+import threading
+
+from langchain_core.documents import Document
+
+from app.llm import registry
+from app.rag import hybrid_retriever
+from app.rag.hybrid_retriever import (
+    BM25Index,
+    BM25IndexCache,
+    HybridRetriever,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+
+
+def _doc(pk, text):
+    return Document(page_content=text, metadata={"pk": pk})
+
+
+CHUNKS = [
+    _doc("a", "A contratação direta exige justificativa de preço e razão da escolha do fornecedor."),
+    _doc("b", "Conforme o art. 18 da Lei 14.133, a fase preparatória é caracterizada pelo planejamento."),
+    _doc("c", "O estudo técnico preliminar descreve a necessidade da contratação."),
+    _doc("d", "O art. 75 da Lei 14.133 trata da dispensa de licitação."),
+]
+
+
+class FakeVectorStore:
+    col = None
+
+    def __init__(self, results):
+        self.results = results
+
+    def similarity_search(self, query, k):
+        return self.results[:k]
+
+
+class FixedIndexCache(BM25IndexCache):
+    def __init__(self, documents):
+        super().__init__()
+        self._fixed = BM25Index(documents)
+
+    def get(self, vector_store):
+        return self._fixed
+
+
+def test_tokenize_keeps_citations_and_folds_accents():
+    assert tokenize("Art. 18 da Lei 14.133 — Licitação") == ["art", "18", "da", "lei", "14.133", "licitacao"]
+
+
+def test_bm25_ranks_exact_citation_first():
+    index = BM25Index(CHUNKS)
+    results = index.search("art. 18 Lei 14.133", k=2)
+    assert [doc.metadata["pk"] for doc, _ in results] == ["b", "d"]
+    assert index.search("inexistente", k=3) == []
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([[CHUNKS[0], CHUNKS[1]], [CHUNKS[1], CHUNKS[2]]], k=60)
+    assert [doc.metadata["pk"] for doc in fused] == ["b", "a", "c"]
+
+
+def test_hybrid_retriever_recovers_citation_missed_by_vectors():
+    # The vector search ranks semantically close chunks and misses the citation
+    vector_store = FakeVectorStore([CHUNKS[3], CHUNKS[2], CHUNKS[0]])
+    retriever = HybridRetriever(
+        vector_store=vector_store, k=2, fetch_k=3, index_cache=FixedIndexCache(CHUNKS)
+    )
+
+    docs = retriever.invoke("art. 18 Lei 14.133")
+
+    assert [doc.metadata["pk"] for doc in docs] == ["d", "b"]
+
+
+class SlowIndexCache(BM25IndexCache):
+    """Loads CHUNKS[:loaded] once `release` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.loaded = 2
+
+    def _load(self, vector_store):
+        assert self.release.wait(5)
+        return CHUNKS[: self.loaded]
+
+
+def test_index_is_built_in_the_background_and_served_stale_while_refreshing():
+    cache = SlowIndexCache()
+    store = FakeVectorStore([])
+
+    assert len(cache.get(store)) == 0  # not built yet: the query does not wait
+    cache.release.set()
+    cache.refresh(store).join()
+    first = cache.get(store)
+    assert len(first) == 2
+
+    cache.release.clear()
+    cache.loaded = 4
+    cache.invalidate()
+    assert cache.get(store) is first  # rebuilding, the previous index is served
+    cache.release.set()
+    cache.refresh(store).join()
+    assert len(cache.get(store)) == 4
+
+
+def test_registry_clear_drops_the_bm25_index(monkeypatch):
+    cache = SlowIndexCache()
+    cache.release.set()
+    monkeypatch.setattr(hybrid_retriever, "bm25_index_cache", cache)
+    cache.refresh(FakeVectorStore([])).join()
+
+    registry.clear()
+
+    assert cache._index is None
+
+
+class FakeCollection:
+    def __init__(self, num_entities):
+        self.num_entities = num_entities
+
+
+def _read_collection(monkeypatch, setting, legacy_col):
+    stores = {"rag_documents": FakeVectorStore([]), "rag_document_chunks": FakeVectorStore([])}
+    stores["rag_documents"].col = legacy_col
+    monkeypatch.setattr(hybrid_retriever, "RAG_READ_CHUNK_COLLECTION", setting)
+    monkeypatch.setattr(hybrid_retriever, "RAG_COLLECTION_NAME", "rag_documents")
+    monkeypatch.setattr(hybrid_retriever, "RAG_CHUNK_COLLECTION_NAME", "rag_document_chunks")
+    monkeypatch.setattr(hybrid_retriever, "get_vector_store", stores.__getitem__)
+    hybrid_retriever.read_collection_name.cache_clear()
+    try:
+        return hybrid_retriever.read_collection_name()
+    finally:
+        hybrid_retriever.read_collection_name.cache_clear()
+
+
+def test_auto_reads_the_chunk_collection_without_legacy_data(monkeypatch):
+    assert _read_collection(monkeypatch, "auto", None) == "rag_document_chunks"
+    assert _read_collection(monkeypatch, "auto", FakeCollection(0)) == "rag_document_chunks"
+
+
+def test_auto_keeps_reading_unmigrated_legacy_data(monkeypatch):
+    assert _read_collection(monkeypatch, "auto", FakeCollection(10)) == "rag_documents"
+    assert _read_collection(monkeypatch, "true", FakeCollection(10)) == "rag_document_chunks"
+    assert _read_collection(monkeypatch, "false", None) == "rag_documents"
@@ -0,0 +1,64 @@
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from app.llm import registry
+
+
+def test_get_chain_builds_once_per_model_and_temperature():
+    calls = []
+
+    @registry.register_chain("test_echo", model_name="model-a", temperature=0.1)
+    def build(model_name, temperature):
+        calls.append((model_name, temperature))
+        return RunnableLambda(lambda x: x)
+
+    first = registry.get_chain("test_echo")
+    assert registry.get_chain("test_echo") is first
+    other = registry.get_chain("test_echo", temperature=0.9)
+    assert other is not first
+    assert registry.get_chain("test_echo", temperature=0.9) is other
+    assert calls == [("model-a", 0.1), ("model-a", 0.9)]
+
+
+def test_chat_models_are_shared_and_pooled(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    registry.get_chat_model.cache_clear()
+
+    llm = registry.get_chat_model("gpt-4o", 0.3)
+    assert registry.get_chat_model("gpt-4o", 0.3) is llm
+    assert registry.get_chat_model("gpt-4o", 0.7) is not llm
+    assert llm.http_client is registry.get_http_client()
+    assert llm.http_async_client is registry.get_async_http_client()
+
+
+def test_warm_up_logs_failures_instead_of_raising(caplog):
+    @registry.register_chain("test_broken", model_name="model-a", temperature=0.0)
+    def build(model_name, temperature):
+        raise RuntimeError("milvus unavailable")
+
+    registry.warm_up(["test_broken", "test_unknown"])
+
+    assert "Could not warm up chain 'test_broken'" in caplog.text
+    assert "Could not warm up chain 'test_unknown'" in caplog.text
+
+
+def test_embeddings_are_cached_by_model_and_text(monkeypatch, tmp_path):
+    from nexora_core.embedding_cache import SQLiteEmbeddingStore
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    store = SQLiteEmbeddingStore(str(tmp_path / "embeddings.sqlite3"))
+    monkeypatch.setattr(registry, "embedding_store_from_url", lambda: store)
+    registry.get_embeddings.cache_clear()
+
+    embeddings = registry.get_embeddings()
+    calls = []
+    monkeypatch.setattr(
+        embeddings.underlying.__class__,
+        "embed_documents",
+        lambda self, texts, chunk_size=0: calls.append(texts) or [[0.1, 0.2] for _ in texts],
+    )
+
+    assert embeddings.embed_query("art. 18 Lei 14.133") == pytest.approx([0.1, 0.2])
+    assert embeddings.embed_query("art. 18  Lei 14.133") == pytest.approx([0.1, 0.2])
+    assert calls == [["art. 18 Lei 14.133"]]
+    registry.get_embeddings.cache_clear()
@@ -0,0 +1,171 @@
+import importlib.util
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+from docx import Document
+from docx.shared import Pt
+from PyPDF2 import PdfReader
+
+from app.pdf.converter import (
+    ConverterPool,
+    PdfCache,
+    PdfConversionTimeout,
+    PdfConverter,
+    PdfConverterBusy,
+)
+from app.pdf.renderers import LibreOfficeRenderer, ReportLabRenderer
+
+
+def _docx(path, paragraphs=("Termo de Referência",)):
+    document = Document()
+    document.add_heading("Objeto", level=1)
+    for text in paragraphs:
+        run = document.add_paragraph().add_run(text)
+        run.bold = True
+        run.font.size = Pt(12)
+    table = document.add_table(rows=1, cols=2)
+    table.rows[0].cells[0].text = "Item"
+    table.rows[0].cells[1].text = "Quantidade"
+    document.save(str(path))
+    return str(path)
+
+
+class FakePool:
+    """Renders instantly (after `delay`) and counts the jobs it receives."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.jobs = 0
+
+    def submit(self, docx_path, pdf_path, timeout=None):
+        self.jobs += 1
+        time.sleep(self.delay)
+        with open(pdf_path, "wb") as f:
+            f.write(b"%PDF-" + open(docx_path, "rb").read()[:16])
+        future = Future()
+        future.set_result(pdf_path)
+        return future
+
+
+def test_reportlab_renderer_keeps_text_and_tables(tmp_path):
+    docx_path = _docx(tmp_path / "tr.docx", ["Aquisição de 10 notebooks ☑"])
+    pdf_path = str(tmp_path / "tr.pdf")
+
+    ReportLabRenderer().convert(docx_path, pdf_path)
+
+    text = PdfReader(pdf_path).pages[0].extract_text()
+    assert "Objeto" in text
+    assert "Aquisição de 10 notebooks" in text
+    assert "Quantidade" in text
+
+
+class StuckPool:
+    """Accepts jobs that never complete."""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, docx_path, pdf_path, timeout=None):
+        self.futures.append(Future())
+        return self.futures[-1]
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("uno") is None or shutil.which("soffice") is None,
+    reason="LibreOffice and its Python UNO bridge are not installed",
+)
+def test_libreoffice_renderer_keeps_text_and_tables(tmp_path):
+    docx_path = _docx(tmp_path / "tr.docx", ["Aquisição de 10 notebooks"])
+    pdf_path = str(tmp_path / "tr.pdf")
+
+    renderer = LibreOfficeRenderer()
+    try:
+        renderer.convert(docx_path, pdf_path)
+        renderer.convert(docx_path, str(tmp_path / "again.pdf"))  # same soffice, still usable
+    finally:
+        renderer.close()
+
+    text = PdfReader(pdf_path).pages[0].extract_text()
+    assert "Aquisição de 10 notebooks" in text
+    assert "Quantidade" in text
+    assert os.path.exists(tmp_path / "again.pdf")
+
+
+def test_identical_documents_are_rendered_once(tmp_path):
+    pool = FakePool()
+    converter = PdfConverter(pool=pool, cache=PdfCache(str(tmp_path / "cache")), backend="reportlab")
+    first = _docx(tmp_path / "a.docx")
+    second = tmp_path / "b.docx"
+    second.write_bytes(open(first, "rb").read())
+
+    assert converter.convert(first) == converter.convert(str(second))
+    assert pool.jobs == 1
+
+    converter.convert(_docx(tmp_path / "c.docx", ["Outro conteúdo"]))
+    assert pool.jobs == 2
+
+
+def test_concurrent_requests_share_one_render(tmp_path):
+    pool = FakePool(delay=0.2)
+    converter = PdfConverter(pool=pool, cache=PdfCache(str(tmp_path / "cache")), backend="reportlab")
+    docx_path = _docx(tmp_path / "a.docx")
+
+    with ThreadPoolExecutor(4) as executor:
+        paths = list(executor.map(lambda _: converter.convert(docx_path), range(4)))
+
+    assert len(set(paths)) == 1
+    assert pool.jobs == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=250)
+    for index, key in enumerate(["old", "recent", "new"]):
+        source = tmp_path / f"{key}.part"
+        source.write_bytes(b"x" * 100)
+        os.utime(source, (index, index))
+        if key == "new":
+            cache.get("old")  # touched, so "recent" is now the oldest
+        cache.put(key, str(source))
+
+    assert cache.get("recent") is None
+    assert cache.get("old") is not None
+    assert cache.get("new") is not None
+
+
+def test_timed_out_job_restarts_its_worker(tmp_path):
+    docx_path = _docx(tmp_path / "tr.docx", ["Parágrafo"] * 200)
+    pool = ConverterPool(size=1, backend="reportlab", timeout=30)
+    try:
+        with pytest.raises(PdfConversionTimeout):
+            pool.submit(docx_path, str(tmp_path / "slow.pdf"), timeout=0.001).result()
+
+        pdf_path = pool.submit(docx_path, str(tmp_path / "tr.pdf")).result()
+        assert PdfReader(pdf_path).pages
+    finally:
+        pool.close()
+    assert not any(thread.name.startswith("pdf-dispatch") for thread in threading.enumerate())
+
+
+def test_conversion_fails_after_the_deadline(tmp_path):
+    pool = StuckPool()
+    cache = PdfCache(str(tmp_path / "cache"))
+    converter = PdfConverter(pool=pool, cache=cache, backend="reportlab", deadline=0.05)
+
+    with pytest.raises(PdfConversionTimeout):
+        converter.convert(_docx(tmp_path / "a.docx"))
+
+    assert pool.futures[0].cancelled()  # still queued: never rendered
+    assert os.listdir(cache.directory) == []
+
+
+def test_submit_fails_fast_when_the_queue_is_full(tmp_path):
+    pool = ConverterPool(size=1, backend="reportlab", max_queue=1)
+    pool.start = lambda: None  # no worker takes the jobs
+
+    pool.submit("a.docx", str(tmp_path / "a.pdf"))
+    with pytest.raises(PdfConverterBusy):
+        pool.submit("b.docx", str(tmp_path / "b.pdf"))
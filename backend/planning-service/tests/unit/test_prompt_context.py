@@ -0,0 +1,77 @@
+import json
+
+from app.llm.prompt_context import build_etp_context, count_tokens
+
+
+ETP_DATA = {
+    "necessidade": {
+        "problema": "Os notebooks atuais estão obsoletos.",
+        "impacto": "Interrupção das atividades administrativas.",
+    },
+    "estimativa_valor": {
+        "valor_total": 150000,
+        "memoria_calculo": "Cotação com três fornecedores. " * 50,
+    },
+    "objeto": "Aquisição de 100 notebooks.",
+}
+
+
+def test_selects_only_relevant_keys():
+    context = json.loads(build_etp_context("necessidade", ETP_DATA))
+
+    assert context == {
+        "necessidade": ETP_DATA["necessidade"],
+        "objeto": "Aquisição de 100 notebooks.",
+    }
+
+
+def test_falls_back_to_full_data_when_no_key_matches():
+    data = {"key": "value"}
+    assert json.loads(build_etp_context("justificativa", data)) == data
+
+
+def test_trims_long_texts_to_budget():
+    data = {"problema": "texto muito longo " * 500, "objeto": "Aquisição de notebooks."}
+
+    context = build_etp_context("necessidade", data, token_budget=100)
+
+    assert count_tokens(context) <= 100
+    parsed = json.loads(context)
+    assert parsed["objeto"] == "Aquisição de notebooks."
+    assert parsed["problema"].endswith("[...]")
+
+
+def test_logs_token_savings(caplog):
+    with caplog.at_level("INFO", logger="app.llm.prompt_context"):
+        build_etp_context("objeto", ETP_DATA)
+
+    assert "saved" in caplog.text
+
+
+def test_drops_whole_fields_when_trimming_texts_is_not_enough():
+    data = {
+        "objeto": "Aquisição de notebooks.",
+        "itens": [{"descricao": f"Notebook modelo {i}", "quantidade": i} for i in range(200)],
+    }
+
+    context = build_etp_context("objeto", data, token_budget=60)
+
+    assert count_tokens(context) <= 60
+    parsed = json.loads(context)  # still valid JSON, never cut mid-token
+    assert parsed["objeto"].startswith("Aquisi")
+    # Items dropped whole from the end, the kept ones complete
+    assert 0 < len(parsed["itens"]) < 200
+    assert [item["quantidade"] for item in parsed["itens"]] == list(range(len(parsed["itens"])))
+
+
+def test_drops_largest_fields_first_when_lists_are_not_enough():
+    data = {
+        "objeto": "Notebooks.",
+        "problema": " ".join(f"Problema {i} do setor." for i in range(300)),
+        "solucao_escolhida": " ".join(f"Solução {i}." for i in range(200)),
+    }
+
+    context = build_etp_context("objeto", data, token_budget=12)
+
+    assert count_tokens(context) <= 12
+    assert list(json.loads(context)) == ["objeto"]
@@ -0,0 +1,162 @@
+from types import SimpleNamespace
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from reportlab.pdfgen import canvas
+
+from app.rag import ingestor
+from app.rag.jobs import IngestionJob
+
+
+class FakeVectorStore:
+    """In-memory stand-in for the Milvus store, keyed by primary key."""
+
+    collection_name = "rag_documents"
+
+    def __init__(self):
+        self.rows = {}
+        self.embedded = 0
+        self.col = SimpleNamespace(
+            schema=SimpleNamespace(fields=[SimpleNamespace(name="document_id")])
+        )
+
+    def get_pks(self, expr):
+        document_id = expr.split('"')[1]
+        return [pk for pk, doc in self.rows.items() if doc.metadata["document_id"] == document_id]
+
+    def add_documents(self, documents, ids):
+        self.embedded += len(documents)
+        self.rows.update(zip(ids, documents))
+
+    def delete(self, ids):
+        for pk in ids:
+            del self.rows[pk]
+
+
+def _pages(*texts):
+    return list(enumerate(texts))
+
+
+@pytest.fixture
+def store():
+    fake = FakeVectorStore()
+    with patch("app.rag.ingestor.get_vector_store", return_value=fake):
+        yield fake
+
+
+def _ingest(tmp_path, pages, name="lei.pdf", content=b"v1", job=None):
+    pdf = tmp_path / "upload.pdf"
+    pdf.write_bytes(content)
+    with patch("app.rag.ingestor.extract_pages", AsyncMock(return_value=pages)):
+        return asyncio.run(ingestor.ingest_document(str(pdf), source=name, job=job))
+
+
+def test_reingesting_only_embeds_changed_chunks(store, tmp_path):
+    first = _ingest(tmp_path, _pages("Art. 1", "Art. 2"))
+    assert first["document_id"] == "lei"
+    assert (first["added"], first["deleted"], first["unchanged"]) == (2, 0, 0)
+
+    second = _ingest(tmp_path, _pages("Art. 1", "Art. 2 alterado"), content=b"v2")
+    assert (second["added"], second["deleted"], second["unchanged"]) == (1, 1, 1)
+    assert store.embedded == 3
+    assert sorted(doc.page_content for doc in store.rows.values()) == ["Art. 1", "Art. 2 alterado"]
+    assert {doc.metadata["version"] for doc in store.rows.values()} == {first["version"], second["version"]}
+
+
+def test_other_documents_are_untouched(store, tmp_path):
+    _ingest(tmp_path, _pages("Art. 1"), name="lei.pdf")
+    _ingest(tmp_path, _pages("Art. 1"), name="decreto.pdf")
+    assert len(store.rows) == 2
+
+    assert ingestor.delete_document("lei") == 1
+    assert [doc.metadata["document_id"] for doc in store.rows.values()] == ["decreto"]
+    assert ingestor.delete_document("lei") == 0
+
+
+def test_invalid_document_id_is_rejected(store):
+    with pytest.raises(ValueError):
+        ingestor.delete_document('x" || document_id != "')
+
+
+def test_new_chunks_are_added_in_concurrent_batches(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestor, "RAG_INGEST_EMBED_BATCH_SIZE", 2)
+    batches = []
+    add_documents = store.add_documents
+    store.add_documents = lambda docs, ids: batches.append(len(docs)) or add_documents(docs, ids)
+
+    job = IngestionJob(job_id="1", document_id="lei", source="lei.pdf")
+    result = _ingest(tmp_path, _pages(*(f"Art. {i}" for i in range(5))), job=job)
+
+    assert result["added"] == 5
+    assert sorted(batches) == [1, 2, 2]
+    assert (job.chunks_total, job.chunks_embedded) == (5, 5)
+
+
+def test_extract_pages_in_process_pool(tmp_path, monkeypatch):
+    pdf = tmp_path / "normas.pdf"
+    c = canvas.Canvas(str(pdf))
+    for i in range(5):
+        c.drawString(72, 720, f"Pagina {i}")
+        c.showPage()
+    c.save()
+
+    monkeypatch.setattr(ingestor, "RAG_INGEST_PROCESSES", 2)
+    monkeypatch.setattr(ingestor, "RAG_INGEST_PAGES_PER_TASK", 2)
+    ingestor.shutdown_extraction_pool()
+    job = IngestionJob(job_id="1", document_id="normas", source="normas.pdf")
+    try:
+        pages = asyncio.run(ingestor.extract_pages(str(pdf), job))
+    finally:
+        ingestor.shutdown_extraction_pool()
+
+    assert [(page, text.strip()) for page, text in pages] == [(i, f"Pagina {i}") for i in range(5)]
+    assert (job.pages_total, job.pages_done) == (5, 5)
+
+
+def test_collection_without_document_id_is_refused_not_dropped(store):
+    dropped = []
+    store.col = SimpleNamespace(schema=SimpleNamespace(fields=[SimpleNamespace(name="source")]),
+                                drop=lambda: dropped.append(True))
+
+    with pytest.raises(RuntimeError):
+        ingestor.delete_document("lei")
+    assert dropped == []
+
+
+class FakeLegacyIterator:
+    def __init__(self, rows):
+        self.batches = [rows, []]
+
+    def next(self):
+        return self.batches.pop(0)
+
+    def close(self):
+        pass
+
+
+def test_migration_copies_legacy_chunks_once(store):
+    from pymilvus import DataType
+
+    from app.rag import migrate_collection
+
+    rows = [
+        {"text": "Art. 1", "source": "/tmp/tmpab12.pdf", "page": 0},
+        {"text": "Art. 2", "source": "/tmp/tmpab12.pdf", "page": 1},
+        {"text": "Art. 1", "source": "/tmp/tmpab12.pdf", "page": 3},
+    ]
+    legacy = SimpleNamespace(
+        fields=["pk", "text", "vector", "source", "page"],
+        col=SimpleNamespace(
+            schema=SimpleNamespace(primary_field=SimpleNamespace(dtype=DataType.INT64)),
+            query_iterator=lambda **kwargs: FakeLegacyIterator(list(rows)),
+        ),
+    )
+    with patch.object(migrate_collection, "get_vector_store", return_value=legacy):
+        first = asyncio.run(migrate_collection.migrate())
+        second = asyncio.run(migrate_collection.migrate())
+
+    assert first == {"documents": 1, "copied": 2, "skipped": 0}
+    assert second == {"documents": 1, "copied": 0, "skipped": 2}
+    assert sorted(doc.page_content for doc in store.rows.values()) == ["Art. 1", "Art. 2"]
+    assert {doc.metadata["document_id"] for doc in store.rows.values()} == {"tmpab12"}
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import subprocess
+import sys
+from datetime import timedelta
+
+from app.rag import jobs
+from app.rag.jobs import IngestionJobRegistry, RedisJobStore, cleanup_uploads
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def get(self, key):
+        return self.data.get(key)
+
+
+def test_job_state_is_shared_through_redis(monkeypatch):
+    monkeypatch.setattr(jobs, "PROGRESS_SAVE_SECONDS", 0.01)
+    redis = FakeRedis()
+    receiving, polled = IngestionJobRegistry(RedisJobStore(redis)), IngestionJobRegistry(RedisJobStore(redis))
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def work():
+            job.pages_done = 3
+            await release.wait()
+            return {"added": 4}
+
+        job = await receiving.create(document_id="lei", source="lei.pdf")
+        task = receiving.start(job, work())
+        await asyncio.sleep(0.05)
+        running = await polled.get(job.job_id)  # e.g. another uvicorn worker
+        release.set()
+        await task
+        return running, await polled.get(job.job_id)
+
+    running, done = asyncio.run(scenario())
+
+    assert (running.status, running.pages_done) == ("running", 3)
+    assert (done.status, done.added) == ("done", 4)
+    assert done.finished_at is not None
+
+
+def test_jobs_beyond_the_limit_wait_queued():
+    registry = IngestionJobRegistry(max_concurrent=1)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return {}
+
+        first = await registry.create(document_id="a", source="a.pdf")
+        second = await registry.create(document_id="b", source="b.pdf")
+        tasks = [registry.start(first, work()), registry.start(second, work())]
+        await asyncio.sleep(0.01)
+        statuses = (first.status, second.status)
+        release.set()
+        await asyncio.gather(*tasks)
+        return statuses, (first.status, second.status)
+
+    assert asyncio.run(scenario()) == (("running", "queued"), ("done", "done"))
+
+
+def test_job_no_longer_saved_is_reported_as_interrupted():
+    registry = IngestionJobRegistry(RedisJobStore(FakeRedis()))
+
+    async def scenario():
+        job = await registry.create(document_id="lei", source="lei.pdf")
+        job.updated_at -= timedelta(seconds=jobs.JOB_STALE_SECONDS + 1)
+        await registry.store.save(job)
+        return await registry.get(job.job_id)
+
+    job = asyncio.run(scenario())
+
+    assert job.status == "error"
+    assert "interrupted" in job.error
+
+
+def test_cleanup_removes_uploads_of_stopped_processes(tmp_path):
+    finished = subprocess.Popen([sys.executable, "-c", "pass"])
+    finished.wait()
+    live = os.getppid()
+    for name in (f"upload-{finished.pid}-a.pdf", f"upload-{os.getpid()}-b.pdf", f"upload-{live}-c.pdf", "other.pdf"):
+        (tmp_path / name).write_bytes(b"%PDF")
+
+    assert cleanup_uploads(str(tmp_path)) == 2
+    assert sorted(os.listdir(tmp_path)) == ["other.pdf", f"upload-{live}-c.pdf"]
@@ -0,0 +1,99 @@
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from docx import Document
+
+from app.db.models.etp_modular import DocumentoETP
+from app.services import render_cache
+from app.services.document_generator import DocumentGenerator
+from app.utils.file_cache import FileCache
+from tests.utils.documento import create_documento_etp, create_instituicao, create_modelo_institucional
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = FileCache(str(tmp_path / "docx"), 10 * 1024 * 1024, ".docx")
+    monkeypatch.setattr(render_cache, "_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def documento(db):
+    modelo = create_modelo_institucional(db, create_instituicao(db))
+    return create_documento_etp(db, modelo)
+
+
+def _render(db, documento_id, **kwargs):
+    with patch.object(DocumentGenerator, "_adicionar_secoes", autospec=True,
+                      side_effect=DocumentGenerator._adicionar_secoes) as secoes:
+        path = DocumentGenerator(db).gerar_etp_docx(documento_id, **kwargs)
+    return path, secoes.call_count
+
+
+def test_unchanged_document_is_served_from_cache(db, cache, documento, tmp_path):
+    first, rendered = _render(db, documento.id)
+    assert rendered == 1
+    assert first.startswith(cache.directory)
+
+    second, rendered = _render(db, documento.id)
+    assert (second, rendered) == (first, 0)
+
+    copy, rendered = _render(db, documento.id, output_path=str(tmp_path / "etp.docx"))
+    assert rendered == 0
+    assert open(copy, "rb").read() == open(first, "rb").read()
+
+
+def test_cached_rendering_is_dated_by_the_document_version(db, cache, documento):
+    documento.updated_at = datetime(2030, 1, 2, 3, 4)
+    db.commit()
+
+    paragraphs = [p.text for p in Document(_render(db, documento.id)[0]).paragraphs]
+
+    assert "Documento atualizado em 02/01/2030 às 03:04" in paragraphs
+    assert not any(text.startswith("Documento gerado em") for text in paragraphs)
+
+
+def _edit_documento(db, documento):
+    documento.dados = {"s1": {"c1": "Aquisição de monitores"}}
+    documento.updated_at = datetime(2030, 1, 1)
+
+
+def _new_template_version(db, documento):
+    _, modelo, _ = DocumentGenerator(db)._carregar(DocumentoETP, documento.id)
+    modelo.versao = "1.1"
+
+
+@pytest.mark.parametrize("change", [_edit_documento, _new_template_version])
+def test_new_versions_are_rendered_again(db, cache, documento, change):
+    _render(db, documento.id)
+    change(db, documento)
+    db.commit()
+
+    _, rendered = _render(db, documento.id)
+    assert rendered == 1
+
+
+def test_new_generator_version_renders_again(db, cache, documento):
+    _render(db, documento.id)
+    with patch.object(render_cache, "GENERATOR_VERSION", "test"):
+        _, rendered = _render(db, documento.id)
+    assert rendered == 1
+
+
+def test_invalidation_hooks(db, cache, documento):
+    _render(db, documento.id)
+    assert render_cache.invalidate_template(documento.template_id + 100) == 0
+    assert render_cache.invalidate_documento("etp", documento.id + 100) == 0
+    assert render_cache.invalidate_template(documento.template_id) == 1
+    _, rendered = _render(db, documento.id)
+    assert rendered == 1
+
+    assert render_cache.invalidate_documento("etp", documento.id) == 1
+    _, rendered = _render(db, documento.id)
+    assert rendered == 1
+
+
+def test_documents_without_version_are_not_cached():
+    documento = type("Documento", (), {"id": 1, "updated_at": None})()
+    assert render_cache.render_key("etp", documento, None, None) is None
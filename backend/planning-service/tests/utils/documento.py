@@ -0,0 +1,54 @@
+import random
+import string
+
+from sqlalchemy.orm import Session
+
+from app.db.models.etp_modular import DocumentoETP
+from app.db.models.templates_gestao import Instituicao, ModeloInstitucional
+
+
+def random_digits(length: int = 14) -> str:
+    return "".join(random.choices(string.digits, k=length))
+
+
+def create_instituicao(db: Session) -> Instituicao:
+    instituicao = Instituicao(nome="Prefeitura de Teste", cnpj=random_digits(), tipo="prefeitura", uf="ES")
+    db.add(instituicao)
+    db.commit()
+    db.refresh(instituicao)
+    return instituicao
+
+
+def create_modelo_institucional(db: Session, instituicao: Instituicao, versao: str = "1.0") -> ModeloInstitucional:
+    modelo = ModeloInstitucional(
+        instituicao_id=instituicao.id,
+        nome="Modelo ETP",
+        tipo_documento="ETP",
+        versao=versao,
+        estrutura={"secoes": [{
+            "id": "s1", "ordem": 1, "titulo": "Necessidade",
+            "campos": [{"id": "c1", "label": "Descrição", "tipo": "text"}],
+        }]},
+        mapeamento_lei={},
+        configuracao_documento={},
+        created_by=1,
+    )
+    db.add(modelo)
+    db.commit()
+    db.refresh(modelo)
+    return modelo
+
+
+def create_documento_etp(db: Session, modelo: ModeloInstitucional, descricao: str = "Aquisição de notebooks") -> DocumentoETP:
+    documento = DocumentoETP(
+        plan_id=1,
+        template_id=modelo.id,
+        dados={"s1": {"c1": descricao}},
+        campos_obrigatorios_preenchidos={},
+        campos_gerados_ia=[],
+        created_by=1,
+    )
+    db.add(documento)
+    db.commit()
+    db.refresh(documento)
+    return documento
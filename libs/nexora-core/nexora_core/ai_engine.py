@@ -1,12 +1,21 @@
 import os
+import time
+import asyncio
+import threading
 import redis
-from openai import OpenAI
+import redis.asyncio as aioredis
+import httpx
+from openai import OpenAI, AsyncOpenAI
 import google.generativeai as genai
 import logging
 import json
 import uuid
 import hashlib
-from typing import List, Optional, TypedDict
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional, TypedDict
+
+from nexora_core.circuit_breaker import HALF_OPEN, CircuitBreaker
+from nexora_core.semantic_cache import SemanticCache
 
 class GenerationResult(TypedDict):
     response: str
@@ -21,6 +30,36 @@ OPENAI_PRICING = {
     "gpt-4": {"input": 30.00, "output": 60.00},
 }
 
+CACHE_TTL_SECONDS = 3600
+
+# Single-flight lock: while one caller generates a prompt, other callers
+# (in this or other processes) wait up to LOCK_TTL_MS for its cached result.
+LOCK_KEY_PREFIX = "lock:"
+LOCK_TTL_MS = int(os.environ.get("AI_ENGINE_LOCK_TTL_MS", "30000"))
+LOCK_POLL_INTERVAL_SECONDS = 0.05
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Optional semantic cache tier (see nexora_core.semantic_cache).
+SEMANTIC_CACHE_ENABLED = os.environ.get("AI_ENGINE_SEMANTIC_CACHE", "false").lower() in ("1", "true", "yes")
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("AI_ENGINE_SEMANTIC_THRESHOLD", "0.97"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.environ.get("AI_ENGINE_SEMANTIC_MAX_ENTRIES", "2048"))
+
+# Per-provider circuit breaker (see nexora_core.circuit_breaker).
+BREAKER_WINDOW_SECONDS = float(os.environ.get("AI_ENGINE_BREAKER_WINDOW_SECONDS", "60"))
+BREAKER_MIN_REQUESTS = int(os.environ.get("AI_ENGINE_BREAKER_MIN_REQUESTS", "5"))
+BREAKER_ERROR_RATE = float(os.environ.get("AI_ENGINE_BREAKER_ERROR_RATE", "0.5"))
+BREAKER_LATENCY_P95_SECONDS = float(os.environ.get("AI_ENGINE_BREAKER_LATENCY_P95_SECONDS", "20"))
+BREAKER_OPEN_SECONDS = float(os.environ.get("AI_ENGINE_BREAKER_OPEN_SECONDS", "30"))
+
+# Upper bound of concurrent HTTP connections / Redis connections held by the
+# async clients of a single engine (one engine is shared per process).
+MAX_CONNECTIONS = int(os.environ.get("AI_ENGINE_MAX_CONNECTIONS", "100"))
+
 # Configure logging
 handler = logging.StreamHandler()
 formatter = logging.Formatter('%(message)s')
@@ -29,8 +68,26 @@ logger = logging.getLogger('AIEngine')
 logger.addHandler(handler)
 logger.setLevel(logging.INFO)
 
+
+class _InflightCall:
+    """A generation in progress that other threads can wait on."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Optional[GenerationResult] = None
+        self.error: Optional[Exception] = None
+
+
+class _AsyncInflightCall:
+    """A generation task in progress and the number of coroutines awaiting it."""
+
+    def __init__(self, task: "asyncio.Task[GenerationResult]"):
+        self.task = task
+        self.waiters = 0
+
+
 class AIEngine:
-    def __init__(self, provider_priority: List[str] = ['openai', 'gemini']):
+    def __init__(self, provider_priority: List[str] = ['openai', 'gemini'], semantic_cache: Optional[SemanticCache] = None):
         self.providers = {}
         if os.environ.get("OPENAI_API_KEY"):
             self.providers['openai'] = self._init_openai()
@@ -41,46 +98,227 @@ class AIEngine:
         if os.environ.get("REDIS_URL"):
             self.redis_client = redis.from_url(os.environ.get("REDIS_URL"))
 
+        # Async counterparts used by agenerate(). The OpenAI client keeps a
+        # pooled httpx transport and Redis a bounded connection pool, so a
+        # single engine can serve many in-flight generations.
+        self.async_providers = {}
+        if 'openai' in self.providers:
+            self.async_providers['openai'] = self._init_async_openai()
+        if 'gemini' in self.providers:
+            # GenerativeModel exposes generate_content_async on the same object.
+            self.async_providers['gemini'] = self.providers['gemini']
+
+        self.async_redis_client = None
+        if os.environ.get("REDIS_URL"):
+            self.async_redis_client = aioredis.from_url(
+                os.environ.get("REDIS_URL"), max_connections=MAX_CONNECTIONS
+            )
+
         self.provider_priority = [p for p in provider_priority if p in self.providers]
+        self.breakers = {
+            p: CircuitBreaker(
+                p,
+                window_seconds=BREAKER_WINDOW_SECONDS,
+                min_requests=BREAKER_MIN_REQUESTS,
+                error_rate_threshold=BREAKER_ERROR_RATE,
+                latency_p95_threshold=BREAKER_LATENCY_P95_SECONDS,
+                open_seconds=BREAKER_OPEN_SECONDS,
+            )
+            for p in self.providers
+        }
+
+        self.semantic_cache = semantic_cache
+        if self.semantic_cache is None and SEMANTIC_CACHE_ENABLED:
+            self.semantic_cache = SemanticCache(
+                threshold=SEMANTIC_CACHE_THRESHOLD, max_entries=SEMANTIC_CACHE_MAX_ENTRIES
+            )
+
+        # Generations currently in flight, keyed by prompt cache key.
+        self._inflight: dict = {}
+        self._inflight_sync: dict = {}
+        self._inflight_lock = threading.Lock()
 
     def _init_openai(self):
         return OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
 
+    def _init_async_openai(self):
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        )
+        return AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"), http_client=http_client)
+
     def _init_gemini(self):
         genai.configure(api_key=os.environ.get("GEMINI_API_KEY"))
         return genai.GenerativeModel('gemini-pro')
 
-    def _log(self, event: str, trace_id: str, provider: Optional[str] = None, cache_hit: Optional[bool] = None, error: Optional[str] = None, cost: Optional[float] = None):
+    def _log(self, event: str, trace_id: str, provider: Optional[str] = None, cache_hit: Optional[bool] = None, error: Optional[str] = None, cost: Optional[float] = None, similarity: Optional[float] = None):
         log_entry = {
             "event": event,
             "trace_id": trace_id,
             "provider": provider,
             "cache_hit": cache_hit,
             "error": error,
-            "cost": cost
+            "cost": cost,
+            "similarity": similarity,
         }
+        if self.semantic_cache is not None:
+            log_entry["semantic_cache_hits"] = self.semantic_cache.hits
+            log_entry["semantic_cache_misses"] = self.semantic_cache.misses
         logger.info(json.dumps({k: v for k, v in log_entry.items() if v is not None}))
 
-    def generate(self, prompt: str, provider: str = "auto", **kwargs) -> GenerationResult:
+    def _route(self, provider: str) -> List[str]:
+        """
+        Orders the providers to try. In "auto" mode providers whose breaker is
+        open go last and, once every available provider has latency data, the
+        fastest (lowest p95) goes first; otherwise provider_priority is kept.
+        """
+        if provider != "auto":
+            return [provider]
+        available = [p for p in self.provider_priority if self.breakers[p].is_available()]
+        unavailable = [p for p in self.provider_priority if p not in available]
+        latencies = {p: self.breakers[p].latency_p95() for p in available}
+        if all(latency is not None for latency in latencies.values()):
+            available.sort(key=lambda p: latencies[p])
+        return available + unavailable
+
+    def breaker_metrics(self) -> List[dict]:
+        """Returns the circuit breaker state of every configured provider."""
+        return [breaker.snapshot() for breaker in self.breakers.values()]
+
+    def generate(self, prompt: str, provider: str = "auto", semantic_key: Optional[str] = None, **kwargs) -> GenerationResult:
+        """
+        Generates a completion for `prompt`, from the caches when possible.
+
+        `semantic_key` is the user-variable part of the prompt (e.g. the
+        keywords inserted in a template). Only prompts that pass it use the
+        semantic cache, which compares that part among prompts sharing the
+        same remaining template text.
+        """
         trace_id = str(uuid.uuid4())
-        cache_key = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        cache_key = self._cache_key(prompt)
+
+        cached = self._get_cached(cache_key, trace_id)
+        if cached:
+            return cached
+
+        self._log("cache.miss", trace_id=trace_id, cache_hit=False)
 
+        cached = self._get_semantic_cached(prompt, semantic_key, trace_id)
+        if cached:
+            return cached
+
+        # In-process single-flight: concurrent threads asking for the same
+        # prompt wait for the first one instead of calling the provider again.
+        with self._inflight_lock:
+            call = self._inflight_sync.get(cache_key)
+            is_leader = call is None
+            if is_leader:
+                call = _InflightCall()
+                self._inflight_sync[cache_key] = call
+
+        if not is_leader:
+            self._log("singleflight.wait", trace_id=trace_id)
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._generate_leader(prompt, cache_key, trace_id, provider, semantic_key, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight_sync.pop(cache_key, None)
+            call.event.set()
+
+    def _get_cached(self, cache_key: str, trace_id: str) -> Optional[GenerationResult]:
         if self.redis_client:
             cached_response_json = self.redis_client.get(cache_key)
             if cached_response_json:
                 self._log("cache.hit", trace_id=trace_id, cache_hit=True)
                 cached_response = json.loads(cached_response_json)
                 return GenerationResult(**cached_response)
+        return None
 
-        self._log("cache.miss", trace_id=trace_id, cache_hit=False)
+    @staticmethod
+    def _semantic_scope(prompt: str, semantic_key: Optional[str]) -> Optional[str]:
+        """Hash of the prompt without its variable part, or None when it can not use the semantic cache."""
+        if not semantic_key or semantic_key not in prompt:
+            return None
+        return hashlib.sha256(prompt.replace(semantic_key, "\x00").encode('utf-8')).hexdigest()
+
+    def _get_semantic_cached(self, prompt: str, semantic_key: Optional[str], trace_id: str) -> Optional[GenerationResult]:
+        scope = self._semantic_scope(prompt, semantic_key)
+        if self.semantic_cache is None or scope is None:
+            return None
+        cached_response, similarity = self.semantic_cache.lookup(semantic_key, scope=scope)
+        if cached_response is None:
+            self._log("semantic_cache.miss", trace_id=trace_id, cache_hit=False, similarity=round(similarity, 4))
+            return None
+        self._log("semantic_cache.hit", trace_id=trace_id, cache_hit=True, similarity=round(similarity, 4))
+        # The answer is reused, the trace belongs to this request
+        return GenerationResult(**{**cached_response, "trace_id": trace_id})
+
+    def _store_semantic(self, prompt: str, semantic_key: Optional[str], result: GenerationResult) -> None:
+        scope = self._semantic_scope(prompt, semantic_key)
+        if self.semantic_cache is not None and scope is not None:
+            self.semantic_cache.store(semantic_key, result, scope=scope)
+
+    def _generate_leader(self, prompt: str, cache_key: str, trace_id: str, provider: str, semantic_key: Optional[str] = None, **kwargs) -> GenerationResult:
+        # Cross-process single-flight: a short Redis lock elects one process
+        # to call the provider; the others wait for the cached result.
+        lock_key = LOCK_KEY_PREFIX + cache_key
+        lock_acquired = False
+        if self.redis_client:
+            lock_acquired = bool(self.redis_client.set(lock_key, trace_id, nx=True, px=LOCK_TTL_MS))
+            if not lock_acquired:
+                self._log("singleflight.wait", trace_id=trace_id)
+                deadline = time.monotonic() + LOCK_TTL_MS / 1000
+                while time.monotonic() < deadline:
+                    time.sleep(LOCK_POLL_INTERVAL_SECONDS)
+                    cached = self._get_cached(cache_key, trace_id)
+                    if cached:
+                        return cached
+                    if not self.redis_client.exists(lock_key):
+                        break
 
-        providers_to_try = self.provider_priority if provider == "auto" else [provider]
+        try:
+            result = self._call_providers(prompt, trace_id, provider, **kwargs)
+            if self.redis_client:
+                self.redis_client.set(cache_key, json.dumps(result), ex=CACHE_TTL_SECONDS)
+            self._store_semantic(prompt, semantic_key, result)
+            return result
+        finally:
+            if lock_acquired:
+                self.redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, trace_id)
+
+    def _call_providers(self, prompt: str, trace_id: str, provider: str, **kwargs) -> GenerationResult:
         last_error = None
 
-        for p in providers_to_try:
+        for p in self._route(provider):
             if p not in self.providers:
                 continue
 
+            breaker = self.breakers[p]
+            if not breaker.allow_request():
+                last_error = f"Circuit open for provider {p}"
+                self._log("circuit.open", trace_id=trace_id, provider=p)
+                if provider != "auto":
+                    break
+                continue
+
+            # Only completed calls are recorded: a cancelled caller
+            # (CancelledError, GeneratorExit) says nothing about the provider,
+            # but a cancelled probe must give the half-open slot back.
+            probe = breaker.state == HALF_OPEN
+            started_at = time.monotonic()
             try:
                 self._log("api.call.start", trace_id=trace_id, provider=p)
                 cost = None
@@ -91,6 +329,7 @@ class AIEngine:
                     response, cost = self._generate_openai(prompt, **kwargs)
                 elif p == 'gemini':
                     response = self._generate_gemini(prompt, **kwargs)
+                breaker.record(True, time.monotonic() - started_at)
 
                 result = GenerationResult(
                     response=response,
@@ -100,39 +339,316 @@ class AIEngine:
                     confidence_score=confidence_score,
                 )
 
-                if self.redis_client:
-                    self.redis_client.set(cache_key, json.dumps(result), ex=3600)
+                self._log("api.call.success", trace_id=trace_id, provider=p, cost=cost)
+                return result
+            except Exception as e:
+                breaker.record(False, time.monotonic() - started_at)
+                last_error = str(e)
+                self._log("api.call.error", trace_id=trace_id, provider=p, error=last_error)
+                if provider != "auto":
+                    break
+            except BaseException:
+                if probe:
+                    breaker.release_probe()
+                raise
+
+        raise Exception(f"All AI providers failed. Last error: {last_error}")
+
+    async def agenerate(self, prompt: str, provider: str = "auto", semantic_key: Optional[str] = None, **kwargs) -> GenerationResult:
+        """Coroutine counterpart of generate() that never blocks the event loop."""
+        trace_id = str(uuid.uuid4())
+        cache_key = self._cache_key(prompt)
+
+        cached = await self._aget_cached(cache_key, trace_id)
+        if cached:
+            return cached
+
+        self._log("cache.miss", trace_id=trace_id, cache_hit=False)
+
+        cached = self._get_semantic_cached(prompt, semantic_key, trace_id)
+        if cached:
+            return cached
+
+        # In-process single-flight: the generation runs in its own task, which
+        # every coroutine asking for the same prompt awaits (shielded). A caller
+        # being cancelled (e.g. a client disconnect) does not cancel it for the
+        # others; it is only cancelled once no caller is left waiting.
+        call = self._inflight.get(cache_key)
+        if call is None:
+            call = _AsyncInflightCall(asyncio.ensure_future(
+                self._run_inflight(prompt, cache_key, trace_id, provider, semantic_key, **kwargs)
+            ))
+            self._inflight[cache_key] = call
+        else:
+            self._log("singleflight.wait", trace_id=trace_id)
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    async def _run_inflight(self, prompt: str, cache_key: str, trace_id: str, provider: str, semantic_key: Optional[str], **kwargs) -> GenerationResult:
+        try:
+            return await self._agenerate_leader(prompt, cache_key, trace_id, provider, semantic_key, **kwargs)
+        finally:
+            self._inflight.pop(cache_key, None)
+
+    async def _aget_cached(self, cache_key: str, trace_id: str) -> Optional[GenerationResult]:
+        if self.async_redis_client:
+            cached_response_json = await self.async_redis_client.get(cache_key)
+            if cached_response_json:
+                self._log("cache.hit", trace_id=trace_id, cache_hit=True)
+                cached_response = json.loads(cached_response_json)
+                return GenerationResult(**cached_response)
+        return None
+
+    async def _agenerate_leader(self, prompt: str, cache_key: str, trace_id: str, provider: str, semantic_key: Optional[str] = None, **kwargs) -> GenerationResult:
+        lock_key = LOCK_KEY_PREFIX + cache_key
+        lock_acquired = False
+        if self.async_redis_client:
+            lock_acquired = bool(await self.async_redis_client.set(lock_key, trace_id, nx=True, px=LOCK_TTL_MS))
+            if not lock_acquired:
+                self._log("singleflight.wait", trace_id=trace_id)
+                deadline = time.monotonic() + LOCK_TTL_MS / 1000
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(LOCK_POLL_INTERVAL_SECONDS)
+                    cached = await self._aget_cached(cache_key, trace_id)
+                    if cached:
+                        return cached
+                    if not await self.async_redis_client.exists(lock_key):
+                        break
+
+        try:
+            result = await self._acall_providers(prompt, trace_id, provider, **kwargs)
+            if self.async_redis_client:
+                await self.async_redis_client.set(cache_key, json.dumps(result), ex=CACHE_TTL_SECONDS)
+            self._store_semantic(prompt, semantic_key, result)
+            return result
+        finally:
+            if lock_acquired:
+                await self.async_redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, trace_id)
+
+    async def _acall_providers(self, prompt: str, trace_id: str, provider: str, **kwargs) -> GenerationResult:
+        last_error = None
+
+        for p in self._route(provider):
+            if p not in self.async_providers:
+                continue
+
+            breaker = self.breakers[p]
+            if not breaker.allow_request():
+                last_error = f"Circuit open for provider {p}"
+                self._log("circuit.open", trace_id=trace_id, provider=p)
+                if provider != "auto":
+                    break
+                continue
+
+            # Only completed calls are recorded: a cancelled caller
+            # (CancelledError, GeneratorExit) says nothing about the provider,
+            # but a cancelled probe must give the half-open slot back.
+            probe = breaker.state == HALF_OPEN
+            started_at = time.monotonic()
+            try:
+                self._log("api.call.start", trace_id=trace_id, provider=p)
+                cost = None
+                response = None
+                confidence_score = None
+
+                if p == 'openai':
+                    response, cost = await self._agenerate_openai(prompt, **kwargs)
+                elif p == 'gemini':
+                    response = await self._agenerate_gemini(prompt, **kwargs)
+                breaker.record(True, time.monotonic() - started_at)
+
+                result = GenerationResult(
+                    response=response,
+                    provider=p,
+                    cost=cost,
+                    trace_id=trace_id,
+                    confidence_score=confidence_score,
+                )
 
                 self._log("api.call.success", trace_id=trace_id, provider=p, cost=cost)
                 return result
             except Exception as e:
+                breaker.record(False, time.monotonic() - started_at)
                 last_error = str(e)
                 self._log("api.call.error", trace_id=trace_id, provider=p, error=last_error)
                 if provider != "auto":
                     break
+            except BaseException:
+                if probe:
+                    breaker.release_probe()
+                raise
 
         raise Exception(f"All AI providers failed. Last error: {last_error}")
 
+    async def astream(self, prompt: str, provider: str = "auto", semantic_key: Optional[str] = None, **kwargs) -> AsyncIterator[str]:
+        """
+        Streams the completion for `prompt` as text chunks.
+
+        A cached answer is yielded as a single chunk. Fallback to the next
+        provider only happens while no chunk has been yielded yet; once the
+        stream completes the full result is written to the caches.
+        """
+        trace_id = str(uuid.uuid4())
+        cache_key = self._cache_key(prompt)
+
+        cached = await self._aget_cached(cache_key, trace_id) or self._get_semantic_cached(prompt, semantic_key, trace_id)
+        if cached:
+            yield cached["response"]
+            return
+
+        self._log("cache.miss", trace_id=trace_id, cache_hit=False)
+
+        last_error = None
+
+        for p in self._route(provider):
+            if p not in self.async_providers:
+                continue
+
+            breaker = self.breakers[p]
+            if not breaker.allow_request():
+                last_error = f"Circuit open for provider {p}"
+                self._log("circuit.open", trace_id=trace_id, provider=p)
+                if provider != "auto":
+                    break
+                continue
+
+            # Breakers track time to first chunk for streams; a stream closed by
+            # its consumer before then is not recorded (a probe is released).
+            probe = breaker.state == HALF_OPEN
+            started_at = time.monotonic()
+            first_chunk_latency = None
+            chunks = []
+            try:
+                self._log("api.stream.start", trace_id=trace_id, provider=p)
+                if p == 'openai':
+                    stream = self._astream_openai(prompt, **kwargs)
+                else:
+                    stream = self._astream_gemini(prompt, **kwargs)
+                async for chunk in stream:
+                    if first_chunk_latency is None:
+                        first_chunk_latency = time.monotonic() - started_at
+                        breaker.record(True, first_chunk_latency)
+                    chunks.append(chunk)
+                    yield chunk
+            except Exception as e:
+                if first_chunk_latency is None:
+                    breaker.record(False, time.monotonic() - started_at)
+                last_error = str(e)
+                self._log("api.call.error", trace_id=trace_id, provider=p, error=last_error)
+                if chunks or provider != "auto":
+                    raise
+                continue
+            except BaseException:
+                if probe and first_chunk_latency is None:
+                    breaker.release_probe()
+                raise
+            if first_chunk_latency is None:
+                breaker.record(False, time.monotonic() - started_at)
+
+            result = GenerationResult(
+                response="".join(chunks),
+                provider=p,
+                cost=None,
+                trace_id=trace_id,
+                confidence_score=None,
+            )
+            if self.async_redis_client:
+                await self.async_redis_client.set(cache_key, json.dumps(result), ex=CACHE_TTL_SECONDS)
+            self._store_semantic(prompt, semantic_key, result)
+            self._log("api.stream.success", trace_id=trace_id, provider=p)
+            return
+
+        raise Exception(f"All AI providers failed. Last error: {last_error}")
+
+    async def aclose(self):
+        """Releases the pooled connections held by the async clients."""
+        if 'openai' in self.async_providers:
+            await self.async_providers['openai'].close()
+        if self.async_redis_client:
+            await self.async_redis_client.aclose()
+
+    @staticmethod
+    def _cache_key(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _openai_messages(prompt: str) -> list:
+        return [
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": prompt}
+        ]
+
+    @staticmethod
+    def _openai_cost(model: str, usage) -> float:
+        cost = 0.0
+        if usage and model in OPENAI_PRICING:
+            pricing = OPENAI_PRICING[model]
+            prompt_cost = (usage.prompt_tokens / 1_000_000) * pricing["input"]
+            completion_cost = (usage.completion_tokens / 1_000_000) * pricing["output"]
+            cost = prompt_cost + completion_cost
+        return cost
+
     def _generate_openai(self, prompt: str, **kwargs) -> (str, float):
         model = kwargs.get("model", "gpt-3.5-turbo")
         completion = self.providers['openai'].chat.completions.create(
             model=model,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": prompt}
-            ]
+            messages=self._openai_messages(prompt)
         )
 
-        # Calculate cost
-        cost = 0.0
-        if completion.usage and model in OPENAI_PRICING:
-            pricing = OPENAI_PRICING[model]
-            prompt_cost = (completion.usage.prompt_tokens / 1_000_000) * pricing["input"]
-            completion_cost = (completion.usage.completion_tokens / 1_000_000) * pricing["output"]
-            cost = prompt_cost + completion_cost
-
+        cost = self._openai_cost(model, completion.usage)
         return completion.choices[0].message.content, cost
 
     def _generate_gemini(self, prompt: str, **kwargs) -> str:
         response = self.providers['gemini'].generate_content(prompt)
         return response.text
+
+    async def _agenerate_openai(self, prompt: str, **kwargs) -> (str, float):
+        model = kwargs.get("model", "gpt-3.5-turbo")
+        completion = await self.async_providers['openai'].chat.completions.create(
+            model=model,
+            messages=self._openai_messages(prompt)
+        )
+
+        cost = self._openai_cost(model, completion.usage)
+        return completion.choices[0].message.content, cost
+
+    async def _agenerate_gemini(self, prompt: str, **kwargs) -> str:
+        response = await self.async_providers['gemini'].generate_content_async(prompt)
+        return response.text
+
+    async def _astream_openai(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        model = kwargs.get("model", "gpt-3.5-turbo")
+        stream = await self.async_providers['openai'].chat.completions.create(
+            model=model,
+            messages=self._openai_messages(prompt),
+            stream=True,
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def _astream_gemini(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        response = await self.async_providers['gemini'].generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+@lru_cache(maxsize=None)
+def get_ai_engine() -> AIEngine:
+    """
+    Returns the process-wide AIEngine.
+
+    Building an engine creates provider SDK clients and connection pools, so
+    callers should share this instance instead of instantiating AIEngine per
+    request.
+    """
+    return AIEngine()
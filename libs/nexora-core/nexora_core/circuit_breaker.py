@@ -0,0 +1,167 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+try:
+    from prometheus_client import Gauge
+except ImportError:  # prometheus_client is optional
+    Gauge = None
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+if Gauge is not None:
+    BREAKER_STATE = Gauge(
+        "ai_engine_circuit_state",
+        "AIEngine provider circuit breaker state (0=closed, 1=half_open, 2=open)",
+        ["provider"],
+    )
+    BREAKER_ERROR_RATE = Gauge(
+        "ai_engine_provider_error_rate",
+        "AIEngine provider error rate over the rolling window",
+        ["provider"],
+    )
+    BREAKER_LATENCY_P95 = Gauge(
+        "ai_engine_provider_latency_p95_seconds",
+        "AIEngine provider p95 latency over the rolling window",
+        ["provider"],
+    )
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker over a rolling time window.
+
+    The breaker opens when, with at least `min_requests` calls in the last
+    `window_seconds`, the error rate reaches `error_rate_threshold` or the p95
+    latency exceeds `latency_p95_threshold` seconds. After `open_seconds` it
+    lets a single probe call through (half-open); the probe's outcome closes
+    or re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 60.0,
+        min_requests: int = 5,
+        error_rate_threshold: float = 0.5,
+        latency_p95_threshold: float = 20.0,
+        open_seconds: float = 30.0,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.error_rate_threshold = error_rate_threshold
+        self.latency_p95_threshold = latency_p95_threshold
+        self.open_seconds = open_seconds
+
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._calls: Deque[Tuple[float, bool, float]] = deque()
+        self._lock = threading.Lock()
+        self._export()
+
+    def _prune(self, now: float) -> None:
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def _stats(self) -> Tuple[int, float, Optional[float]]:
+        count = len(self._calls)
+        if not count:
+            return 0, 0.0, None
+        errors = sum(1 for _, ok, _ in self._calls if not ok)
+        latencies = sorted(latency for _, _, latency in self._calls)
+        p95 = latencies[min(count - 1, int(round(0.95 * (count - 1))))]
+        return count, errors / count, p95
+
+    def is_available(self) -> bool:
+        """Returns whether allow_request() would currently let a call through."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                return time.monotonic() - self._opened_at >= self.open_seconds
+            return not self._probe_in_flight
+
+    def allow_request(self) -> bool:
+        """Returns whether a call may be sent to the provider right now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self._export()
+                return True
+            return False
+
+    def release_probe(self) -> None:
+        """
+        Frees the half-open probe slot without recording an outcome, for a
+        probe call that was cancelled before the provider answered.
+        """
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                self._export()
+
+    def record(self, success: bool, latency: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._calls.append((now, success, latency))
+            self._prune(now)
+
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if success and latency <= self.latency_p95_threshold:
+                    self.state = CLOSED
+                    self._calls.clear()
+                else:
+                    self._trip(now)
+            elif self.state == CLOSED:
+                count, error_rate, p95 = self._stats()
+                if count >= self.min_requests and (
+                    error_rate >= self.error_rate_threshold or p95 > self.latency_p95_threshold
+                ):
+                    self._trip(now)
+            self._export()
+
+    def _trip(self, now: float) -> None:
+        self.state = OPEN
+        self._opened_at = now
+
+    def latency_p95(self) -> Optional[float]:
+        """p95 latency of successful calls in the window, None without data."""
+        with self._lock:
+            self._prune(time.monotonic())
+            latencies = sorted(latency for _, ok, latency in self._calls if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))]
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            self._prune(time.monotonic())
+            count, error_rate, p95 = self._stats()
+            return {
+                "provider": self.name,
+                "state": self.state,
+                "requests": count,
+                "error_rate": error_rate,
+                "latency_p95": p95,
+            }
+
+    def _export(self) -> None:
+        if Gauge is None:
+            return
+        count, error_rate, p95 = self._stats()
+        BREAKER_STATE.labels(provider=self.name).set(STATE_VALUES[self.state])
+        BREAKER_ERROR_RATE.labels(provider=self.name).set(error_rate)
+        BREAKER_LATENCY_P95.labels(provider=self.name).set(p95 or 0.0)
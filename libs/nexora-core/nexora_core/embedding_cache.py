@@ -0,0 +1,190 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import unicodedata
+from array import array
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    from langchain_core.embeddings import Embeddings as _EmbeddingsBase
+except ImportError:  # langchain is optional; the wrapper is duck-typed without it
+    _EmbeddingsBase = object
+
+# Shared by every service: the Redis of REDIS_URL when it is set, otherwise a
+# SQLite file at an absolute path, shared by the processes of one host
+DEFAULT_SQLITE_PATH = os.path.join(tempfile.gettempdir(), "nexora-embedding-cache.sqlite3")
+EMBEDDING_CACHE_URL = os.getenv("EMBEDDING_CACHE_URL") or os.getenv("REDIS_URL") or f"sqlite:///{DEFAULT_SQLITE_PATH}"
+EMBEDDING_CACHE_TTL_SECONDS = int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", "0")) or None
+REDIS_KEY_PREFIX = "emb:"
+
+
+def normalize_text(text: str) -> str:
+    """NFC-normalizes and collapses whitespace, without changing case."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def embedding_key(model: str, text: str) -> str:
+    """Cache key: model name plus the SHA-256 of the normalized text."""
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{model}:{digest}"
+
+
+def _pack(vector: Sequence[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    values = array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+class SQLiteEmbeddingStore:
+    """
+    Embedding store in a local SQLite file.
+
+    The connection is opened lazily per process, so the store can be created
+    before a fork (Celery/Gunicorn workers) and used in the children.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            conn.commit()
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def mget(self, keys: Sequence[str]) -> List[Optional[List[float]]]:
+        if not keys:
+            return []
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            conn = self._connection()
+            # Stay below SQLite's bound parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update((key, _unpack(blob)) for key, blob in rows)
+        return [found.get(key) for key in keys]
+
+    def mset(self, items: Dict[str, Sequence[float]]) -> None:
+        if not items:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, _pack(vector)) for key, vector in items.items()],
+            )
+            conn.commit()
+
+
+class RedisEmbeddingStore:
+    """Embedding store in Redis, optionally expiring entries after `ttl_seconds`."""
+
+    def __init__(self, client, ttl_seconds: Optional[int] = None):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+
+    def mget(self, keys: Sequence[str]) -> List[Optional[List[float]]]:
+        if not keys:
+            return []
+        blobs = self.client.mget([REDIS_KEY_PREFIX + key for key in keys])
+        return [_unpack(blob) if blob else None for blob in blobs]
+
+    def mset(self, items: Dict[str, Sequence[float]]) -> None:
+        if not items:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for key, vector in items.items():
+            pipe.set(REDIS_KEY_PREFIX + key, _pack(vector), ex=self.ttl_seconds)
+        pipe.execute()
+
+
+def embedding_store_from_url(url: Optional[str] = None):
+    """
+    Builds the store configured by `url` (EMBEDDING_CACHE_URL by default).
+
+    Supports `sqlite:///<path>` and `redis://...`; an empty value or `none`
+    disables the cache and returns None.
+    """
+    url = EMBEDDING_CACHE_URL if url is None else url
+    if not url or url.lower() == "none":
+        return None
+    if url.startswith("sqlite:///"):
+        return SQLiteEmbeddingStore(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        import redis
+
+        return RedisEmbeddingStore(redis.Redis.from_url(url), ttl_seconds=EMBEDDING_CACHE_TTL_SECONDS)
+    raise ValueError(f"Unsupported embedding cache URL: {url}")
+
+
+class CachedEmbeddings(_EmbeddingsBase):
+    """
+    Wraps an embeddings object (LangChain `Embeddings` interface) with a
+    persistent cache keyed by model name plus SHA-256 of the normalized text.
+
+    Only the texts missing from the cache are sent to the wrapped model, in a
+    single `embed_documents` call; duplicates within a batch are embedded once.
+    The async methods run the (blocking) store calls in a worker thread.
+    """
+
+    def __init__(self, underlying: Any, model: str, store=None):
+        self.underlying = underlying
+        self.model = model
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, texts: Sequence[str]):
+        keys = [embedding_key(self.model, text) for text in texts]
+        cached = self.store.mget(keys) if self.store is not None else [None] * len(keys)
+
+        missing: Dict[str, str] = {}
+        for key, text, vector in zip(keys, texts, cached):
+            if vector is None and key not in missing:
+                missing[key] = normalize_text(text)
+        self.hits += sum(1 for vector in cached if vector is not None)
+        self.misses += len(missing)
+        return keys, cached, missing
+
+    def _merge(self, keys, cached, missing, vectors) -> List[List[float]]:
+        computed = dict(zip(missing, (list(v) for v in vectors)))
+        if self.store is not None:
+            self.store.mset(computed)
+        return [vector if vector is not None else computed[key] for key, vector in zip(keys, cached)]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, cached, missing = self._lookup(texts)
+        vectors = self.underlying.embed_documents(list(missing.values())) if missing else []
+        return self._merge(keys, cached, missing, vectors)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, cached, missing = await asyncio.to_thread(self._lookup, texts)
+        vectors = await self.underlying.aembed_documents(list(missing.values())) if missing else []
+        return await asyncio.to_thread(self._merge, keys, cached, missing, vectors)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
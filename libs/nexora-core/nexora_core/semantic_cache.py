@@ -0,0 +1,187 @@
+import math
+import random
+import re
+import threading
+import unicodedata
+import zlib
+from collections import OrderedDict
+from typing import Dict, FrozenSet, List, Optional, Protocol, Tuple
+
+SparseVector = Dict[int, float]
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case-folds, NFC-normalizes and collapses whitespace of a prompt."""
+    text = unicodedata.normalize("NFC", prompt).casefold()
+    return " ".join(text.split())
+
+
+class Embedder(Protocol):
+    def embed(self, text: str) -> SparseVector:
+        ...
+
+
+class HashingEmbedder:
+    """
+    Local, dependency-free embedding based on feature hashing.
+
+    Words and in-word character trigrams are hashed into `dim` buckets, so the
+    vector ignores word order and whitespace while still tolerating small
+    spelling differences. The result is L2-normalized and sparse.
+    """
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        features = []
+        for token in _TOKEN_RE.findall(text):
+            features.append("w:" + token)
+            padded = f"#{token}#"
+            features.extend("c:" + padded[i:i + 3] for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, text: str) -> SparseVector:
+        vector: SparseVector = {}
+        for feature in self._features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            index = h % self.dim
+            sign = 1.0 if (h >> 31) & 1 == 0 else -1.0
+            vector[index] = vector.get(index, 0.0) + sign
+        norm = math.sqrt(sum(v * v for v in vector.values()))
+        if norm == 0:
+            return {}
+        return {i: v / norm for i, v in vector.items()}
+
+
+def cosine_similarity(a: SparseVector, b: SparseVector) -> float:
+    """Cosine similarity of two L2-normalized sparse vectors."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(i, 0.0) for i, v in a.items())
+
+
+def terms(text: str) -> FrozenSet[str]:
+    """The set of words of a normalized text."""
+    return frozenset(_TOKEN_RE.findall(text))
+
+
+class SemanticCache:
+    """
+    Small in-process approximate-nearest-neighbour cache of generations.
+
+    Texts are normalized and embedded, then indexed with random-hyperplane
+    LSH across several tables; a lookup only scores the entries of the same
+    `scope` sharing a bucket with the query and returns the best one above
+    `threshold`. Entries are evicted in LRU order once `max_entries` is
+    reached.
+
+    Callers should store only the variable part of a prompt (e.g. the user's
+    keywords) and pass the rest of the prompt as `scope`: shared template
+    text would dominate the similarity otherwise. With `require_same_terms`
+    (the default, meant for the lexical HashingEmbedder) a hit must also have
+    the same words as the query, so only order, case, punctuation and
+    whitespace may differ: a lexical similarity can not tell "não comprar
+    notebooks" from "comprar notebooks". Turn it off only with an embedder
+    whose threshold has been calibrated on real prompts.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.97,
+        max_entries: int = 2048,
+        embedder: Optional[Embedder] = None,
+        num_tables: int = 8,
+        bits_per_table: int = 8,
+        seed: int = 42,
+        require_same_terms: bool = True,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.embedder = embedder or HashingEmbedder()
+        self.require_same_terms = require_same_terms
+        self.hits = 0
+        self.misses = 0
+
+        dim = getattr(self.embedder, "dim", 1024)
+        rng = random.Random(seed)
+        self._planes = [
+            [[rng.gauss(0.0, 1.0) for _ in range(dim)] for _ in range(bits_per_table)]
+            for _ in range(num_tables)
+        ]
+        self._tables: List[Dict[int, set]] = [{} for _ in range(num_tables)]
+        # entry id -> (vector, LSH signatures, value, scope, terms)
+        self._entries: "OrderedDict[int, Tuple[SparseVector, Tuple[int, ...], dict, str, FrozenSet[str]]]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _signatures(self, vector: SparseVector) -> Tuple[int, ...]:
+        signatures = []
+        for planes in self._planes:
+            signature = 0
+            for plane in planes:
+                dot = sum(v * plane[i] for i, v in vector.items())
+                signature = (signature << 1) | (1 if dot >= 0 else 0)
+            signatures.append(signature)
+        return tuple(signatures)
+
+    def lookup(self, text: str, scope: str = "") -> Tuple[Optional[dict], float]:
+        """Returns the cached value of `scope` most similar to `text` and its similarity."""
+        normalized = normalize_prompt(text)
+        vector = self.embedder.embed(normalized)
+        if not vector:
+            with self._lock:
+                self.misses += 1
+            return None, 0.0
+        signatures = self._signatures(vector)
+        query_terms = terms(normalized)
+
+        with self._lock:
+            candidates = set()
+            for table, signature in zip(self._tables, signatures):
+                candidates |= table.get(signature, set())
+
+            best_id, best_score = None, 0.0
+            for entry_id in candidates:
+                entry_vector, _, _, entry_scope, entry_terms = self._entries[entry_id]
+                if entry_scope != scope or (self.require_same_terms and entry_terms != query_terms):
+                    continue
+                score = cosine_similarity(vector, entry_vector)
+                if score > best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is not None and best_score >= self.threshold:
+                self._entries.move_to_end(best_id)
+                self.hits += 1
+                return self._entries[best_id][2], best_score
+
+            self.misses += 1
+            return None, best_score
+
+    def store(self, text: str, value: dict, scope: str = "") -> None:
+        normalized = normalize_prompt(text)
+        vector = self.embedder.embed(normalized)
+        if not vector:
+            return
+        signatures = self._signatures(vector)
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (vector, signatures, value, scope, terms(normalized))
+            for table, signature in zip(self._tables, signatures):
+                table.setdefault(signature, set()).add(entry_id)
+
+            while len(self._entries) > self.max_entries:
+                evicted_id, (_, evicted_signatures, _, _, _) = self._entries.popitem(last=False)
+                for table, signature in zip(self._tables, evicted_signatures):
+                    bucket = table.get(signature)
+                    if bucket is not None:
+                        bucket.discard(evicted_id)
+                        if not bucket:
+                            del table[signature]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -5,8 +5,12 @@ setup(
     version='0.1.0',
     packages=find_packages(),
     install_requires=[
-        'redis',
-        'openai',
+        'redis>=5.0.1',
+        'openai>=1.0',
+        'httpx',
         'google-generativeai',
     ],
+    extras_require={
+        'metrics': ['prometheus-client'],
+    },
 )
@@ -0,0 +1,304 @@
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+import os
+import json
+import asyncio
+import threading
+from nexora_core.ai_engine import AIEngine, get_ai_engine
+
+
+class TestAIEngineAsync(unittest.IsolatedAsyncioTestCase):
+
+    @patch('nexora_core.ai_engine.AsyncOpenAI')
+    @patch('nexora_core.ai_engine.OpenAI')
+    async def test_agenerate_openai_success(self, MockOpenAI, MockAsyncOpenAI):
+        mock_completion = MagicMock()
+        mock_completion.choices[0].message.content = "Async OpenAI response"
+        mock_completion.usage.prompt_tokens = 1_000_000
+        mock_completion.usage.completion_tokens = 0
+        MockAsyncOpenAI.return_value.chat.completions.create = AsyncMock(return_value=mock_completion)
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_key", "GEMINI_API_KEY": "", "REDIS_URL": ""}):
+            ai_engine = AIEngine(provider_priority=['openai'])
+            result = await ai_engine.agenerate("test prompt")
+
+        self.assertEqual(result["response"], "Async OpenAI response")
+        self.assertEqual(result["provider"], "openai")
+        self.assertAlmostEqual(result["cost"], 0.50)
+        MockOpenAI.return_value.chat.completions.create.assert_not_called()
+
+    @patch('nexora_core.ai_engine.genai')
+    async def test_agenerate_gemini_success(self, mock_gemini):
+        mock_response = MagicMock()
+        mock_response.text = "Async Gemini response"
+        mock_gemini.GenerativeModel.return_value.generate_content_async = AsyncMock(return_value=mock_response)
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "", "GEMINI_API_KEY": "fake_key", "REDIS_URL": ""}):
+            ai_engine = AIEngine(provider_priority=['gemini'])
+            result = await ai_engine.agenerate("test prompt", provider="gemini")
+
+        self.assertEqual(result["response"], "Async Gemini response")
+        mock_gemini.GenerativeModel.return_value.generate_content.assert_not_called()
+
+    @patch('nexora_core.ai_engine.aioredis')
+    @patch('nexora_core.ai_engine.redis')
+    async def test_agenerate_cache_hit(self, mock_redis, mock_aioredis):
+        cached = {"response": "cached", "provider": "openai", "cost": 0.0, "trace_id": "t", "confidence_score": None}
+        mock_aioredis.from_url.return_value.get = AsyncMock(return_value=json.dumps(cached))
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "", "GEMINI_API_KEY": "", "REDIS_URL": "redis://fake"}):
+            ai_engine = AIEngine()
+            result = await ai_engine.agenerate("test prompt")
+
+        self.assertEqual(result["response"], "cached")
+        mock_redis.from_url.return_value.get.assert_not_called()
+
+    @patch('nexora_core.ai_engine.aioredis')
+    @patch('nexora_core.ai_engine.redis')
+    @patch('nexora_core.ai_engine.genai')
+    @patch('nexora_core.ai_engine.AsyncOpenAI')
+    @patch('nexora_core.ai_engine.OpenAI')
+    async def test_agenerate_fallback_and_cache_store(self, MockOpenAI, MockAsyncOpenAI, mock_gemini, mock_redis, mock_aioredis):
+        MockAsyncOpenAI.return_value.chat.completions.create = AsyncMock(side_effect=Exception("OpenAI failed"))
+        mock_response = MagicMock()
+        mock_response.text = "Gemini fallback response"
+        mock_gemini.GenerativeModel.return_value.generate_content_async = AsyncMock(return_value=mock_response)
+        async_redis = mock_aioredis.from_url.return_value
+        async_redis.get = AsyncMock(return_value=None)
+        async_redis.set = AsyncMock(return_value=True)
+        async_redis.eval = AsyncMock()
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_key", "GEMINI_API_KEY": "fake_key", "REDIS_URL": "redis://fake"}):
+            ai_engine = AIEngine(provider_priority=['openai', 'gemini'])
+            result = await ai_engine.agenerate("test prompt")
+
+        self.assertEqual(result["response"], "Gemini fallback response")
+        self.assertEqual(result["provider"], "gemini")
+        cache_set = async_redis.set.await_args_list[-1]
+        self.assertEqual(json.loads(cache_set.args[1])["response"], "Gemini fallback response")
+        async_redis.eval.assert_awaited_once()
+
+    async def test_agenerate_all_providers_fail(self):
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "", "GEMINI_API_KEY": "", "REDIS_URL": ""}):
+            ai_engine = AIEngine()
+            with self.assertRaises(Exception):
+                await ai_engine.agenerate("test prompt")
+
+    @patch('nexora_core.ai_engine.AsyncOpenAI')
+    @patch('nexora_core.ai_engine.OpenAI')
+    async def test_agenerate_coalesces_concurrent_identical_prompts(self, MockOpenAI, MockAsyncOpenAI):
+        release = asyncio.Event()
+        mock_completion = MagicMock()
+        mock_completion.choices[0].message.content = "shared response"
+        mock_completion.usage = None
+
+        async def slow_create(**kwargs):
+            await release.wait()
+            return mock_completion
+
+        create = AsyncMock(side_effect=slow_create)
+        MockAsyncOpenAI.return_value.chat.completions.create = create
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_key", "GEMINI_API_KEY": "", "REDIS_URL": ""}):
+            ai_engine = AIEngine(provider_priority=['openai'])
+            tasks = [asyncio.create_task(ai_engine.agenerate("same prompt")) for _ in range(5)]
+            await asyncio.sleep(0)
+            release.set()
+            results = await asyncio.gather(*tasks)
+
+        create.assert_awaited_once()
+        self.assertEqual({r["trace_id"] for r in results}, {results[0]["trace_id"]})
+        self.assertEqual(ai_engine._inflight, {})
+
+    @patch('nexora_core.ai_engine.AsyncOpenAI')
+    @patch('nexora_core.ai_engine.OpenAI')
+    async def test_agenerate_coalesced_callers_share_errors(self, MockOpenAI, MockAsyncOpenAI):
+        release = asyncio.Event()
+
+        async def failing_create(**kwargs):
+            await release.wait()
+            raise RuntimeError("provider down")
+
+        MockAsyncOpenAI.return_value.chat.completions.create = AsyncMock(side_effect=failing_create)
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_key", "GEMINI_API_KEY": "", "REDIS_URL": ""}):
+            ai_engine = AIEngine(provider_priority=['openai'])
+            tasks = [asyncio.create_task(ai_engine.agenerate("same prompt")) for _ in range(3)]
+            await asyncio.sleep(0)
+            release.set()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.assertTrue(all(isinstance(r, Exception) for r in results))
+        self.assertEqual(MockAsyncOpenAI.return_value.chat.completions.create.await_count, 1)
+
+    @patch('nexora_core.ai_engine.AsyncOpenAI')
+    @patch('nexora_core.ai_engine.OpenAI')
+    async def test_agenerate_cancelled_first_caller_does_not_cancel_the_others(self, MockOpenAI, MockAsyncOpenAI):
+        release = asyncio.Event()
+        mock_completion = MagicMock()
+        mock_completion.choices[0].message.content = "shared response"
+        mock_completion.usage = None
+
+        async def slow_create(**kwargs):
+            await release.wait()
+            return mock_completion
+
+        create = AsyncMock(side_effect=slow_create)
+        MockAsyncOpenAI.return_value.chat.completions.create = create
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_key", "GEMINI_API_KEY": "", "REDIS_URL": ""}):
+            ai_engine = AIEngine(provider_priority=['openai'])
+            first = asyncio.create_task(ai_engine.agenerate("same prompt"))
+            await asyncio.sleep(0)
+            followers = [asyncio.create_task(ai_engine.agenerate("same prompt")) for _ in range(2)]
+            await asyncio.sleep(0)
+            first.cancel()  # the first client disconnects
+            await asyncio.sleep(0)
+            release.set()
+            results = await asyncio.gather(*followers)
+
+        self.assertTrue(first.cancelled())
+        self.assertEqual([r["response"] for r in results], ["shared response"] * 2)
+        create.assert_awaited_once()
+        self.assertEqual(ai_engine._inflight, {})
+
+    @patch('nexora_core.ai_engine.AsyncOpenAI')
+    @patch('nexora_core.ai_engine.OpenAI')
+    async def test_agenerate_is_cancelled_when_every_caller_is(self, MockOpenAI, MockAsyncOpenAI):
+        cancelled = asyncio.Event()
+
+        async def hanging_create(**kwargs):
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        MockAsyncOpenAI.return_value.chat.completions.create = AsyncMock(side_effect=hanging_create)
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_key", "GEMINI_API_KEY": "", "REDIS_URL": ""}):
+            ai_engine = AIEngine(provider_priority=['openai'])
+            tasks = [asyncio.create_task(ai_engine.agenerate("same prompt")) for _ in range(2)]
+            await asyncio.sleep(0)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await asyncio.wait_for(cancelled.wait(), 1)
+            await asyncio.sleep(0)
+
+        self.assertEqual(ai_engine._inflight, {})
+
+    @patch('nexora_core.ai_engine.LOCK_POLL_INTERVAL_SECONDS', 0)
+    @patch('nexora_core.ai_engine.aioredis')
+    @patch('nexora_core.ai_engine.redis')
+    @patch('nexora_core.ai_engine.AsyncOpenAI')
+    @patch('nexora_core.ai_engine.OpenAI')
+    async def test_agenerate_waits_for_other_process_holding_lock(self, MockOpenAI, MockAsyncOpenAI, mock_redis, mock_aioredis):
+        cached = {"response": "from other worker", "provider": "openai", "cost": 0.1, "trace_id": "other", "confidence_score": None}
+        async_redis = mock_aioredis.from_url.return_value
+        async_redis.get = AsyncMock(side_effect=[None, None, json.dumps(cached)])
+        async_redis.set = AsyncMock(return_value=None)  # lock held elsewhere
+        async_redis.exists = AsyncMock(return_value=1)
+        create = AsyncMock()
+        MockAsyncOpenAI.return_value.chat.completions.create = create
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_key", "GEMINI_API_KEY": "", "REDIS_URL": "redis://fake"}):
+            ai_engine = AIEngine(provider_priority=['openai'])
+            result = await ai_engine.agenerate("test prompt")
+
+        self.assertEqual(result["trace_id"], "other")
+        create.assert_not_called()
+
+    @patch('nexora_core.ai_engine.OpenAI')
+    def test_generate_coalesces_concurrent_threads(self, MockOpenAI):
+        release = threading.Event()
+        mock_completion = MagicMock()
+        mock_completion.choices[0].message.content = "shared response"
+        mock_completion.usage = None
+
+        def slow_create(**kwargs):
+            release.wait(5)
+            return mock_completion
+
+        create = MockOpenAI.return_value.chat.completions.create
+        create.side_effect = slow_create
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_key", "GEMINI_API_KEY": "", "REDIS_URL": ""}):
+            ai_engine = AIEngine(provider_priority=['openai'])
+            waiting = threading.Semaphore(0)
+            log = ai_engine._log
+
+            def counting_log(event, *args, **kwargs):
+                if event == "singleflight.wait":
+                    waiting.release()
+                return log(event, *args, **kwargs)
+
+            ai_engine._log = counting_log
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(ai_engine.generate("same prompt"))) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for _ in range(3):
+                self.assertTrue(waiting.acquire(timeout=5))
+            release.set()
+            for t in threads:
+                t.join()
+
+        self.assertEqual(create.call_count, 1)
+        self.assertEqual(len(results), 4)
+        self.assertEqual({r["trace_id"] for r in results}, {results[0]["trace_id"]})
+
+    @patch('nexora_core.ai_engine.aioredis')
+    @patch('nexora_core.ai_engine.redis')
+    @patch('nexora_core.ai_engine.AsyncOpenAI')
+    @patch('nexora_core.ai_engine.OpenAI')
+    async def test_astream_openai_yields_chunks_and_caches(self, MockOpenAI, MockAsyncOpenAI, mock_redis, mock_aioredis):
+        def chunk(text):
+            c = MagicMock()
+            c.choices[0].delta.content = text
+            return c
+
+        async def stream():
+            for text in ["Olá", ", ", "mundo"]:
+                yield chunk(text)
+
+        create = AsyncMock(return_value=stream())
+        MockAsyncOpenAI.return_value.chat.completions.create = create
+        async_redis = mock_aioredis.from_url.return_value
+        async_redis.get = AsyncMock(return_value=None)
+        async_redis.set = AsyncMock()
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_key", "GEMINI_API_KEY": "", "REDIS_URL": "redis://fake"}):
+            ai_engine = AIEngine(provider_priority=['openai'])
+            chunks = [c async for c in ai_engine.astream("test prompt")]
+
+        self.assertEqual(chunks, ["Olá", ", ", "mundo"])
+        self.assertTrue(create.await_args.kwargs["stream"])
+        self.assertEqual(json.loads(async_redis.set.await_args.args[1])["response"], "Olá, mundo")
+
+    @patch('nexora_core.ai_engine.genai')
+    @patch('nexora_core.ai_engine.AsyncOpenAI')
+    @patch('nexora_core.ai_engine.OpenAI')
+    async def test_astream_falls_back_before_first_chunk(self, MockOpenAI, MockAsyncOpenAI, mock_gemini):
+        MockAsyncOpenAI.return_value.chat.completions.create = AsyncMock(side_effect=Exception("OpenAI failed"))
+
+        async def gemini_stream():
+            for text in ["Gemini ", "stream"]:
+                yield MagicMock(text=text)
+
+        mock_gemini.GenerativeModel.return_value.generate_content_async = AsyncMock(return_value=gemini_stream())
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_key", "GEMINI_API_KEY": "fake_key", "REDIS_URL": ""}):
+            ai_engine = AIEngine(provider_priority=['openai', 'gemini'])
+            chunks = [c async for c in ai_engine.astream("test prompt")]
+
+        self.assertEqual("".join(chunks), "Gemini stream")
+
+    def test_get_ai_engine_is_shared(self):
+        get_ai_engine.cache_clear()
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "", "GEMINI_API_KEY": "", "REDIS_URL": ""}):
+            self.assertIs(get_ai_engine(), get_ai_engine())
+        get_ai_engine.cache_clear()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+import asyncio
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+import os
+from nexora_core.ai_engine import AIEngine
+from nexora_core.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_on_error_rate(self):
+        breaker = CircuitBreaker("openai", min_requests=4, error_rate_threshold=0.5)
+        breaker.record(True, 0.1)
+        breaker.record(False, 0.1)
+        breaker.record(True, 0.1)
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.record(False, 0.1)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow_request())
+
+    def test_opens_on_p95_latency(self):
+        breaker = CircuitBreaker("openai", min_requests=3, latency_p95_threshold=1.0)
+        for _ in range(3):
+            breaker.record(True, 5.0)
+        self.assertEqual(breaker.state, OPEN)
+
+    @patch('nexora_core.circuit_breaker.time')
+    def test_half_open_probe_closes_breaker(self, mock_time):
+        mock_time.monotonic.return_value = 100.0
+        breaker = CircuitBreaker("openai", min_requests=1, open_seconds=30)
+        breaker.record(False, 0.1)
+        self.assertFalse(breaker.allow_request())
+
+        mock_time.monotonic.return_value = 131.0
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertFalse(breaker.allow_request())  # single probe at a time
+
+        breaker.record(True, 0.1)
+        self.assertEqual(breaker.state, CLOSED)
+
+    @patch('nexora_core.circuit_breaker.time')
+    def test_released_probe_lets_the_next_probe_through(self, mock_time):
+        mock_time.monotonic.return_value = 100.0
+        breaker = CircuitBreaker("openai", min_requests=1, open_seconds=30)
+        breaker.record(False, 0.1)
+
+        mock_time.monotonic.return_value = 131.0
+        self.assertTrue(breaker.allow_request())
+        breaker.release_probe()
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.is_available())
+        self.assertTrue(breaker.allow_request())
+
+    def test_snapshot(self):
+        breaker = CircuitBreaker("gemini")
+        breaker.record(True, 0.2)
+        breaker.record(False, 0.4)
+        snapshot = breaker.snapshot()
+        self.assertEqual(snapshot["state"], CLOSED)
+        self.assertEqual(snapshot["requests"], 2)
+        self.assertEqual(snapshot["error_rate"], 0.5)
+
+
+class TestAIEngineRouting(unittest.TestCase):
+
+    @patch('nexora_core.ai_engine.genai')
+    @patch('nexora_core.ai_engine.OpenAI')
+    def test_open_breaker_skips_provider(self, MockOpenAI, mock_gemini):
+        mock_response = MagicMock()
+        mock_response.text = "Gemini response"
+        mock_gemini.GenerativeModel.return_value.generate_content.return_value = mock_response
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_key", "GEMINI_API_KEY": "fake_key", "REDIS_URL": ""}):
+            ai_engine = AIEngine(provider_priority=['openai', 'gemini'])
+            ai_engine.breakers['openai']._trip(0.0)
+            ai_engine.breakers['openai']._opened_at = float("inf")
+            result = ai_engine.generate("test prompt")
+
+        self.assertEqual(result["provider"], "gemini")
+        MockOpenAI.return_value.chat.completions.create.assert_not_called()
+
+    @patch('nexora_core.ai_engine.genai')
+    @patch('nexora_core.ai_engine.OpenAI')
+    def test_auto_routing_prefers_fastest_provider(self, MockOpenAI, mock_gemini):
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_key", "GEMINI_API_KEY": "fake_key", "REDIS_URL": ""}):
+            ai_engine = AIEngine(provider_priority=['openai', 'gemini'])
+            self.assertEqual(ai_engine._route("auto"), ['openai', 'gemini'])
+
+            ai_engine.breakers['openai'].record(True, 8.0)
+            # Without latency data for every provider, priority order is kept
+            self.assertEqual(ai_engine._route("auto"), ['openai', 'gemini'])
+
+            ai_engine.breakers['gemini'].record(True, 1.0)
+            self.assertEqual(ai_engine._route("auto"), ['gemini', 'openai'])
+            self.assertEqual(ai_engine._route("openai"), ['openai'])
+
+    @patch('nexora_core.ai_engine.OpenAI')
+    def test_failures_are_recorded(self, MockOpenAI):
+        MockOpenAI.return_value.chat.completions.create.side_effect = Exception("OpenAI failed")
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_key", "GEMINI_API_KEY": "", "REDIS_URL": ""}):
+            ai_engine = AIEngine(provider_priority=['openai'])
+            for i in range(5):
+                with self.assertRaises(Exception):
+                    ai_engine.generate(f"prompt {i}")
+            with self.assertRaises(Exception):
+                ai_engine.generate("one more prompt")
+
+        self.assertEqual(MockOpenAI.return_value.chat.completions.create.call_count, 5)
+        self.assertEqual(ai_engine.breaker_metrics()[0]["state"], OPEN)
+
+
+class TestAIEngineCancellation(unittest.IsolatedAsyncioTestCase):
+
+    @patch('nexora_core.ai_engine.AsyncOpenAI')
+    @patch('nexora_core.ai_engine.OpenAI')
+    async def test_cancelled_calls_are_not_recorded(self, MockOpenAI, MockAsyncOpenAI):
+        started = asyncio.Event()
+
+        async def hanging_create(**kwargs):
+            started.set()
+            await asyncio.Event().wait()
+
+        MockAsyncOpenAI.return_value.chat.completions.create = AsyncMock(side_effect=hanging_create)
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_key", "GEMINI_API_KEY": "", "REDIS_URL": ""}):
+            ai_engine = AIEngine(provider_priority=['openai'])
+            task = asyncio.create_task(ai_engine.agenerate("prompt"))
+            await started.wait()
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            await asyncio.sleep(0)
+
+        self.assertEqual(ai_engine.breaker_metrics()[0]["requests"], 0)
+
+    @patch('nexora_core.ai_engine.AsyncOpenAI')
+    @patch('nexora_core.ai_engine.OpenAI')
+    async def test_cancelled_probe_releases_the_breaker(self, MockOpenAI, MockAsyncOpenAI):
+        started = asyncio.Event()
+
+        async def hanging_create(**kwargs):
+            started.set()
+            await asyncio.Event().wait()
+
+        MockAsyncOpenAI.return_value.chat.completions.create = AsyncMock(side_effect=hanging_create)
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_key", "GEMINI_API_KEY": "", "REDIS_URL": ""}):
+            ai_engine = AIEngine(provider_priority=['openai'])
+            breaker = ai_engine.breakers['openai']
+            breaker.state = OPEN
+            breaker._opened_at = -breaker.open_seconds
+
+            task = asyncio.create_task(ai_engine.agenerate("prompt"))
+            await started.wait()
+            self.assertFalse(breaker.is_available())
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.is_available())
+        self.assertEqual(ai_engine.breaker_metrics()[0]["requests"], 0)
+
+    @patch('nexora_core.ai_engine.AsyncOpenAI')
+    @patch('nexora_core.ai_engine.OpenAI')
+    async def test_stream_closed_before_first_chunk_is_not_recorded(self, MockOpenAI, MockAsyncOpenAI):
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_key", "GEMINI_API_KEY": "", "REDIS_URL": ""}):
+            ai_engine = AIEngine(provider_priority=['openai'])
+
+            async def hanging_stream(prompt, **kwargs):
+                await asyncio.Event().wait()
+                yield "never"
+
+            with patch.object(ai_engine, '_astream_openai', hanging_stream):
+                stream = ai_engine.astream("prompt")
+                task = asyncio.create_task(stream.__anext__())
+                await asyncio.sleep(0)
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+                await stream.aclose()
+
+        self.assertEqual(ai_engine.breaker_metrics()[0]["requests"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, AsyncMock
+
+from nexora_core.embedding_cache import (
+    CachedEmbeddings,
+    RedisEmbeddingStore,
+    SQLiteEmbeddingStore,
+    embedding_key,
+    embedding_store_from_url,
+    normalize_text,
+)
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 0.5] for text in texts]
+
+
+class TestEmbeddingCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "cache", "embeddings.sqlite3")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_key_uses_model_and_normalized_text(self):
+        self.assertEqual(normalize_text("  Art.\n 18 \t Lei "), "Art. 18 Lei")
+        self.assertEqual(embedding_key("m", "Art.  18"), embedding_key("m", "Art. 18\n"))
+        self.assertNotEqual(embedding_key("m", "Art. 18"), embedding_key("other", "Art. 18"))
+        self.assertNotEqual(embedding_key("m", "Art. 18"), embedding_key("m", "art. 18"))
+
+    def test_only_missing_texts_are_embedded(self):
+        underlying = FakeEmbeddings()
+        embeddings = CachedEmbeddings(underlying, model="m", store=SQLiteEmbeddingStore(self.path))
+
+        first = embeddings.embed_documents(["abc", "de", "abc"])
+        self.assertEqual(first, [[3.0, 0.5], [2.0, 0.5], [3.0, 0.5]])
+        self.assertEqual(underlying.calls, [["abc", "de"]])
+
+        second = embeddings.embed_documents(["de", "fghi"])
+        self.assertEqual(second, [[2.0, 0.5], [4.0, 0.5]])
+        self.assertEqual(underlying.calls[-1], ["fghi"])
+
+    def test_cache_persists_across_instances(self):
+        CachedEmbeddings(FakeEmbeddings(), model="m", store=SQLiteEmbeddingStore(self.path)).embed_query("abc")
+
+        underlying = FakeEmbeddings()
+        embeddings = CachedEmbeddings(underlying, model="m", store=SQLiteEmbeddingStore(self.path))
+        self.assertEqual(embeddings.embed_query("abc "), [3.0, 0.5])
+        self.assertEqual(underlying.calls, [])
+        self.assertEqual(embeddings.hits, 1)
+
+    def test_redis_store_round_trip(self):
+        data = {}
+        client = MagicMock()
+        client.mget.side_effect = lambda keys: [data.get(key) for key in keys]
+        pipe = client.pipeline.return_value
+        pipe.set.side_effect = lambda key, value, ex=None: data.__setitem__(key, value)
+
+        store = RedisEmbeddingStore(client, ttl_seconds=60)
+        store.mset({"m:1": [1.0, 2.0]})
+        self.assertEqual(store.mget(["m:1", "m:2"]), [[1.0, 2.0], None])
+        pipe.set.assert_called_once_with("emb:m:1", unittest.mock.ANY, ex=60)
+
+    def test_store_from_url(self):
+        self.assertIsNone(embedding_store_from_url("none"))
+        self.assertIsInstance(embedding_store_from_url(f"sqlite:///{self.path}"), SQLiteEmbeddingStore)
+        with self.assertRaises(ValueError):
+            embedding_store_from_url("memcached://localhost")
+
+
+class TestCachedEmbeddingsAsync(unittest.IsolatedAsyncioTestCase):
+
+    async def test_aembed_documents_uses_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            underlying = MagicMock()
+            underlying.aembed_documents = AsyncMock(side_effect=lambda texts: [[1.0] for _ in texts])
+            embeddings = CachedEmbeddings(
+                underlying, model="m", store=SQLiteEmbeddingStore(os.path.join(tmpdir, "e.db"))
+            )
+
+            self.assertEqual(await embeddings.aembed_query("abc"), [1.0])
+            self.assertEqual(await embeddings.aembed_documents(["abc", "xyz"]), [[1.0], [1.0]])
+            self.assertEqual(underlying.aembed_documents.await_args_list[-1].args, (["xyz"],))
+
+    async def test_async_store_calls_do_not_block_the_event_loop(self):
+        loop_thread = threading.get_ident()
+        store = MagicMock()
+        store.mget.side_effect = lambda keys: (threads.append(threading.get_ident()), [None] * len(keys))[1]
+        store.mset.side_effect = lambda items: threads.append(threading.get_ident())
+        threads = []
+        underlying = MagicMock()
+        underlying.aembed_documents = AsyncMock(side_effect=lambda texts: [[1.0] for _ in texts])
+
+        await CachedEmbeddings(underlying, model="m", store=store).aembed_documents(["abc"])
+
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(loop_thread, threads)
+
+if __name__ == '__main__':
+    unittest.main()
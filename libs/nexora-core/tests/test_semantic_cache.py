@@ -0,0 +1,101 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+from nexora_core.ai_engine import AIEngine
+from nexora_core.semantic_cache import SemanticCache, HashingEmbedder, normalize_prompt, cosine_similarity
+
+PROMPT = "Aja como um especialista em compras públicas. Com base nas palavras-chave '{}', escreva um parágrafo para a seção 'necessidade' de um Estudo Técnico Preliminar."
+
+
+class TestSemanticCache(unittest.TestCase):
+
+    def test_normalize_prompt(self):
+        self.assertEqual(normalize_prompt("  Olá\n\tMUNDO  "), "olá mundo")
+
+    def test_keyword_order_and_whitespace_are_ignored(self):
+        embedder = HashingEmbedder()
+        a = embedder.embed(normalize_prompt(PROMPT.format("notebooks, monitores")))
+        b = embedder.embed(normalize_prompt(PROMPT.format("monitores,   notebooks")))
+        self.assertAlmostEqual(cosine_similarity(a, b), 1.0)
+
+    def test_lookup_hit_and_miss(self):
+        cache = SemanticCache(threshold=0.97)
+        cache.store(PROMPT.format("notebooks, monitores"), {"response": "cached"})
+
+        value, similarity = cache.lookup(PROMPT.format("Monitores notebooks"))
+        self.assertEqual(value, {"response": "cached"})
+        self.assertGreaterEqual(similarity, 0.97)
+
+        value, _ = cache.lookup("Descreva os riscos de uma obra de pavimentação asfáltica.")
+        self.assertIsNone(value)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_negated_or_extended_keywords_miss(self):
+        cache = SemanticCache(threshold=0.97)
+        cache.store("comprar notebooks", {"response": "comprar"})
+        cache.store("manutenção predial", {"response": "manutenção"})
+        long_keywords = "aquisição de notebooks monitores teclados mouses e cabos de rede para o setor"
+        cache.store(long_keywords, {"response": "longo"})
+
+        self.assertIsNone(cache.lookup("não comprar notebooks")[0])
+        self.assertIsNone(cache.lookup("manutenção predial preventiva")[0])
+        # Cosine similarity 0.98, above the threshold, but one more word
+        self.assertIsNone(cache.lookup(long_keywords + " não")[0])
+
+    def test_entries_only_match_within_their_scope(self):
+        cache = SemanticCache()
+        cache.store("notebooks", {"response": "necessidade"}, scope="necessidade")
+
+        self.assertIsNone(cache.lookup("notebooks", scope="riscos")[0])
+        self.assertEqual(cache.lookup("Notebooks", scope="necessidade")[0], {"response": "necessidade"})
+
+    def test_lru_eviction(self):
+        cache = SemanticCache(max_entries=2)
+        cache.store("primeiro prompt sobre notebooks", {"response": "1"})
+        cache.store("segundo prompt sobre cadeiras", {"response": "2"})
+        cache.store("terceiro prompt sobre veículos", {"response": "3"})
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.lookup("primeiro prompt sobre notebooks")[0])
+        self.assertEqual(cache.lookup("terceiro prompt sobre veículos")[0], {"response": "3"})
+
+
+class TestAIEngineSemanticCache(unittest.TestCase):
+
+    @patch('nexora_core.ai_engine.OpenAI')
+    def test_semantic_hit_skips_provider(self, MockOpenAI):
+        mock_completion = MagicMock()
+        mock_completion.choices[0].message.content = "OpenAI response"
+        mock_completion.usage = None
+        create = MockOpenAI.return_value.chat.completions.create
+        create.return_value = mock_completion
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_key", "GEMINI_API_KEY": "", "REDIS_URL": ""}):
+            ai_engine = AIEngine(provider_priority=['openai'], semantic_cache=SemanticCache())
+            first = ai_engine.generate(PROMPT.format("notebooks, monitores"), semantic_key="notebooks, monitores")
+            with self.assertLogs('AIEngine', level='INFO') as logs:
+                second = ai_engine.generate(PROMPT.format("monitores  notebooks"), semantic_key="monitores  notebooks")
+
+        create.assert_called_once()
+        self.assertEqual(second["response"], "OpenAI response")
+        self.assertNotEqual(second["trace_id"], first["trace_id"])
+        self.assertTrue(any('"semantic_cache.hit"' in line and '"semantic_cache_hits": 1' in line for line in logs.output))
+
+    @patch('nexora_core.ai_engine.OpenAI')
+    def test_negated_prompt_and_prompts_without_key_reach_the_provider(self, MockOpenAI):
+        mock_completion = MagicMock()
+        mock_completion.choices[0].message.content = "OpenAI response"
+        mock_completion.usage = None
+        create = MockOpenAI.return_value.chat.completions.create
+        create.return_value = mock_completion
+
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_key", "GEMINI_API_KEY": "", "REDIS_URL": ""}):
+            ai_engine = AIEngine(provider_priority=['openai'], semantic_cache=SemanticCache())
+            ai_engine.generate(PROMPT.format("comprar notebooks"), semantic_key="comprar notebooks")
+            ai_engine.generate(PROMPT.format("não comprar notebooks"), semantic_key="não comprar notebooks")
+            ai_engine.generate(PROMPT.format("notebooks comprar"))
+
+        self.assertEqual(create.call_count, 3)
+
+if __name__ == '__main__':
+    unittest.main()